@@ -0,0 +1,747 @@
+#!/usr/bin/env python
+# 가상의 스케쥴 / 서버 그룹 / 예외 / EC2 / RDS 를 메모리에 만들고 스케쥴러 실행과 Bot 명령을 측정한다
+# AWS 호출은 botocore hook 에서 메모리의 가짜 AWS 가 처리하므로 네트워크 없이 실행되며
+# 같은 --size / --seed / --now 로 실행하면 AWS 호출 수가 항상 같다
+#
+#   $ python benchmarks/fleet.py --size 200
+#   $ python benchmarks/fleet.py --size 200 --save-baseline benchmarks/fleet_baseline.json
+#   $ python benchmarks/fleet.py --size 200 --baseline benchmarks/fleet_baseline.json
+import argparse
+import copy
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+FUNCTION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions', 'awsInstanceScheduler')
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fleet_baseline.json')
+TARGET_SCHEDULE = 'schedule-0000'
+
+# (이름, Bot 명령), 명령이 None 이면 스케쥴러 실행을 측정한다
+SCENARIO_LIST = [
+    ('tick', None),
+    ('tick-warm', None),
+    ('bot status', '{0} status'.format(TARGET_SCHEDULE)),
+    ('bot status live', '{0} status live'.format(TARGET_SCHEDULE)),
+    ('bot info', '{0} info'.format(TARGET_SCHEDULE)),
+    ('bot exception info', '{0} exception info'.format(TARGET_SCHEDULE)),
+    ('bot force_stop', '{0} force_stop'.format(TARGET_SCHEDULE)),
+    ('bot status all', 'status all'),
+    ('bot info all', 'info all'),
+    ('bot exception info all', 'exception info all')
+]
+
+TABLE_KEY_MAP = {
+    'Schedule': ['ScheduleName'],
+    'ScheduleServerGroupV2': ['ScheduleName', 'GroupName'],
+    'ScheduleExceptionV2': ['ScheduleName', 'ExceptionKey'],
+    'ScheduleState': ['StateKey']
+}
+INDEX_KEY_MAP = {
+    'ExceptionDate-index': ['ExceptionDate', 'ScheduleName']
+}
+SERVER_GROUP_TEMPLATE_LIST = [
+    ('db', 'RDS', []),
+    ('cache', 'EC2', ['db']),
+    ('app', 'EC2', ['db', 'cache']),
+    ('web', 'EC2', ['app'])
+]
+EC2_TRANSITION_MAP = {'pending': 'running', 'stopping': 'stopped'}
+RDS_TRANSITION_MAP = {'starting': 'available', 'stopping': 'stopped'}
+DYNAMODB_PAGE_BYTE = 1024 * 1024
+RDS_PAGE_SIZE = 100
+# 수 ms 짜리 Bot 명령은 측정 오차가 커서 이보다 작게 늘어난 시간은 회귀로 보지 않는다
+MIN_WALL_REGRESSION_SECOND = 0.005
+
+
+def to_wire(value):
+    if isinstance(value, bool):
+        return {'BOOL': value}
+    elif isinstance(value, (int, float)):
+        return {'N': str(value)}
+    elif isinstance(value, list):
+        return {'L': [to_wire(v) for v in value]}
+    elif value is None:
+        return {'NULL': True}
+    else:
+        return {'S': str(value)}
+
+
+def to_wire_item(item):
+    return {key: to_wire(value) for key, value in item.items()}
+
+
+class FakeAws:
+    # DynamoDB 는 wire 형식 그대로 저장하고, EC2 / RDS 는 boto3 응답 형식으로 저장한다
+
+    def __init__(self, latency_second=0.0):
+        self.latency_second = latency_second
+        self.table_map = {table_name: OrderedDict() for table_name in TABLE_KEY_MAP}
+        self.ec2_instance_map = OrderedDict()
+        self.rds_instance_map = OrderedDict()
+        self.call_counter = Counter()
+        self.lock = threading.RLock()
+
+    def install(self, session):
+        session.events.register('before-parameter-build.*.*', self.keep_params)
+        session.events.register('before-call.*.*', self.call)
+
+    @staticmethod
+    def keep_params(params, context, **kwargs):
+        context['fake_params'] = copy.deepcopy(params)
+
+    def call(self, model, params, context, **kwargs):
+        from botocore.awsrequest import AWSResponse
+
+        service_name = model.service_model.endpoint_prefix
+        operation_name = model.name
+
+        if service_name == 'dynamodb':
+            request = json.loads(params['body'].decode('utf-8'))
+        else:
+            request = context.get('fake_params', {})
+
+        with self.lock:
+            self.call_counter['{0}.{1}'.format(service_name, operation_name)] += 1
+            handler = getattr(self, '{0}_{1}'.format(service_name.replace('-', '_'), operation_name), None)
+
+            if handler is None:
+                raise NotImplementedError('{0}.{1}'.format(service_name, operation_name))
+
+            status_code, parsed = handler(request)
+
+        if self.latency_second > 0:
+            time.sleep(self.latency_second)
+
+        parsed.setdefault('ResponseMetadata', {'HTTPStatusCode': status_code})
+
+        return AWSResponse('https://fake.amazonaws.com', status_code, {}, None), parsed
+
+    @staticmethod
+    def error(code, message='fake error'):
+        return 400, {'Error': {'Code': code, 'Message': message}}
+
+    # DynamoDB
+
+    def put_item(self, table_name, item):
+        key = tuple(json.dumps(item[key_name], sort_keys=True) for key_name in TABLE_KEY_MAP[table_name])
+        self.table_map[table_name][key] = item
+
+    def get_item(self, table_name, key_item):
+        key = tuple(json.dumps(key_item[key_name], sort_keys=True) for key_name in TABLE_KEY_MAP[table_name])
+        return key, self.table_map[table_name].get(key)
+
+    @staticmethod
+    def page_item_list(item_list, request, key_name_list):
+        start = 0
+
+        if 'ExclusiveStartKey' in request:
+            last_key = request['ExclusiveStartKey']
+
+            for i, item in enumerate(item_list):
+                if all(item.get(key_name) == last_key.get(key_name) for key_name in key_name_list):
+                    start = i + 1
+                    break
+
+        limit = request.get('Limit')
+        page = []
+        size = 0
+
+        for item in item_list[start:]:
+            size += len(json.dumps(item))
+
+            if (limit is not None and len(page) >= limit) or (page and size > DYNAMODB_PAGE_BYTE):
+                break
+
+            page.append(item)
+
+        response = {'Items': page, 'Count': len(page), 'ScannedCount': len(page)}
+
+        if start + len(page) < len(item_list):
+            response['LastEvaluatedKey'] = {key_name: page[-1][key_name] for key_name in key_name_list}
+
+        return response
+
+    def dynamodb_GetItem(self, request):
+        key, item = self.get_item(request['TableName'], request['Key'])
+        return 200, {} if item is None else {'Item': copy.deepcopy(item)}
+
+    def dynamodb_PutItem(self, request):
+        table_name = request['TableName']
+        item = request['Item']
+        key, stored = self.get_item(table_name, item)
+
+        # put_state_if_changed 의 조건 : 없거나 Value 가 다를 때만 쓴다
+        if 'ConditionExpression' in request and stored is not None and stored.get('Value') == item.get('Value'):
+            return self.error('ConditionalCheckFailedException', 'The conditional request failed')
+
+        self.put_item(table_name, item)
+
+        return 200, {}
+
+    def dynamodb_DeleteItem(self, request):
+        key, item = self.get_item(request['TableName'], request['Key'])
+        self.table_map[request['TableName']].pop(key, None)
+
+        return 200, {}
+
+    def dynamodb_UpdateItem(self, request):
+        table_name = request['TableName']
+        key, item = self.get_item(table_name, request['Key'])
+        item = dict(request['Key']) if item is None else item
+        value_map = request.get('ExpressionAttributeValues', {})
+        expression = request['UpdateExpression']
+        updated = {}
+
+        for attribute_name, value_name in re.findall(r'ADD (\w+) (:\w+)', expression):
+            current = float(item.get(attribute_name, {'N': '0'})['N'])
+            number = current + float(value_map[value_name]['N'])
+            updated[attribute_name] = {'N': str(int(number) if number.is_integer() else number)}
+
+        for attribute_name, value_name in re.findall(r'(\w+)\s*=\s*(:\w+)', expression):
+            updated[attribute_name] = value_map[value_name]
+
+        item.update(updated)
+        self.put_item(table_name, item)
+
+        return 200, {'Attributes': copy.deepcopy(updated)}
+
+    def dynamodb_Scan(self, request):
+        table_name = request['TableName']
+        item_list = list(self.table_map[table_name].values())
+
+        return 200, copy.deepcopy(self.page_item_list(item_list, request, TABLE_KEY_MAP[table_name]))
+
+    def dynamodb_Query(self, request):
+        table_name = request['TableName']
+        name_map = request.get('ExpressionAttributeNames', {})
+        value_map = request.get('ExpressionAttributeValues', {})
+        expression = request['KeyConditionExpression']
+        condition_list = []
+
+        for name, value in re.findall(r'(#\w+) = (:\w+)', expression):
+            condition_list.append((name_map[name], lambda v, expected=value_map[value]: v == expected))
+
+        for name, value in re.findall(r'begins_with\((#\w+), (:\w+)\)', expression):
+            condition_list.append((name_map[name], lambda v, prefix=value_map[value]['S']:
+                                   v is not None and v.get('S', '').startswith(prefix)))
+
+        key_name_list = INDEX_KEY_MAP[request['IndexName']] if 'IndexName' in request else TABLE_KEY_MAP[table_name]
+        item_list = [item for item in self.table_map[table_name].values()
+                     if all(check(item.get(name)) for name, check in condition_list)]
+
+        if len(key_name_list) > 1:
+            item_list.sort(key=lambda item: item[key_name_list[1]].get('S', ''))
+
+        return 200, copy.deepcopy(self.page_item_list(item_list, request, key_name_list))
+
+    def dynamodb_BatchGetItem(self, request):
+        response = {}
+
+        for table_name, table_request in request['RequestItems'].items():
+            response[table_name] = []
+
+            for key_item in table_request['Keys']:
+                key, item = self.get_item(table_name, key_item)
+
+                if item is not None:
+                    response[table_name].append(copy.deepcopy(item))
+
+        return 200, {'Responses': response, 'UnprocessedKeys': {}}
+
+    def dynamodb_BatchWriteItem(self, request):
+        for table_name, write_request_list in request['RequestItems'].items():
+            for write_request in write_request_list:
+                if 'PutRequest' in write_request:
+                    self.put_item(table_name, write_request['PutRequest']['Item'])
+                else:
+                    key, item = self.get_item(table_name, write_request['DeleteRequest']['Key'])
+                    self.table_map[table_name].pop(key, None)
+
+        return 200, {'UnprocessedItems': {}}
+
+    # EC2
+
+    @staticmethod
+    def advance(instance_map, get_status, set_status, transition_map):
+        # 상태 변경 요청 후 다음 조회에서 완료된 것으로 본다
+        for instance in instance_map.values():
+            status = get_status(instance)
+
+            if status in transition_map:
+                set_status(instance, transition_map[status])
+
+    def advance_ec2(self):
+        self.advance(self.ec2_instance_map, lambda i: i['State']['Name'],
+                     lambda i, status: i['State'].update({'Name': status}), EC2_TRANSITION_MAP)
+
+    def advance_rds(self):
+        self.advance(self.rds_instance_map, lambda i: i['DBInstanceStatus'],
+                     lambda i, status: i.update({'DBInstanceStatus': status}), RDS_TRANSITION_MAP)
+
+    @staticmethod
+    def match_ec2_filter(instance, ec2_filter):
+        tag_map = {tag['Key']: tag['Value'] for tag in instance.get('Tags', [])}
+
+        if ec2_filter['Name'] == 'tag-key':
+            return any(key in tag_map for key in ec2_filter['Values'])
+        elif ec2_filter['Name'].startswith('tag:'):
+            return tag_map.get(ec2_filter['Name'][len('tag:'):]) in ec2_filter['Values']
+
+        raise NotImplementedError(ec2_filter['Name'])
+
+    def ec2_DescribeInstances(self, request):
+        self.advance_ec2()
+        instance_list = list(self.ec2_instance_map.values())
+
+        if 'InstanceIds' in request:
+            instance_list = [instance for instance in instance_list if instance['InstanceId'] in request['InstanceIds']]
+
+        for ec2_filter in request.get('Filters', []):
+            instance_list = [instance for instance in instance_list if self.match_ec2_filter(instance, ec2_filter)]
+
+        return 200, {'Reservations': [{'Instances': copy.deepcopy(instance_list)}] if instance_list else []}
+
+    def change_ec2_state(self, request, status, response_key):
+        state_list = []
+
+        for instance_id in request['InstanceIds']:
+            instance = self.ec2_instance_map[instance_id]
+            previous = instance['State']['Name']
+            instance['State']['Name'] = status
+            state_list.append({'InstanceId': instance_id, 'PreviousState': {'Name': previous},
+                               'CurrentState': {'Name': status}})
+
+        return 200, {response_key: state_list}
+
+    def ec2_StartInstances(self, request):
+        return self.change_ec2_state(request, 'pending', 'StartingInstances')
+
+    def ec2_StopInstances(self, request):
+        return self.change_ec2_state(request, 'stopping', 'StoppingInstances')
+
+    # RDS
+
+    def rds_DescribeDBInstances(self, request):
+        self.advance_rds()
+        instance_list = list(self.rds_instance_map.values())
+
+        for rds_filter in request.get('Filters', []):
+            if rds_filter['Name'] == 'db-instance-id':
+                instance_list = [instance for instance in instance_list
+                                 if instance['DBInstanceIdentifier'] in rds_filter['Values']]
+
+        start = int(request.get('Marker', '0'))
+        page_size = request.get('MaxRecords', RDS_PAGE_SIZE)
+        response = {'DBInstances': copy.deepcopy(instance_list[start:start + page_size])}
+
+        if start + page_size < len(instance_list):
+            response['Marker'] = str(start + page_size)
+
+        return 200, response
+
+    def change_rds_status(self, request, status):
+        instance = self.rds_instance_map[request['DBInstanceIdentifier']]
+        instance['DBInstanceStatus'] = status
+
+        return 200, {'DBInstance': copy.deepcopy(instance)}
+
+    def rds_StartDBInstance(self, request):
+        return self.change_rds_status(request, 'starting')
+
+    def rds_StopDBInstance(self, request):
+        return self.change_rds_status(request, 'stopping')
+
+    def rds_ListTagsForResource(self, request):
+        for instance in self.rds_instance_map.values():
+            if instance['DBInstanceArn'] == request['ResourceName']:
+                return 200, {'TagList': copy.deepcopy(instance.get('TagList', []))}
+
+        return self.error('DBInstanceNotFound')
+
+    def tagging_GetResources(self, request):
+        return 200, {'ResourceTagMappingList': [
+            {'ResourceARN': instance['DBInstanceArn'], 'Tags': copy.deepcopy(instance.get('TagList', []))}
+            for instance in self.rds_instance_map.values()]}
+
+
+def build_fleet(fake_aws, size, seed, now):
+    # 일부 스케쥴은 now 에 시작 / 중지 / 중지 알림 대상이 되도록 시간을 정한다
+    rand = random.Random(seed)
+    days_active_list = ['all', 'weekdays', 'mon,wed,fri', 'sat,sun']
+    ymd = now.strftime('%Y-%m-%d')
+
+    def hm(minute_delta):
+        return (now + timedelta(minutes=minute_delta)).strftime('%H:%M')
+
+    for i in range(size):
+        schedule_name = 'schedule-{0:04d}'.format(i)
+        kind = 'start' if i == 0 else rand.choice(['start', 'stop', 'alert', 'idle', 'idle', 'idle'])
+
+        if kind == 'start':
+            start_time, stop_time, status = hm(-rand.randrange(0, 45)), hm(9 * 60), 'stopped'
+        elif kind == 'stop':
+            start_time, stop_time, status = hm(-9 * 60), hm(-rand.randrange(0, 45)), 'running'
+        elif kind == 'alert':
+            start_time, stop_time, status = hm(-9 * 60), hm(rand.randrange(1, 10)), 'running'
+        else:
+            start_time, stop_time = hm(rand.randrange(2, 12) * 60), hm(rand.randrange(13, 20) * 60)
+            status = rand.choice(['running', 'stopped'])
+
+        fake_aws.put_item('Schedule', to_wire_item({
+            'ScheduleName': schedule_name,
+            'TagValue': schedule_name,
+            'DaysActive': 'all' if kind != 'idle' else rand.choice(days_active_list),
+            'Enabled': kind != 'idle' or rand.random() < 0.9,
+            'StartTime': start_time if rand.random() < 0.95 else 'None',
+            'StopTime': stop_time if rand.random() < 0.95 else 'None',
+            'ForceStart': False
+        }))
+
+        is_group_schedule = i % 3 == 0
+        group_list = SERVER_GROUP_TEMPLATE_LIST[:rand.randint(2, 4)] if is_group_schedule else []
+
+        for group_name, instance_type, dependency_list in group_list:
+            fake_aws.put_item('ScheduleServerGroupV2', to_wire_item({
+                'ScheduleName': schedule_name,
+                'GroupName': group_name,
+                'InstanceType': instance_type,
+                'Dependency': dependency_list
+            }))
+
+        ec2_group_name_list = [group[0] for group in group_list if group[1] == 'EC2'] or [None]
+        rds_count = rand.randint(1, 2) if is_group_schedule else rand.randint(0, 2)
+
+        for j in range(rand.randint(1, 8)):
+            tag_list = [{'Key': 'ScheduleName', 'Value': schedule_name},
+                        {'Key': 'Name', 'Value': '{0}-ec2-{1}'.format(schedule_name, j)}]
+            group_name = ec2_group_name_list[j % len(ec2_group_name_list)]
+
+            if group_name is not None:
+                tag_list.append({'Key': 'ScheduleGroupName', 'Value': group_name})
+
+            instance_id = 'i-{0:08x}{1:02d}'.format(i, j)
+            fake_aws.ec2_instance_map[instance_id] = {
+                'InstanceId': instance_id,
+                'InstanceType': 't3.micro',
+                'PrivateIpAddress': '10.0.{0}.{1}'.format(i % 256, j),
+                'Placement': {'AvailabilityZone': 'ap-northeast-2a'},
+                'State': {'Name': status},
+                'Tags': tag_list
+            }
+
+        for j in range(rds_count):
+            instance_id = '{0}-rds-{1}'.format(schedule_name, j)
+            tag_list = [{'Key': 'ScheduleName', 'Value': schedule_name}]
+
+            if is_group_schedule:
+                tag_list.append({'Key': 'ScheduleGroupName', 'Value': 'db'})
+
+            fake_aws.rds_instance_map[instance_id] = {
+                'DBInstanceIdentifier': instance_id,
+                'DBInstanceArn': 'arn:aws:rds:ap-northeast-2:000000000000:db:' + instance_id,
+                'DBInstanceClass': 'db.t3.micro',
+                'Engine': 'mysql',
+                'Endpoint': {'Address': instance_id + '.fake.rds.amazonaws.com', 'Port': 3306},
+                'DBInstanceStatus': 'available' if status == 'running' else 'stopped',
+                'TagList': tag_list
+            }
+
+        # 오늘 예외와 다른 날짜의 예외를 섞는다
+        for exception_date_ymd in [ymd, (now + timedelta(days=rand.randint(1, 30))).strftime('%Y-%m-%d')]:
+            if rand.random() < 0.15:
+                exception_type = rand.choice(['start', 'stop'])
+                fake_aws.put_item('ScheduleExceptionV2', to_wire_item({
+                    'ScheduleName': schedule_name,
+                    'ExceptionKey': '{0}#{1}'.format(exception_date_ymd, exception_type),
+                    'ExceptionDate': exception_date_ymd,
+                    'ExceptionType': exception_type,
+                    'ExceptionValue': hm(rand.randrange(-60, 600, 15))
+                }))
+
+
+class WebhookSinkHandler(BaseHTTPRequestHandler):
+    received_count = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+
+        with WebhookSinkHandler.lock:
+            WebhookSinkHandler.received_count += 1
+
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_webhook_sink():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), WebhookSinkHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return 'http://127.0.0.1:{0}/webhook'.format(server.server_port)
+
+
+class FakeContext:
+    # 서버 그룹 시작 / 중지 대기를 하도록 Lambda 남은 실행시간을 넉넉하게 준다
+    invoked_function_arn = 'arn:aws:lambda:ap-northeast-2:000000000000:function:benchmark'
+
+    @staticmethod
+    def get_remaining_time_in_millis():
+        return 300000
+
+
+def build_bot_event(command):
+    return {
+        'httpMethod': 'POST',
+        'body': json.dumps({
+            'token': os.environ['OUTGOING_WEBHOOK_TOKEN'],
+            'keyword': 'scheduler',
+            'text': '/scheduler ' + command
+        })
+    }
+
+
+def run_child(args):
+    os.environ['WEBHOOK_URL'] = start_webhook_sink()
+    now = datetime.strptime(args.now, '%Y-%m-%dT%H:%M')
+    fake_aws = FakeAws(args.latency_ms / 1000.0)
+    build_fleet(fake_aws, args.size, args.seed, now)
+
+    sys.path.insert(0, FUNCTION_DIR)
+    import main
+
+    class FrozenDateTime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.combine(now.date(), now.time())
+
+    # 실행 시각을 고정하여 매번 같은 스케쥴이 대상이 되도록 한다
+    main.datetime = FrozenDateTime
+    origin_get_session = main.AwsSession.get_session
+
+    def get_session():
+        is_created = main.AwsSession.session is None
+        session = origin_get_session()
+
+        if is_created:
+            fake_aws.install(session)
+
+        return session
+
+    main.AwsSession.get_session = staticmethod(get_session)
+    command = dict(SCENARIO_LIST)[args.child]
+    context = FakeContext()
+
+    origin_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        # 두번째 실행 / Bot 명령은 스케쥴러가 한번 실행되어 캐시와 스냅샷이 있는 상태에서 측정한다
+        if args.child != 'tick':
+            main.handle({}, context)
+
+        fake_aws.call_counter.clear()
+        WebhookSinkHandler.received_count = 0
+
+        if args.trace_memory:
+            tracemalloc.start()
+
+        start = time.perf_counter()
+        main.handle(build_bot_event(command) if command else {}, context)
+        wall_second = time.perf_counter() - start
+
+        peak_byte = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+        main.WEBHOOK_DISPATCHER.flush(main.WEBHOOK_FLUSH_TIMEOUT_SECOND)
+    finally:
+        sys.stdout.close()
+        sys.stdout = origin_stdout
+
+    call_count_map = dict(fake_aws.call_counter)
+    call_count_map['webhook.Post'] = WebhookSinkHandler.received_count
+
+    print(json.dumps({
+        'WallSecond': wall_second,
+        'PeakMemoryKB': None if peak_byte is None else peak_byte / 1024.0,
+        'CallCountMap': call_count_map
+    }))
+
+
+def run_scenario(args, name, env, trace_memory=False):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--size', str(args.size),
+               '--seed', str(args.seed), '--now', args.now, '--latency-ms', str(args.latency_ms)]
+
+    if trace_memory:
+        command.append('--trace-memory')
+
+    output = subprocess.check_output(command, env=env)
+
+    return json.loads(output.decode('utf-8').strip().splitlines()[-1])
+
+
+def get_config(args) -> dict:
+    return {'Size': args.size, 'Seed': args.seed, 'Now': args.now, 'LatencyMs': args.latency_ms}
+
+
+def compare(report, baseline, max_regression) -> list:
+    # 호출 수는 같은 설정이면 항상 같으므로 늘어나면 회귀로 보고, 시간 / 메모리는 max_regression 비율까지 허용한다
+    regression_list = []
+
+    for name, result in report.items():
+        if name not in baseline:
+            continue
+
+        base = baseline[name]
+
+        for operation, count in sorted(result['CallCountMap'].items()):
+            base_count = base['CallCountMap'].get(operation, 0)
+
+            if count > base_count:
+                regression_list.append('{0} : {1} calls {2} -> {3}'.format(name, operation, base_count, count))
+
+        for key in ['WallSecond', 'PeakMemoryKB']:
+            if not base.get(key) or not result.get(key):
+                continue
+
+            if key == 'WallSecond' and result[key] - base[key] < MIN_WALL_REGRESSION_SECOND:
+                continue
+
+            if result[key] > base[key] * (1 + max_regression):
+                regression_list.append('{0} : {1} {2:.1f} -> {3:.1f}'.format(
+                    name, key, base[key] * (1000 if key == 'WallSecond' else 1),
+                    result[key] * (1000 if key == 'WallSecond' else 1)))
+
+    return regression_list
+
+
+def format_delta(value, base_value):
+    if not base_value:
+        return '{0:>8}'.format('-')
+
+    return '{0:>+7.0f}%'.format((value / base_value - 1) * 100)
+
+
+def run_parent(args):
+    env = dict(os.environ)
+    env.update({
+        'OUTGOING_WEBHOOK_TOKEN': 'benchmark',
+        'STOP_ALERT_BEFORE_TIME_MINUTE': '10',
+        'AWS_DEFAULT_REGION': 'ap-northeast-2',
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'BOT_ASYNC_MODE': 'local',
+        'SERVER_GROUP_WAIT_DELAY_SECOND': '0',
+        'PYTHONWARNINGS': 'ignore'
+    })
+
+    name_list = [name for name, command in SCENARIO_LIST
+                 if not args.scenarios or name in args.scenarios.split(',')]
+    report = OrderedDict()
+
+    for name in name_list:
+        result_list = [run_scenario(args, name, env) for i in range(args.runs)]
+        memory_result = run_scenario(args, name, env, True)
+
+        if any(result['CallCountMap'] != result_list[0]['CallCountMap'] for result in result_list):
+            print('warning : {0} call counts differ between runs'.format(name))
+
+        report[name] = {
+            'WallSecond': statistics.median(result['WallSecond'] for result in result_list),
+            'PeakMemoryKB': memory_result['PeakMemoryKB'],
+            'CallCountMap': result_list[0]['CallCountMap']
+        }
+
+    baseline = {}
+    baseline_path = args.baseline or (DEFAULT_BASELINE if os.path.exists(DEFAULT_BASELINE) else None)
+
+    if baseline_path and not args.save_baseline:
+        with open(baseline_path) as f:
+            baseline_file = json.load(f)
+
+        if baseline_file['Config'] != get_config(args):
+            print('baseline config {0} differs from {1}, skip comparison'.format(
+                baseline_file['Config'], get_config(args)))
+        else:
+            baseline = baseline_file['Scenarios']
+
+    print('fleet : {0} schedules, seed {1}, now {2}, median of {3} runs'.format(
+        args.size, args.seed, args.now, args.runs))
+    print('{0:<24} {1:>10} {2:>8} {3:>11} {4:>8} {5:>9} {6:>8}'.format(
+        'scenario', 'wall', 'vs base', 'peak', 'vs base', 'aws calls', 'webhook'))
+
+    for name, result in report.items():
+        base = baseline.get(name, {})
+        aws_call_count = sum(count for operation, count in result['CallCountMap'].items()
+                             if not operation.startswith('webhook.'))
+
+        print('{0:<24} {1:8.1f}ms {2} {3:9.0f}KB {4} {5:>9} {6:>8}'.format(
+            name, result['WallSecond'] * 1000, format_delta(result['WallSecond'], base.get('WallSecond')),
+            result['PeakMemoryKB'], format_delta(result['PeakMemoryKB'], base.get('PeakMemoryKB')),
+            aws_call_count, result['CallCountMap'].get('webhook.Post', 0)))
+
+        if args.verbose:
+            for operation, count in sorted(result['CallCountMap'].items()):
+                base_count = base.get('CallCountMap', {}).get(operation)
+                print('    {0:<36} {1:>6}{2}'.format(
+                    operation, count, '' if base_count in [None, count] else ' (base {0})'.format(base_count)))
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump({'Config': get_config(args), 'Scenarios': report}, f, indent=2, sort_keys=True)
+            f.write('\n')
+
+        print('baseline saved : ' + args.save_baseline)
+        return 0
+
+    regression_list = compare(report, baseline, args.max_regression)
+
+    for regression in regression_list:
+        print('regression : ' + regression)
+
+    return 1 if regression_list and args.fail_on_regression else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scheduler tick and bot commands on a synthetic fleet')
+    parser.add_argument('--size', type=int, default=200, help='number of schedules')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--now', default='2024-01-10T09:00', help='frozen scheduler time (YYYY-MM-DDTHH:MM)')
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--latency-ms', type=float, default=0, help='simulated latency per AWS call')
+    parser.add_argument('--scenarios', default=None, help='comma separated scenario names')
+    parser.add_argument('--baseline', default=None, help='compare with this baseline file')
+    parser.add_argument('--save-baseline', default=None, help='write the results as a baseline file')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='allowed wall time / memory increase')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    parser.add_argument('--verbose', action='store_true', help='print call counts per operation')
+    parser.add_argument('--child', choices=[name for name, command in SCENARIO_LIST], help=argparse.SUPPRESS)
+    parser.add_argument('--trace-memory', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args)
+    else:
+        sys.exit(run_parent(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# 스케쥴 수에 따라 시작 / 중지 / 중지 알림 판단에 걸리는 시간을 비교한다
+#
+#   $ python benchmarks/schedule_spec.py --sizes 100,1000,10000
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+
+def load_main():
+    os.environ.setdefault('WEBHOOK_URL', 'http://127.0.0.1/webhook')
+    os.environ.setdefault('OUTGOING_WEBHOOK_TOKEN', 'benchmark')
+    os.environ.setdefault('STOP_ALERT_BEFORE_TIME_MINUTE', '10')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-2')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions',
+                                    'awsInstanceScheduler'))
+
+    import main
+    return main
+
+
+def build_item_list(size, seed):
+    rand = random.Random(seed)
+    days_active_list = ['all', 'weekdays', 'mon,wed,fri', 'sat,sun', 'tue']
+
+    def random_hm():
+        if rand.random() < 0.1:
+            return 'None'
+
+        return '{0:02d}:{1:02d}'.format(rand.randrange(24), rand.choice([0, 15, 30, 45]))
+
+    return [{
+        'ScheduleName': 'schedule-{0}'.format(i),
+        'Enabled': rand.random() < 0.9,
+        'ForceStart': rand.random() < 0.01,
+        'DaysActive': rand.choice(days_active_list),
+        'StartTime': random_hm(),
+        'StopTime': random_hm()
+    } for i in range(size)]
+
+
+def evaluate_legacy(main, item_list, now):
+    # 이전 방식 : 매번 DaysActive 와 StartTime / StopTime 문자열을 해석한다
+    due_list = []
+    week_day = now.strftime('%a').lower()
+    window_start = now - timedelta(minutes=59)
+
+    for item in item_list:
+        if item['ForceStart']:
+            due_list.append(True)
+            continue
+
+        if not item['Enabled'] or not main.ScheduleUtil.is_active_week_day(item['DaysActive'], week_day):
+            due_list.append(False)
+            continue
+
+        start = None if item['StartTime'] == 'None' else main.ScheduleUtil.hm_to_date_time(item['StartTime'])
+        stop = None if item['StopTime'] == 'None' else main.ScheduleUtil.hm_to_date_time(item['StopTime'])
+        is_due = start is not None and window_start <= start <= now
+
+        if stop is not None:
+            remain = int(round(main.ScheduleUtil.get_diff_minute(stop, now)))
+            is_due = is_due or window_start <= stop <= now or 0 < remain <= main.STOP_ALERT_BEFORE_TIME_MINUTE
+
+        due_list.append(is_due)
+
+    return due_list
+
+
+def measure(fn, repeat):
+    best = None
+    result = None
+
+    for i in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark compiled schedule specs')
+    parser.add_argument('--sizes', default='100,1000,10000')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    scheduler = load_main()
+    now = datetime.now()
+    is_numpy_available = scheduler.ScheduleSpecEvaluator.get_numpy() is not None
+
+    print('numpy : {0}'.format('available' if is_numpy_available else 'not installed'))
+    print('{0:>8} {1:>12} {2:>12} {3:>12} {4:>12}'.format('size', 'legacy', 'compile', 'spec loop', 'vectorized'))
+
+    for size in [int(size) for size in args.sizes.split(',')]:
+        item_list = build_item_list(size, args.seed)
+
+        legacy_elapsed, legacy_due_list = measure(lambda: evaluate_legacy(scheduler, item_list, now), args.repeat)
+        compile_elapsed, spec_list = measure(
+            lambda: [scheduler.ScheduleSpec.compile(item) for item in item_list], args.repeat)
+        loop_elapsed, loop_due_list = measure(lambda: [spec.is_due(now) for spec in spec_list], args.repeat)
+
+        if is_numpy_available:
+            # 작은 크기에서도 numpy 경로를 측정한다
+            scheduler.ScheduleSpecEvaluator.vectorize_min_size = 0
+            evaluator = scheduler.ScheduleSpecEvaluator(spec_list)
+            vector_elapsed, vector_due_list = measure(lambda: evaluator.get_due_list(now), args.repeat)
+            vectorized = '{0:10.2f}ms'.format(vector_elapsed * 1000)
+        else:
+            vector_due_list = loop_due_list
+            vectorized = '{0:>12}'.format('-')
+
+        if not legacy_due_list == loop_due_list == vector_due_list:
+            print('result mismatch at size {0}'.format(size))
+
+        print('{0:>8} {1:10.2f}ms {2:10.2f}ms {3:10.2f}ms {4}'.format(
+            size, legacy_elapsed * 1000, compile_elapsed * 1000, loop_elapsed * 1000, vectorized))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# 새 python 프로세스에서 main.py import 시간과 첫 / 두번째 handle 실행 시간을 경로별로 측정한다
+# AWS 호출은 botocore before-call hook 에서 가짜 응답을 돌려주므로 AWS 계정 없이 실행된다
+#
+#   $ python benchmarks/startup.py --runs 5
+#   $ python benchmarks/startup.py --runs 5 --json startup.json
+import argparse
+import copy
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+FUNCTION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions', 'awsInstanceScheduler')
+PATH_LIST = ['scheduler', 'bot', 'bot-status']
+SCHEDULE_NAME = 'benchmark'
+
+
+class WebhookSinkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def start_webhook_sink():
+    # 웹훅 전송 재시도가 측정에 섞이지 않도록 바로 응답하는 로컬 서버로 보낸다
+    server = HTTPServer(('127.0.0.1', 0), WebhookSinkHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return 'http://127.0.0.1:{0}/webhook'.format(server.server_port)
+
+
+def build_fake_response_map():
+    schedule_item = {
+        'ScheduleName': {'S': SCHEDULE_NAME},
+        'TagValue': {'S': SCHEDULE_NAME},
+        'Enabled': {'BOOL': True},
+        'ForceStart': {'BOOL': False},
+        'DaysActive': {'S': 'all'},
+        # 실행할 때마다 시작 시간이 되도록 현재 시각으로 설정한다
+        'StartTime': {'S': time.strftime('%H:%M')},
+        'StopTime': {'S': 'None'}
+    }
+
+    snapshot_item = {
+        'StateKey': {'S': 'Inventory#' + SCHEDULE_NAME},
+        'CapturedAt': {'N': str(int(time.time()))},
+        'Snapshot': {'S': json.dumps({'EC2': [['benchmark-1', 'running', None]], 'RDS': []})}
+    }
+
+    return {
+        'GetItem': {'Item': {'StateKey': {'S': 'ConfigVersion'}, 'Version': {'N': '1'}}},
+        'GetItem#Inventory': {'Item': snapshot_item},
+        'GetItem#Schedule': {'Item': schedule_item},
+        'Scan': {'Items': [], 'Count': 0, 'ScannedCount': 0},
+        'Scan#Schedule': {'Items': [schedule_item], 'Count': 1, 'ScannedCount': 1},
+        'Query': {'Items': [], 'Count': 0, 'ScannedCount': 0},
+        'UpdateItem': {'Attributes': {}},
+        'PutItem': {},
+        'DescribeInstances': {'Reservations': []},
+        'DescribeDBInstances': {'DBInstances': []},
+        'GetResources': {'ResourceTagMappingList': []},
+        'ListTagsForResource': {'TagList': []}
+    }
+
+
+def run_child(path):
+    os.environ['WEBHOOK_URL'] = start_webhook_sink()
+
+    start = time.perf_counter()
+    sys.path.insert(0, FUNCTION_DIR)
+    import main
+    import_second = time.perf_counter() - start
+
+    from botocore.awsrequest import AWSResponse
+    fake_response_map = build_fake_response_map()
+
+    def fake_aws_call(model, params, **kwargs):
+        operation_name = model.name
+
+        # 같은 operation 이라도 Table / Key 에 따라 다른 응답을 돌려준다
+        if operation_name == 'GetItem' and b'Inventory#' in params['body']:
+            operation_name = 'GetItem#Inventory'
+        elif operation_name == 'GetItem' and json.loads(params['body'].decode('utf-8'))['TableName'] == 'Schedule':
+            operation_name = 'GetItem#Schedule'
+        elif operation_name == 'Scan' and json.loads(params['body'].decode('utf-8'))['TableName'] == 'Schedule':
+            operation_name = 'Scan#Schedule'
+
+        response = AWSResponse('https://fake.amazonaws.com', 200, {}, None)
+
+        return response, copy.deepcopy(fake_response_map[operation_name])
+
+    # 공유 Session 이 만들어질 때 hook 을 등록하여 이후 만들어지는 모든 client 에 적용한다
+    origin_get_session = main.AwsSession.get_session
+
+    def get_session():
+        is_created = main.AwsSession.session is None
+        session = origin_get_session()
+
+        if is_created:
+            session.events.register('before-call.*.*', fake_aws_call)
+
+        return session
+
+    main.AwsSession.get_session = staticmethod(get_session)
+
+    if path == 'scheduler':
+        event = {}
+    else:
+        command = 'exception info' if path == 'bot' else 'status'
+        event = {
+            'httpMethod': 'POST',
+            'body': json.dumps({
+                'token': os.environ['OUTGOING_WEBHOOK_TOKEN'],
+                'keyword': 'scheduler',
+                'text': '/scheduler {0} {1}'.format(SCHEDULE_NAME, command)
+            })
+        }
+
+    origin_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        start = time.perf_counter()
+        main.handle(event, None)
+        first_second = time.perf_counter() - start
+
+        start = time.perf_counter()
+        main.handle(event, None)
+        warm_second = time.perf_counter() - start
+    finally:
+        sys.stdout.close()
+        sys.stdout = origin_stdout
+
+    # 종료 중에 남은 웹훅 thread 가 닫힌 stdout 에 쓰지 않도록 먼저 비운다
+    main.WEBHOOK_DISPATCHER.flush(main.WEBHOOK_FLUSH_TIMEOUT_SECOND)
+
+    print(json.dumps({
+        'ImportSecond': import_second,
+        'FirstInvocationSecond': first_second,
+        'WarmInvocationSecond': warm_second,
+        'LoadedModuleList': [module for module in ['requests', 'numpy'] if module in sys.modules]
+    }))
+
+
+def run_parent(args):
+    env = dict(os.environ)
+    env.update({
+        'OUTGOING_WEBHOOK_TOKEN': 'benchmark',
+        'STOP_ALERT_BEFORE_TIME_MINUTE': '10',
+        'AWS_DEFAULT_REGION': 'ap-northeast-2',
+        # 자격증명 탐색이 instance metadata 를 기다리지 않도록 가짜 키를 사용한다
+        'AWS_ACCESS_KEY_ID': 'benchmark',
+        'AWS_SECRET_ACCESS_KEY': 'benchmark',
+        'PYTHONDONTWRITEBYTECODE': '',
+        'PYTHONWARNINGS': 'ignore'
+    })
+
+    report = {}
+
+    for path in args.paths.split(','):
+        result_list = []
+
+        for i in range(args.runs):
+            output = subprocess.check_output([sys.executable, os.path.abspath(__file__), '--child', path], env=env)
+            result_list.append(json.loads(output.decode('utf-8').strip().splitlines()[-1]))
+
+        report[path] = {
+            'ImportSecond': statistics.median(result['ImportSecond'] for result in result_list),
+            'FirstInvocationSecond': statistics.median(result['FirstInvocationSecond'] for result in result_list),
+            'WarmInvocationSecond': statistics.median(result['WarmInvocationSecond'] for result in result_list),
+            'LoadedModuleList': result_list[-1]['LoadedModuleList']
+        }
+
+    print('median of {0} runs'.format(args.runs))
+    print('{0:>12} {1:>10} {2:>10} {3:>10}  {4}'.format('path', 'import', 'first', 'warm', 'loaded'))
+
+    for path, result in report.items():
+        print('{0:>12} {1:8.1f}ms {2:8.1f}ms {3:8.1f}ms  {4}'.format(
+            path, result['ImportSecond'] * 1000, result['FirstInvocationSecond'] * 1000,
+            result['WarmInvocationSecond'] * 1000, ', '.join(result['LoadedModuleList']) or '-'))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure cold start of the scheduler and bot entry paths')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--paths', default=','.join(PATH_LIST))
+    parser.add_argument('--json', default=None, help='write the median results to this file')
+    parser.add_argument('--child', choices=PATH_LIST, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child)
+    else:
+        run_parent(args)
+
+
+if __name__ == '__main__':
+    main()
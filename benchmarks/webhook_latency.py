@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# 느린 웹훅 서버를 띄우고 JandiWebhook 메세지 전송이 스케쥴 실행을 얼마나 막는지 측정한다
+#
+#   $ python benchmarks/webhook_latency.py --delay 0.5 --messages 20
+import argparse
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import requests
+
+
+class SlowWebhookHandler(BaseHTTPRequestHandler):
+    delay = 0.0
+    received_count = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(SlowWebhookHandler.delay)
+
+        with SlowWebhookHandler.lock:
+            SlowWebhookHandler.received_count += 1
+
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def start_server(delay):
+    SlowWebhookHandler.delay = delay
+    server = ThreadingHTTPServer(('127.0.0.1', 0), SlowWebhookHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    return server, 'http://127.0.0.1:{0}/webhook'.format(server.server_port)
+
+
+def load_main(webhook_url):
+    os.environ['WEBHOOK_URL'] = webhook_url
+    os.environ.setdefault('OUTGOING_WEBHOOK_TOKEN', 'benchmark')
+    os.environ.setdefault('STOP_ALERT_BEFORE_TIME_MINUTE', '10')
+    os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-2')
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions',
+                                    'awsInstanceScheduler'))
+
+    import main
+    return main
+
+
+def run_blocking(webhook_url, message_count):
+    # 기존 방식 : 메세지마다 requests.post 를 기다린다
+    start = time.time()
+
+    for i in range(message_count):
+        requests.post(webhook_url, data='{}')
+
+    return time.time() - start
+
+
+def run_dispatcher(main, message_count):
+    start = time.time()
+
+    for i in range(message_count):
+        main.JandiWebhook.send_ok_message('benchmark message {0}'.format(i))
+
+    submit_elapsed = time.time() - start
+    is_flushed = main.WEBHOOK_DISPATCHER.flush(main.WEBHOOK_FLUSH_TIMEOUT_SECOND)
+
+    return submit_elapsed, time.time() - start, is_flushed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure scheduler latency caused by a slow webhook endpoint')
+    parser.add_argument('--delay', type=float, default=0.5, help='webhook response delay in seconds')
+    parser.add_argument('--messages', type=int, default=20)
+    args = parser.parse_args()
+
+    server, webhook_url = start_server(args.delay)
+    scheduler = load_main(webhook_url)
+
+    blocking_elapsed = run_blocking(webhook_url, args.messages)
+
+    # 메세지 body 출력은 측정에서 제외한다
+    origin_stdout = sys.stdout
+    sys.stdout = open(os.devnull, 'w')
+
+    try:
+        submit_elapsed, flush_elapsed, is_flushed = run_dispatcher(scheduler, args.messages)
+    finally:
+        sys.stdout.close()
+        sys.stdout = origin_stdout
+
+    server.shutdown()
+
+    print('messages : {0}, webhook delay : {1}s, concurrency : {2}'.format(
+        args.messages, args.delay, scheduler.WEBHOOK_CONCURRENCY))
+    print('blocking requests.post  : {0:.3f}s'.format(blocking_elapsed))
+    print('dispatcher submit       : {0:.3f}s'.format(submit_elapsed))
+    print('dispatcher submit+flush : {0:.3f}s (flushed : {1})'.format(flush_elapsed, is_flushed))
+    print('received : {0}'.format(SlowWebhookHandler.received_count))
+
+
+if __name__ == '__main__':
+    main()
@@ -5,12 +5,18 @@ import os
 import time
 import uuid
 import traceback
-import requests
 import json
+import threading
+import queue
+import random
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 
 import boto3
-from boto3.dynamodb.conditions import Attr
+from boto3.dynamodb.conditions import Attr, Key
+from botocore.exceptions import ClientError
 
 os.environ['TZ'] = 'Asia/Seoul'
 time.tzset()
@@ -18,6 +24,66 @@ time.tzset()
 WEBHOOK_URL = os.environ['WEBHOOK_URL']
 OUTGOING_WEBHOOK_TOKEN = os.environ['OUTGOING_WEBHOOK_TOKEN']
 STOP_ALERT_BEFORE_TIME_MINUTE = int(os.environ['STOP_ALERT_BEFORE_TIME_MINUTE'])
+WEBHOOK_CONCURRENCY = int(os.environ.get('WEBHOOK_CONCURRENCY', '2'))
+WEBHOOK_CONNECT_TIMEOUT_SECOND = float(os.environ.get('WEBHOOK_CONNECT_TIMEOUT_SECOND', '3'))
+WEBHOOK_READ_TIMEOUT_SECOND = float(os.environ.get('WEBHOOK_READ_TIMEOUT_SECOND', '10'))
+WEBHOOK_MAX_ATTEMPTS = int(os.environ.get('WEBHOOK_MAX_ATTEMPTS', '3'))
+# Lambda 종료 전 남은 웹훅 메세지를 보내기 위해 기다리는 최대 시간
+WEBHOOK_FLUSH_TIMEOUT_SECOND = float(os.environ.get('WEBHOOK_FLUSH_TIMEOUT_SECOND', '30'))
+# true 이면 실행 중의 알림을 모아서 실행이 끝날 때 요약 메세지로 보내고 중지 알림은 한번만 보낸다
+NOTIFICATION_DIGEST = os.environ.get('NOTIFICATION_DIGEST', 'false').lower() == 'true'
+NOTIFICATION_DIGEST_MAX_LENGTH = int(os.environ.get('NOTIFICATION_DIGEST_MAX_LENGTH', '4000'))
+
+SCHEDULE_SERVER_GROUP_TABLE = os.environ.get('SCHEDULE_SERVER_GROUP_TABLE', 'ScheduleServerGroupV2')
+SCHEDULE_EXCEPTION_TABLE = os.environ.get('SCHEDULE_EXCEPTION_TABLE', 'ScheduleExceptionV2')
+SCHEDULE_EXCEPTION_DATE_INDEX = os.environ.get('SCHEDULE_EXCEPTION_DATE_INDEX', 'ExceptionDate-index')
+SCHEDULE_STATE_TABLE = os.environ.get('SCHEDULE_STATE_TABLE', 'ScheduleState')
+SCHEDULE_CONCURRENCY = int(os.environ.get('SCHEDULE_CONCURRENCY', '4'))
+# 0 이면 DynamoDB 기본 페이지 크기(1MB)를 사용한다
+DYNAMODB_SCAN_PAGE_SIZE = int(os.environ.get('DYNAMODB_SCAN_PAGE_SIZE', '0'))
+DYNAMODB_SCAN_TOTAL_SEGMENTS = int(os.environ.get('DYNAMODB_SCAN_TOTAL_SEGMENTS', '1'))
+# Lambda 종료 전 정리작업을 위해 남겨두는 시간
+LAMBDA_TIME_RESERVE_SECOND = int(os.environ.get('LAMBDA_TIME_RESERVE_SECOND', '30'))
+SERVER_GROUP_WAIT_DELAY_SECOND = int(os.environ.get('SERVER_GROUP_WAIT_DELAY_SECOND', '5'))
+SERVER_GROUP_WAIT_MAX_DELAY_SECOND = int(os.environ.get('SERVER_GROUP_WAIT_MAX_DELAY_SECOND', '30'))
+SERVER_GROUP_CONCURRENCY = int(os.environ.get('SERVER_GROUP_CONCURRENCY', '4'))
+RDS_ACTION_CONCURRENCY = int(os.environ.get('RDS_ACTION_CONCURRENCY', '8'))
+EC2_ACTION_CHUNK_SIZE = int(os.environ.get('EC2_ACTION_CHUNK_SIZE', '50'))
+EC2_ACTION_CONCURRENCY = int(os.environ.get('EC2_ACTION_CONCURRENCY', '4'))
+ACTION_RETRY_MAX_ATTEMPTS = int(os.environ.get('ACTION_RETRY_MAX_ATTEMPTS', '5'))
+ACTION_RETRY_BASE_DELAY_SECOND = float(os.environ.get('ACTION_RETRY_BASE_DELAY_SECOND', '1'))
+ACTION_RETRY_MAX_DELAY_SECOND = float(os.environ.get('ACTION_RETRY_MAX_DELAY_SECOND', '20'))
+# 초당 호출 수, {"ec2": 20, "ec2.DescribeInstances": 5} 처럼 서비스 또는 서비스.오퍼레이션 단위로 설정한다
+AWS_RATE_LIMIT = os.environ.get('AWS_RATE_LIMIT', '')
+RDS_TAG_CACHE_TTL_SECOND = int(os.environ.get('RDS_TAG_CACHE_TTL_SECOND', '3600'))
+RDS_TAG_CACHE_MAX_SIZE = int(os.environ.get('RDS_TAG_CACHE_MAX_SIZE', '5000'))
+# none : 메모리(warm container)에만 보관, tmp : /tmp 파일, dynamodb : ScheduleState 테이블
+RDS_TAG_CACHE_STORE = os.environ.get('RDS_TAG_CACHE_STORE', 'none')
+# 버전이 바뀌지 않아도 설정을 다시 읽는 주기, 0 이면 캐시하지 않는다
+CONFIG_CACHE_TTL_SECOND = int(os.environ.get('CONFIG_CACHE_TTL_SECOND', '300'))
+# false 이면 스케쥴별 인스턴스 상태 스냅샷을 저장하지 않고 Bot status 를 항상 실시간으로 조회한다
+INVENTORY_SNAPSHOT = os.environ.get('INVENTORY_SNAPSHOT', 'true').lower() == 'true'
+# 실행할 스케쥴이 없는 실행에서도 스냅샷을 갱신하는 주기, 0 이면 시작 / 중지한 실행에서만 저장한다
+INVENTORY_SNAPSHOT_INTERVAL_SECOND = int(os.environ.get('INVENTORY_SNAPSHOT_INTERVAL_SECOND', '0'))
+INVENTORY_SNAPSHOT_EXPIRE_DAY = int(os.environ.get('INVENTORY_SNAPSHOT_EXPIRE_DAY', '7'))
+# 오래 걸리는 Bot 명령 실행 방식 : off(요청 안에서 실행), lambda(자기 자신을 비동기 호출), local(같은 프로세스에서 실행)
+# lambda / local 은 ScheduleState 테이블이 필요하고 lambda 는 lambda:InvokeFunction 권한도 필요하다
+BOT_ASYNC_MODE = os.environ.get('BOT_ASYNC_MODE', 'off')
+BOT_JOB_EXPIRE_DAY = int(os.environ.get('BOT_JOB_EXPIRE_DAY', '7'))
+# status all 처럼 여러 스케쥴을 모아 보여주는 Bot 응답의 최대 길이
+BOT_MESSAGE_MAX_LENGTH = int(os.environ.get('BOT_MESSAGE_MAX_LENGTH', '4000'))
+# true 이면 실행 단계(config, inventory, decision, dispatch, notification)별 소요시간을 JSON 로그로 출력한다
+TRACE_SPANS = os.environ.get('TRACE_SPANS', 'true').lower() == 'true'
+# 실행 한번을 프로파일링하여 저장한다 : off, cprofile, sample
+PROFILE_MODE = os.environ.get('PROFILE_MODE', 'off').lower()
+# 프로파일링할 실행 : scheduler, bot, bot-job, all
+PROFILE_TARGET = os.environ.get('PROFILE_TARGET', 'scheduler')
+# 프로파일 저장 위치 : 디렉토리 또는 s3://bucket/prefix
+PROFILE_OUTPUT = os.environ.get('PROFILE_OUTPUT', '/tmp')
+PROFILE_SAMPLE_INTERVAL_MS = float(os.environ.get('PROFILE_SAMPLE_INTERVAL_MS', '10'))
+# 실행마다 AWS 호출 집계를 출력하는 형식 : json, emf(CloudWatch Embedded Metric Format), off
+AWS_CALL_STATS_OUTPUT = os.environ.get('AWS_CALL_STATS', 'json').lower()
+AWS_CALL_STATS_NAMESPACE = os.environ.get('AWS_CALL_STATS_NAMESPACE', 'AwsInstanceScheduler')
 
 
 class ScheduleUtil:
@@ -84,14 +150,24 @@ class ScheduleUtil:
         return default_name if not name else name
 
     @staticmethod
-    def equals_rds_schedule_name(rds_tags, tag_value) -> bool:
-        for t in rds_tags['TagList']:
-            if t['Key'] != 'ScheduleName':
-                continue
-            if t['Value'] == tag_value:
-                return True
+    def get_tag_value(tag_list, key):
+        for tag in tag_list:
+            if tag['Key'] == key:
+                return tag['Value']
 
-        return False
+        return None
+
+    @staticmethod
+    def is_active_week_day(days_active, week_day) -> bool:
+        # 매일 작동
+        if days_active == 'all':
+            return True
+        # 월~금만 작동
+        elif days_active == 'weekdays':
+            return week_day in ['mon', 'tue', 'wed', 'thu', 'fri']
+        # 지정요일만 작동 (ex : mon,tue)
+        else:
+            return week_day in [d.lower().strip() for d in days_active.split(',')]
 
     @staticmethod
     def get_diff_minute(d1, d2) -> float:
@@ -105,46 +181,2176 @@ class ScheduleUtil:
         minute = hm.split(':')[1]
         date_time = cur.replace(hour=int(hour), minute=int(minute), second=0, microsecond=0)
 
-        return date_time
+        return date_time
+
+    @staticmethod
+    def replace_time(date_time, hm):
+        split_time = hm.split(':')
+        hour = split_time[0]
+        minute = split_time[1]
+        return date_time.replace(hour=int(hour), minute=int(minute))
+
+    @staticmethod
+    def is_valid_time(hm):
+        try:
+            datetime.strptime(hm, '%H:%M')
+            return True
+        except ValueError:
+            return False
+
+    @staticmethod
+    def is_valid_date(ymd):
+        try:
+            datetime.strptime(ymd, '%Y-%m-%d')
+            return True
+        except ValueError:
+            return False
+
+
+class DynamoReader:
+    # LastEvaluatedKey 를 따라가며 Table 의 모든 Item 을 페이지 단위로 읽어온다
+    segment_done = object()
+
+    @staticmethod
+    def scan(table, page_size=None, total_segments=None, **scan_kwargs):
+        page_size = DYNAMODB_SCAN_PAGE_SIZE if page_size is None else page_size
+        total_segments = DYNAMODB_SCAN_TOTAL_SEGMENTS if total_segments is None else total_segments
+
+        if total_segments > 1:
+            page_iterator = DynamoReader.scan_parallel_pages(table, page_size, total_segments, scan_kwargs)
+        else:
+            page_iterator = DynamoReader.scan_pages(table, page_size, scan_kwargs)
+
+        for page in page_iterator:
+            for item in page:
+                yield item
+
+    @staticmethod
+    def query(table, page_size=None, **query_kwargs):
+        page_size = DYNAMODB_SCAN_PAGE_SIZE if page_size is None else page_size
+
+        for page in DynamoReader.read_pages(table.query, page_size, query_kwargs):
+            for item in page:
+                yield item
+
+    @staticmethod
+    def scan_pages(table, page_size, scan_kwargs, segment=None, total_segments=None):
+        kwargs = dict(scan_kwargs)
+
+        if total_segments is not None:
+            kwargs['Segment'] = segment
+            kwargs['TotalSegments'] = total_segments
+
+        return DynamoReader.read_pages(table.scan, page_size, kwargs)
+
+    @staticmethod
+    def read_pages(operation, page_size, operation_kwargs):
+        kwargs = dict(operation_kwargs)
+
+        if page_size > 0:
+            kwargs['Limit'] = page_size
+
+        while True:
+            response = operation(**kwargs)
+
+            yield response['Items']
+
+            if 'LastEvaluatedKey' not in response:
+                return
+
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    @staticmethod
+    def scan_parallel_pages(table, page_size, total_segments, scan_kwargs):
+        page_queue = queue.Queue(maxsize=total_segments * 2)
+        stop_event = threading.Event()
+
+        def put(value):
+            while not stop_event.is_set():
+                try:
+                    page_queue.put(value, timeout=1)
+                    return
+                except queue.Full:
+                    continue
+
+        def scan_segment(segment):
+            try:
+                for page in DynamoReader.scan_pages(table, page_size, scan_kwargs, segment, total_segments):
+                    if stop_event.is_set():
+                        return
+                    put(page)
+                put(DynamoReader.segment_done)
+            except Exception as e:
+                put(e)
+
+        thread_list = [threading.Thread(target=scan_segment, args=(segment,), daemon=True)
+                       for segment in range(total_segments)]
+
+        for thread in thread_list:
+            thread.start()
+
+        remain_segment_count = total_segments
+
+        try:
+            while remain_segment_count > 0:
+                page = page_queue.get()
+
+                if page is DynamoReader.segment_done:
+                    remain_segment_count -= 1
+                elif isinstance(page, Exception):
+                    raise page
+                else:
+                    yield page
+        finally:
+            stop_event.set()
+
+
+class ScheduleRepository:
+    # ScheduleServerGroup, ScheduleException 은 ScheduleName 을 Partition Key 로 query / get_item 한다
+    db = None
+
+    def __init__(self, db):
+        self.db = db
+
+    @staticmethod
+    def build_exception_key(exception_date_ymd, exception_type) -> str:
+        return '{0}#{1}'.format(exception_date_ymd, exception_type)
+
+    def get_schedule_item(self, schedule_name) -> dict:
+        response = self.db.Table('Schedule').get_item(
+            Key={
+                'ScheduleName': schedule_name
+            }
+        )
+
+        return response['Item'] if 'Item' in response else {}
+
+    def query_schedule_server_group_list(self, schedule_name) -> list:
+        return list(DynamoReader.query(
+            self.db.Table(SCHEDULE_SERVER_GROUP_TABLE),
+            KeyConditionExpression=Key('ScheduleName').eq(schedule_name)
+        ))
+
+    def query_schedule_exception_list(self, schedule_name, exception_date_ymd) -> list:
+        return list(DynamoReader.query(
+            self.db.Table(SCHEDULE_EXCEPTION_TABLE),
+            KeyConditionExpression=Key('ScheduleName').eq(schedule_name) &
+            Key('ExceptionKey').begins_with(exception_date_ymd + '#')
+        ))
+
+    def scan_schedule_list(self) -> list:
+        return list(DynamoReader.scan(self.db.Table('Schedule')))
+
+    def scan_schedule_server_group_map(self) -> dict:
+        schedule_server_group_map = {}
+
+        for server_group in DynamoReader.scan(self.db.Table(SCHEDULE_SERVER_GROUP_TABLE)):
+            schedule_server_group_map.setdefault(server_group['ScheduleName'], []).append(server_group)
+
+        return schedule_server_group_map
+
+    def query_exception_value_map(self, exception_date_ymd) -> dict:
+        return self.build_exception_value_map(self.query_exception_list(exception_date_ymd))
+
+    def query_exception_list(self, exception_date_ymd) -> list:
+        table = self.db.Table(SCHEDULE_EXCEPTION_TABLE)
+
+        try:
+            item_list = list(DynamoReader.query(
+                table,
+                IndexName=SCHEDULE_EXCEPTION_DATE_INDEX,
+                KeyConditionExpression=Key('ExceptionDate').eq(exception_date_ymd)
+            ))
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ValidationException':
+                raise
+
+            # ExceptionDate Index 가 없는 Table 은 해당 날짜로 Scan 한다
+            print('Exception date index unavailable : ' + str(e))
+            item_list = list(DynamoReader.scan(
+                table,
+                FilterExpression=Attr('ExceptionDate').eq(exception_date_ymd)
+            ))
+
+        return item_list
+
+    @staticmethod
+    def build_exception_value_map(exception_list) -> dict:
+        exception_value_map = {}
+
+        for exception in exception_list:
+            exception_value_map.setdefault((exception['ScheduleName'], exception['ExceptionType']),
+                                           exception['ExceptionValue'])
+
+        return exception_value_map
+
+    def put_schedule_exception(self, schedule_name, exception_date_ymd, exception_type, exception_value):
+        return self.db.Table(SCHEDULE_EXCEPTION_TABLE).put_item(
+            Item={
+                'ScheduleName': schedule_name,
+                'ExceptionKey': self.build_exception_key(exception_date_ymd, exception_type),
+                'ExceptionDate': exception_date_ymd,
+                'ExceptionType': exception_type,
+                'ExceptionValue': exception_value
+            }
+        )
+
+    def delete_schedule_exception(self, schedule_name, exception_date_ymd, exception_type):
+        return self.db.Table(SCHEDULE_EXCEPTION_TABLE).delete_item(
+            Key={
+                'ScheduleName': schedule_name,
+                'ExceptionKey': self.build_exception_key(exception_date_ymd, exception_type)
+            }
+        )
+
+    def get_config_version(self) -> int:
+        response = self.db.Table(SCHEDULE_STATE_TABLE).get_item(
+            Key={'StateKey': 'ConfigVersion'},
+            ConsistentRead=True
+        )
+
+        return int(response['Item']['Version']) if 'Item' in response else 0
+
+    def bump_config_version(self) -> int:
+        response = self.db.Table(SCHEDULE_STATE_TABLE).update_item(
+            Key={'StateKey': 'ConfigVersion'},
+            UpdateExpression='ADD Version :one',
+            ExpressionAttributeValues={':one': 1},
+            ReturnValues='UPDATED_NEW'
+        )
+
+        return int(response['Attributes']['Version'])
+
+    def put_state_if_changed(self, state_key, value, expire_at) -> bool:
+        # 저장된 Value 와 다를 때만 쓰고 같으면 False 를 반환한다, ExpireAt 은 DynamoDB TTL 용
+        try:
+            self.db.Table(SCHEDULE_STATE_TABLE).put_item(
+                Item={
+                    'StateKey': state_key,
+                    'Value': value,
+                    'ExpireAt': int(expire_at)
+                },
+                ConditionExpression=Attr('StateKey').not_exists() | Attr('Value').ne(value)
+            )
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+            return False
+
+        return True
+
+    @staticmethod
+    def build_inventory_snapshot_key(schedule_name) -> str:
+        return 'Inventory#' + schedule_name
+
+    def put_inventory_snapshot_map(self, snapshot_map, captured_at, expire_at):
+        with self.db.Table(SCHEDULE_STATE_TABLE).batch_writer(overwrite_by_pkeys=['StateKey']) as batch:
+            for schedule_name, snapshot in snapshot_map.items():
+                batch.put_item(
+                    Item={
+                        'StateKey': self.build_inventory_snapshot_key(schedule_name),
+                        'CapturedAt': int(captured_at),
+                        'Snapshot': json.dumps(snapshot, separators=(',', ':')),
+                        'ExpireAt': int(expire_at)
+                    }
+                )
+
+    @staticmethod
+    def build_bot_job_key(job_id) -> str:
+        return 'BotJob#' + job_id
+
+    def put_bot_job(self, job_id, job_status, command_text, expire_at, result=None):
+        item = {
+            'StateKey': self.build_bot_job_key(job_id),
+            'JobStatus': job_status,
+            'Command': command_text,
+            'UpdatedAt': int(time.time()),
+            'ExpireAt': int(expire_at)
+        }
+
+        if result is not None:
+            item['Result'] = result
+
+        return self.db.Table(SCHEDULE_STATE_TABLE).put_item(Item=item)
+
+    def get_bot_job(self, job_id):
+        response = self.db.Table(SCHEDULE_STATE_TABLE).get_item(
+            Key={'StateKey': self.build_bot_job_key(job_id)}
+        )
+
+        return response['Item'] if 'Item' in response else None
+
+    @staticmethod
+    def parse_inventory_snapshot(item) -> dict:
+        snapshot = json.loads(item['Snapshot'])
+        snapshot['CapturedAt'] = int(item['CapturedAt'])
+
+        return snapshot
+
+    def get_inventory_snapshot(self, schedule_name):
+        response = self.db.Table(SCHEDULE_STATE_TABLE).get_item(
+            Key={'StateKey': self.build_inventory_snapshot_key(schedule_name)}
+        )
+
+        return self.parse_inventory_snapshot(response['Item']) if 'Item' in response else None
+
+    def batch_get_inventory_snapshot_map(self, schedule_name_list) -> dict:
+        snapshot_map = {}
+
+        for item in self.batch_get_state_item_list([self.build_inventory_snapshot_key(schedule_name)
+                                                    for schedule_name in schedule_name_list]):
+            snapshot_map[item['StateKey'][len('Inventory#'):]] = self.parse_inventory_snapshot(item)
+
+        return snapshot_map
+
+    def batch_get_state_item_list(self, state_key_list) -> list:
+        item_list = []
+        key_list = [{'StateKey': state_key} for state_key in state_key_list]
+
+        # batch_get_item 은 한번에 100개까지 조회하며 처리되지 않은 Key 는 다시 요청한다
+        for i in range(0, len(key_list), 100):
+            request_items = {SCHEDULE_STATE_TABLE: {'Keys': key_list[i:i + 100]}}
+
+            while request_items:
+                response = self.db.batch_get_item(RequestItems=request_items)
+                item_list.extend(response['Responses'].get(SCHEDULE_STATE_TABLE, []))
+                request_items = response.get('UnprocessedKeys')
+
+                if request_items:
+                    time.sleep(0.1)
+
+        return item_list
+
+    @staticmethod
+    def build_state_shard_key(state_key, shard) -> str:
+        return '{0}#{1}'.format(state_key, shard)
+
+    def put_state_shard_list(self, state_key, value_list):
+        table = self.db.Table(SCHEDULE_STATE_TABLE)
+
+        with table.batch_writer(overwrite_by_pkeys=['StateKey']) as batch:
+            for shard, value in enumerate(value_list):
+                batch.put_item(Item={
+                    'StateKey': self.build_state_shard_key(state_key, shard),
+                    'Value': value
+                })
+
+        # 조각을 모두 저장한 뒤에 조각 수를 기록하여 읽는 쪽이 저장되지 않은 조각을 찾지 않도록 한다
+        table.put_item(Item={
+            'StateKey': state_key,
+            'ShardCount': len(value_list)
+        })
+
+    def get_state_shard_list(self, state_key) -> list:
+        response = self.db.Table(SCHEDULE_STATE_TABLE).get_item(Key={'StateKey': state_key})
+
+        if 'Item' not in response:
+            return []
+
+        # 나누어 저장하기 전에는 하나의 Item 의 Value 에 모두 저장하였다
+        if 'Value' in response['Item']:
+            return [response['Item']['Value']]
+
+        item_list = self.batch_get_state_item_list([self.build_state_shard_key(state_key, shard)
+                                                    for shard in range(int(response['Item']['ShardCount']))])
+
+        return [item['Value'] for item in sorted(item_list, key=lambda item: int(item['StateKey'].rsplit('#', 1)[1]))]
+
+
+class RdsTagCache:
+    # DBInstanceArn 별 ScheduleName / ScheduleGroupName 태그를 warm container 간에 유지한다
+    tag_key_list = ['ScheduleName', 'ScheduleGroupName']
+    tmp_file_path = '/tmp/rds_tag_cache.json'
+    state_key = 'RdsTagCache'
+    # DynamoDB Item 은 최대 400KB 이므로 이 크기를 넘지 않도록 나누어 저장한다
+    shard_max_byte = 350000
+
+    def __init__(self, ttl_second, max_size, store='none'):
+        self.ttl_second = ttl_second
+        self.max_size = max_size
+        self.store = store
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.is_restored = False
+        self.is_dirty = False
+
+    def get_tag_list(self, arn):
+        with self.lock:
+            entry = self.entries.get(arn)
+
+            if entry is None:
+                return None
+
+            expire_at, tag_list = entry
+
+            if expire_at < time.time():
+                del self.entries[arn]
+                self.is_dirty = True
+                return None
+
+            self.entries.move_to_end(arn)
+
+            return tag_list
+
+    def put_tag_list(self, arn, tag_list):
+        schedule_tag_list = [tag for tag in tag_list if tag['Key'] in self.tag_key_list]
+
+        with self.lock:
+            entry = self.entries.get(arn)
+
+            # 태그가 같으면 유효시간만 연장하고 다시 저장하지 않는다
+            if entry is None or entry[1] != schedule_tag_list:
+                self.is_dirty = True
+
+            self.entries[arn] = (time.time() + self.ttl_second, schedule_tag_list)
+            self.entries.move_to_end(arn)
+
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+                self.is_dirty = True
+
+    def retain(self, arn_list):
+        # 최신 describe 결과에 없는 ARN 은 삭제된 인스턴스이므로 무효화한다
+        arn_set = set(arn_list)
+
+        with self.lock:
+            for arn in [arn for arn in self.entries if arn not in arn_set]:
+                del self.entries[arn]
+                self.is_dirty = True
+
+    def restore(self):
+        if self.is_restored:
+            return
+
+        self.is_restored = True
+
+        try:
+            if self.store == 'tmp':
+                if not os.path.exists(self.tmp_file_path):
+                    return
+                with open(self.tmp_file_path) as f:
+                    serialized_list = [f.read()]
+            elif self.store == 'dynamodb':
+                serialized_list = Schedule.repository.get_state_shard_list(self.state_key)
+            else:
+                return
+
+            now = time.time()
+
+            with self.lock:
+                for serialized in serialized_list:
+                    for arn, expire_at, tag_list in json.loads(serialized):
+                        if expire_at >= now and arn not in self.entries:
+                            self.entries[arn] = (expire_at, tag_list)
+        except Exception as e:
+            print('RDS tag cache restore failed : ' + str(e))
+
+    def persist(self):
+        if not self.is_dirty or self.store not in ('tmp', 'dynamodb'):
+            return
+
+        with self.lock:
+            row_list = [[arn, expire_at, tag_list] for arn, (expire_at, tag_list) in self.entries.items()]
+            self.is_dirty = False
+
+        try:
+            if self.store == 'tmp':
+                with open(self.tmp_file_path, 'w') as f:
+                    f.write(json.dumps(row_list))
+            else:
+                serialized_list = self.split_shard_list(row_list)
+                Schedule.repository.put_state_shard_list(self.state_key, serialized_list)
+
+                if len(serialized_list) > 1:
+                    print('RDS tag cache persisted in {0} shards'.format(len(serialized_list)))
+        except Exception as e:
+            print('RDS tag cache persist failed : ' + str(e))
+
+    def split_shard_list(self, row_list) -> list:
+        # json.dumps 는 ASCII 로만 출력하므로 문자열 길이가 저장되는 byte 수와 같다
+        shard_list = [[]]
+        shard_byte = 0
+
+        for row in row_list:
+            row_byte = len(json.dumps(row)) + 2
+
+            if shard_list[-1] and shard_byte + row_byte > self.shard_max_byte:
+                shard_list.append([])
+                shard_byte = 0
+
+            shard_list[-1].append(row)
+            shard_byte += row_byte
+
+        return [json.dumps(shard) for shard in shard_list]
+
+
+RDS_TAG_CACHE = RdsTagCache(RDS_TAG_CACHE_TTL_SECOND, RDS_TAG_CACHE_MAX_SIZE, RDS_TAG_CACHE_STORE)
+
+
+class ScheduleConfigCache:
+    # Schedule / ScheduleServerGroup / ScheduleException 을 warm container 간에 유지한다
+    # Bot 이 설정을 바꾸면 ScheduleState 의 ConfigVersion 을 올리고, 실행마다 버전만 get_item 으로 확인한다
+    # Console 등에서 직접 바꾼 설정은 ttl_second 후에 다시 읽는다
+
+    def __init__(self, ttl_second):
+        self.ttl_second = ttl_second
+        self.version = None
+        self.loaded_at = 0
+        self.schedule_item_list = None
+        self.schedule_server_group_map = None
+        # Bot 처럼 스케쥴 하나만 읽는 실행은 전체를 Scan 하지 않고 스케쥴별로 조회하여 보관한다
+        self.schedule_item_map = {}
+        self.schedule_server_group_list_map = {}
+        self.exception_list_map = {}
+        self.lock = threading.RLock()
+
+    def is_enabled(self) -> bool:
+        return self.ttl_second > 0
+
+    def refresh(self):
+        # 실행(handle) 시작시 한번 호출한다
+        if not self.is_enabled():
+            self.invalidate()
+            return
+
+        try:
+            version = Schedule.repository.get_config_version()
+        except Exception as e:
+            print('Config version check failed : ' + str(e))
+            self.invalidate()
+            return
+
+        with self.lock:
+            if version != self.version or time.time() - self.loaded_at > self.ttl_second:
+                print('Reload config (version {0} -> {1})'.format(self.version, version))
+                self.invalidate()
+                # 버전을 먼저 읽고 설정을 읽어야 그 사이의 변경이 다음 실행에서 반영된다
+                self.version = version
+                self.loaded_at = time.time()
+
+    def invalidate(self):
+        with self.lock:
+            self.version = None
+            self.schedule_item_list = None
+            self.schedule_server_group_map = None
+            self.schedule_item_map = {}
+            self.schedule_server_group_list_map = {}
+            self.exception_list_map = {}
+
+    def notify_changed(self):
+        # 설정을 바꾼 후 호출한다, 실행 중인 캐시는 그대로 두고 다음 refresh 에서 모든 container 가 다시 읽는다
+        try:
+            Schedule.repository.bump_config_version()
+        except Exception as e:
+            print('Config version bump failed : ' + str(e))
+
+    def get_schedule_item_list(self) -> list:
+        with self.lock:
+            if self.schedule_item_list is None:
+                self.schedule_item_list = Schedule.repository.scan_schedule_list()
+
+            return self.schedule_item_list
+
+    def get_schedule_item(self, schedule_name) -> dict:
+        with self.lock:
+            if self.schedule_item_list is not None:
+                for item in self.schedule_item_list:
+                    if item['ScheduleName'] == schedule_name:
+                        return item
+
+                return {}
+
+            if schedule_name not in self.schedule_item_map:
+                self.schedule_item_map[schedule_name] = Schedule.repository.get_schedule_item(schedule_name)
+
+            return self.schedule_item_map[schedule_name]
+
+    def load_schedule_server_group_map(self):
+        # 여러 스케쥴을 실행하는 Scheduler 는 전체를 한번에 Scan 한다
+        with self.lock:
+            if self.schedule_server_group_map is None:
+                self.schedule_server_group_map = Schedule.repository.scan_schedule_server_group_map()
+
+    def get_schedule_server_group_list(self, schedule_name) -> list:
+        with self.lock:
+            if self.schedule_server_group_map is not None:
+                return list(self.schedule_server_group_map.get(schedule_name, []))
+
+            if schedule_name not in self.schedule_server_group_list_map:
+                self.schedule_server_group_list_map[schedule_name] = \
+                    Schedule.repository.query_schedule_server_group_list(schedule_name)
+
+            return list(self.schedule_server_group_list_map[schedule_name])
+
+    def get_exception_list(self, exception_date_ymd) -> list:
+        with self.lock:
+            if exception_date_ymd not in self.exception_list_map:
+                self.exception_list_map[exception_date_ymd] = \
+                    Schedule.repository.query_exception_list(exception_date_ymd)
+
+            return self.exception_list_map[exception_date_ymd]
+
+    def get_schedule_exception_list(self, schedule_name, exception_date_ymd) -> list:
+        return sorted([exception for exception in self.get_exception_list(exception_date_ymd)
+                       if exception['ScheduleName'] == schedule_name], key=lambda e: e['ExceptionKey'])
+
+    def get_exception_value_map(self, exception_date_ymd) -> dict:
+        return ScheduleRepository.build_exception_value_map(self.get_exception_list(exception_date_ymd))
+
+
+CONFIG_CACHE = ScheduleConfigCache(CONFIG_CACHE_TTL_SECOND)
+
+
+class TimeBudget:
+    # Lambda 의 남은 실행시간 안에서만 인스턴스 상태 변경을 기다린다
+    deadline = None
+
+    def __init__(self, context=None, reserve_second=LAMBDA_TIME_RESERVE_SECOND):
+        if context is not None and hasattr(context, 'get_remaining_time_in_millis'):
+            self.deadline = time.time() + context.get_remaining_time_in_millis() / 1000.0 - reserve_second
+        else:
+            self.deadline = time.time()
+
+    def get_remaining_second(self) -> float:
+        return max(0.0, self.deadline - time.time())
+
+    def is_expired(self) -> bool:
+        return self.get_remaining_second() <= 0
+
+    def slice(self, second) -> 'TimeBudget':
+        # 전체 남은 실행시간 중 second 만큼만 사용하는 TimeBudget
+        time_budget = TimeBudget()
+        time_budget.deadline = min(self.deadline, time.time() + second)
+        return time_budget
+
+
+class ActionDispatcher:
+    # 인스턴스별 작업을 동시에 실행하며 Throttling 등 일시적인 에러는 지수 백오프로 재시도한다
+    retryable_error_code_list = ['Throttling', 'ThrottlingException', 'RequestLimitExceeded',
+                                 'InvalidDBInstanceState']
+
+    @staticmethod
+    def get_error_code(e) -> str:
+        return e.response.get('Error', {}).get('Code')
+
+    @staticmethod
+    def call_with_retry(operation, **kwargs):
+        attempt = 1
+
+        while True:
+            try:
+                return operation(**kwargs)
+            except ClientError as e:
+                error_code = ActionDispatcher.get_error_code(e)
+
+                if error_code not in ActionDispatcher.retryable_error_code_list or \
+                        attempt >= ACTION_RETRY_MAX_ATTEMPTS:
+                    raise
+
+                # Full Jitter
+                delay = random.uniform(0, min(ACTION_RETRY_MAX_DELAY_SECOND,
+                                              ACTION_RETRY_BASE_DELAY_SECOND * (2 ** attempt)))
+                print('Retry {0} after {1:.1f}s ({2}, attempt {3})'.format(
+                    operation.__name__, delay, error_code, attempt))
+                time.sleep(delay)
+                attempt += 1
+
+    @staticmethod
+    def dispatch(action, target_list, concurrency) -> list:
+        def run(target):
+            try:
+                return {'Target': target, 'Success': True, 'Response': action(target)}
+            except Exception as e:
+                print(traceback.format_exc())
+                return {'Target': target, 'Success': False, 'Error': str(e)}
+
+        if not target_list:
+            return []
+
+        with TRACER.span('dispatch', Action=action.__name__, TargetCount=len(target_list)) as attributes:
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(target_list)))) as executor:
+                result_list = list(executor.map(ScheduleLog.bind(run), target_list))
+
+            attributes['FailedCount'] = len(ActionDispatcher.get_failed_result_list(result_list))
+
+        return result_list
+
+    @staticmethod
+    def dispatch_chunk(action, target_list, chunk_size, concurrency) -> list:
+        # 여러 대상을 한번에 받는 action 을 chunk 단위로 동시에 실행한다
+        # chunk 가 실패하면 둘로 나누어 다시 실행하여 실패한 대상만 골라낸다
+        def run(chunk):
+            try:
+                response = action(chunk)
+                return [{'Target': target, 'Success': True, 'Response': response} for target in chunk]
+            except ClientError as e:
+                if len(chunk) == 1:
+                    print('{0} failed : {1}'.format(action.__name__, e))
+                    return [{'Target': chunk[0], 'Success': False, 'Error': str(e)}]
+
+                print('{0} failed for {1} targets, bisect ({2})'.format(
+                    action.__name__, len(chunk), ActionDispatcher.get_error_code(e)))
+                middle = len(chunk) // 2
+                return run(chunk[:middle]) + run(chunk[middle:])
+            except Exception as e:
+                print(traceback.format_exc())
+                return [{'Target': target, 'Success': False, 'Error': str(e)} for target in chunk]
+
+        if not target_list:
+            return []
+
+        chunk_size = max(1, chunk_size)
+        chunk_list = [target_list[i:i + chunk_size] for i in range(0, len(target_list), chunk_size)]
+
+        with TRACER.span('dispatch', Action=action.__name__, TargetCount=len(target_list),
+                         ChunkCount=len(chunk_list)) as attributes:
+            with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(chunk_list)))) as executor:
+                result_list = [result for chunk_result_list in executor.map(ScheduleLog.bind(run), chunk_list)
+                               for result in chunk_result_list]
+
+            attributes['FailedCount'] = len(ActionDispatcher.get_failed_result_list(result_list))
+
+        return result_list
+
+    @staticmethod
+    def get_succeeded_target_list(result_list) -> list:
+        return [result['Target'] for result in result_list if result['Success']]
+
+    @staticmethod
+    def get_failed_result_list(result_list) -> list:
+        return [result for result in result_list if not result['Success']]
+
+
+class AwsEventHook:
+    # botocore event hook 을 client 에 등록한다, resource 는 내부 client 에 등록한다
+    event_handler_list = []
+
+    def is_enabled(self) -> bool:
+        return True
+
+    def install(self, client_or_resource):
+        if not self.is_enabled():
+            return client_or_resource
+
+        client = client_or_resource.meta.client if hasattr(client_or_resource.meta, 'client') else client_or_resource
+
+        for event_name, handler_name in self.event_handler_list:
+            client.meta.events.register(event_name, getattr(self, handler_name))
+
+        return client_or_resource
+
+    @staticmethod
+    def is_throttle_response(response) -> bool:
+        # needs-retry 의 response 는 (http_response, parsed) 이며 응답을 받지 못했으면 None 이다
+        if response is None or not response[1]:
+            return False
+
+        return response[1].get('Error', {}).get('Code') in AwsRateLimiter.throttle_error_code_list
+
+
+class TokenBucket:
+    # 초당 rate 개의 토큰을 채우며 Throttling 이 발생하면 rate 를 줄이고 성공하면 천천히 늘린다
+    decrease_ratio = 0.5
+    increase_ratio = 0.05
+    min_rate_ratio = 0.05
+
+    def __init__(self, name, rate):
+        self.name = name
+        self.max_rate = float(rate)
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.call_count = 0
+        self.wait_count = 0
+        self.wait_second = 0.0
+        self.throttle_count = 0
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            self.call_count += 1
+            # 토큰이 모자라면 음수로 예약하고 채워질 때까지 기다린다
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+            if wait > 0:
+                self.wait_count += 1
+                self.wait_second += wait
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def on_throttle(self):
+        with self.lock:
+            self.throttle_count += 1
+            self.rate = max(self.max_rate * self.min_rate_ratio, self.rate * self.decrease_ratio)
+
+    def on_success(self):
+        if self.rate >= self.max_rate:
+            return
+
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * self.increase_ratio)
+
+    def get_stats(self) -> dict:
+        return {
+            'Name': self.name,
+            'Rate': round(self.rate, 2),
+            'MaxRate': self.max_rate,
+            'CallCount': self.call_count,
+            'WaitCount': self.wait_count,
+            'WaitSecond': round(self.wait_second, 3),
+            'ThrottleCount': self.throttle_count
+        }
+
+
+class AwsRateLimiter(AwsEventHook):
+    # botocore event hook 으로 모든 AWS 호출 전에 토큰을 받고 Throttling 응답으로 속도를 조절한다
+    event_handler_list = [
+        ('before-call.*.*', 'before_call'),
+        ('needs-retry.*.*', 'needs_retry'),
+        ('after-call.*.*', 'after_call')
+    ]
+    default_rate_map = {
+        'ec2': 20,
+        'rds': 10,
+        'tagging': 5,
+        'dynamodb': 50,
+        'lambda': 10
+    }
+    throttle_error_code_list = ['Throttling', 'ThrottlingException', 'RequestLimitExceeded', 'RequestThrottled',
+                                'TooManyRequestsException', 'ProvisionedThroughputExceededException']
+
+    def __init__(self, rate_map):
+        self.rate_map = rate_map
+        self.bucket_map = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def parse_rate_map(rate_limit_json) -> dict:
+        rate_map = dict(AwsRateLimiter.default_rate_map)
+
+        if rate_limit_json:
+            rate_map.update(json.loads(rate_limit_json))
+
+        return rate_map
+
+    def get_bucket(self, service_name, operation_name):
+        operation_key = '{0}.{1}'.format(service_name, operation_name)
+        bucket_key = operation_key if operation_key in self.rate_map else service_name
+
+        if bucket_key not in self.rate_map:
+            return None
+
+        bucket = self.bucket_map.get(bucket_key)
+
+        if bucket is None:
+            with self.lock:
+                bucket = self.bucket_map.get(bucket_key)
+
+                if bucket is None:
+                    bucket = TokenBucket(bucket_key, self.rate_map[bucket_key])
+                    self.bucket_map[bucket_key] = bucket
+
+        return bucket
+
+    def before_call(self, model, **kwargs):
+        bucket = self.get_bucket(model.service_model.endpoint_prefix, model.name)
+
+        if bucket is not None:
+            bucket.acquire()
+
+    def needs_retry(self, operation, response=None, **kwargs):
+        if self.is_throttle_response(response):
+            bucket = self.get_bucket(operation.service_model.endpoint_prefix, operation.name)
+
+            if bucket is not None:
+                bucket.on_throttle()
+                # botocore 의 재시도 요청도 토큰을 받은 후 보낸다
+                bucket.acquire()
+
+    def after_call(self, model, parsed=None, **kwargs):
+        bucket = self.get_bucket(model.service_model.endpoint_prefix, model.name)
+
+        if bucket is None:
+            return
+
+        # Throttling 응답은 needs-retry 에서 매 시도마다 처리한다
+        if not parsed or 'Error' not in parsed:
+            bucket.on_success()
+
+    def get_stats(self) -> list:
+        return [bucket.get_stats() for bucket in sorted(self.bucket_map.values(), key=lambda b: b.name)]
+
+    def print_stats(self):
+        print('AWS Rate Limiter Stats')
+
+        for stats in self.get_stats():
+            print('{Name} : calls {CallCount}, waits {WaitCount} ({WaitSecond}s), throttles {ThrottleCount}, '
+                  'rate {Rate}/{MaxRate}'.format(**stats))
+
+
+AWS_RATE_LIMITER = AwsRateLimiter(AwsRateLimiter.parse_rate_map(AWS_RATE_LIMIT))
+
+
+class AwsCallStats(AwsEventHook):
+    # botocore event hook 으로 실행 한번 동안의 AWS 호출 수, 지연시간 분포, 재시도, Throttling 을 스케쥴별로 집계한다
+    event_handler_list = [
+        ('before-call.*.*', 'before_call'),
+        ('needs-retry.*.*', 'needs_retry'),
+        ('after-call.*.*', 'after_call'),
+        ('after-call-error.*.*', 'after_call_error')
+    ]
+    latency_bucket_ms_list = [10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+    context_key = 'aws_call_stats'
+    local = threading.local()
+
+    def __init__(self, output, namespace):
+        self.output = output
+        self.namespace = namespace
+        self.lock = threading.Lock()
+        self.reset('-')
+
+    def is_enabled(self) -> bool:
+        return self.output in ['json', 'emf']
+
+    def reset(self, invocation):
+        with self.lock:
+            self.invocation = invocation
+            self.started_at = time.monotonic()
+            self.property_map = OrderedDict()
+            self.operation_map = {}
+            self.scope_map = {}
+
+    def set_property(self, name, value):
+        self.property_map[name] = value
+
+    @staticmethod
+    @contextmanager
+    def scope(scope_name):
+        # 스케쥴 실행 밖의 호출(인벤토리 조회, Bot 명령)을 지정한 이름으로 집계한다
+        origin_scope_name = getattr(AwsCallStats.local, 'scope_name', None)
+        AwsCallStats.local.scope_name = scope_name
+
+        try:
+            yield
+        finally:
+            AwsCallStats.local.scope_name = origin_scope_name
+
+    def get_scope_name(self):
+        return getattr(self.local, 'scope_name', None) or ScheduleLog.get_schedule_name() or self.invocation
+
+    @staticmethod
+    def get_operation_key(model):
+        return '{0}.{1}'.format(model.service_model.endpoint_prefix, model.name)
+
+    def new_counter(self) -> dict:
+        return {
+            'Calls': 0,
+            'Errors': 0,
+            'Retries': 0,
+            'Throttles': 0,
+            'LatencyMs': 0.0,
+            'MaxLatencyMs': 0.0,
+            'LatencyCount': 0,
+            'Histogram': [0] * (len(self.latency_bucket_ms_list) + 1),
+            'ErrorCodes': {}
+        }
+
+    def get_counter_list(self, operation_key) -> list:
+        # lock 안에서만 호출한다
+        scope_name = self.get_scope_name()
+        operation_counter = self.operation_map.get(operation_key)
+
+        if operation_counter is None:
+            operation_counter = self.operation_map[operation_key] = self.new_counter()
+
+        scope_operation_map = self.scope_map.setdefault(scope_name, {})
+        scope_counter = scope_operation_map.get(operation_key)
+
+        if scope_counter is None:
+            scope_counter = scope_operation_map[operation_key] = self.new_counter()
+
+        return [operation_counter, scope_counter]
+
+    def before_call(self, model, context=None, **kwargs):
+        if context is not None:
+            context[self.context_key] = time.monotonic()
+
+    def needs_retry(self, operation, response=None, **kwargs):
+        if self.is_throttle_response(response):
+            with self.lock:
+                for counter in self.get_counter_list(self.get_operation_key(operation)):
+                    counter['Throttles'] += 1
+
+    def after_call(self, model, parsed=None, context=None, **kwargs):
+        started_at = context.get(self.context_key) if context else None
+        latency_ms = None if started_at is None else (time.monotonic() - started_at) * 1000
+        parsed = parsed or {}
+        error_code = parsed.get('Error', {}).get('Code')
+        retry_count = parsed.get('ResponseMetadata', {}).get('RetryAttempts', 0)
+
+        self.record(self.get_operation_key(model), latency_ms, error_code, retry_count)
+
+    def after_call_error(self, event_name, exception=None, context=None, **kwargs):
+        # 연결 에러처럼 응답을 받지 못한 호출은 after-call 이 오지 않는다
+        started_at = context.get(self.context_key) if context else None
+        latency_ms = None if started_at is None else (time.monotonic() - started_at) * 1000
+        operation_key = '.'.join(event_name.split('.')[1:3])
+
+        self.record(operation_key, latency_ms, type(exception).__name__, 0)
+
+    def record(self, operation_key, latency_ms, error_code, retry_count):
+        bucket_index = len(self.latency_bucket_ms_list)
+
+        if latency_ms is not None:
+            for i, bucket_ms in enumerate(self.latency_bucket_ms_list):
+                if latency_ms <= bucket_ms:
+                    bucket_index = i
+                    break
+
+        with self.lock:
+            for counter in self.get_counter_list(operation_key):
+                counter['Calls'] += 1
+                counter['Retries'] += retry_count
+
+                if error_code:
+                    counter['Errors'] += 1
+                    counter['ErrorCodes'][error_code] = counter['ErrorCodes'].get(error_code, 0) + 1
+
+                if latency_ms is not None:
+                    counter['LatencyCount'] += 1
+                    counter['LatencyMs'] += latency_ms
+                    counter['MaxLatencyMs'] = max(counter['MaxLatencyMs'], latency_ms)
+                    counter['Histogram'][bucket_index] += 1
+
+    def build_histogram(self, histogram) -> OrderedDict:
+        label_list = ['le{0}'.format(bucket_ms) for bucket_ms in self.latency_bucket_ms_list] + ['inf']
+
+        return OrderedDict((label, count) for label, count in zip(label_list, histogram) if count)
+
+    def build_counter_summary(self, counter, is_histogram_included) -> OrderedDict:
+        summary = OrderedDict([
+            ('Calls', counter['Calls']),
+            ('Errors', counter['Errors']),
+            ('Retries', counter['Retries']),
+            ('Throttles', counter['Throttles'])
+        ])
+
+        if counter['LatencyCount']:
+            summary['AvgLatencyMs'] = round(counter['LatencyMs'] / counter['LatencyCount'], 1)
+            summary['MaxLatencyMs'] = round(counter['MaxLatencyMs'], 1)
+
+        if is_histogram_included:
+            summary['Histogram'] = self.build_histogram(counter['Histogram'])
+
+        if counter['ErrorCodes']:
+            summary['ErrorCodes'] = counter['ErrorCodes']
+
+        return summary
+
+    def get_summary(self) -> OrderedDict:
+        with self.lock:
+            total = self.new_counter()
+            operation_summary_map = OrderedDict()
+            scope_summary_map = OrderedDict()
+
+            for operation_key in sorted(self.operation_map):
+                counter = self.operation_map[operation_key]
+                operation_summary_map[operation_key] = self.build_counter_summary(counter, True)
+
+                for name in ['Calls', 'Errors', 'Retries', 'Throttles']:
+                    total[name] += counter[name]
+
+            # 호출이 많은 스케쥴부터 보여준다
+            for scope_name, scope_operation_map in sorted(
+                    self.scope_map.items(), key=lambda i: (-sum(c['Calls'] for c in i[1].values()), i[0])):
+                scope_summary = OrderedDict((name, sum(c[name] for c in scope_operation_map.values()))
+                                            for name in ['Calls', 'Errors', 'Retries', 'Throttles'])
+                scope_summary['Operations'] = OrderedDict(
+                    (operation_key, scope_operation_map[operation_key]['Calls'])
+                    for operation_key in sorted(scope_operation_map))
+                scope_summary_map[scope_name] = scope_summary
+
+            summary = OrderedDict([
+                ('Invocation', self.invocation),
+                ('ElapsedSecond', round(time.monotonic() - self.started_at, 3))
+            ])
+            summary.update(self.property_map)
+            summary['Total'] = self.build_counter_summary(total, False)
+            summary['Operations'] = operation_summary_map
+            summary['Schedules'] = scope_summary_map
+
+            return summary
+
+    def build_emf_record_list(self, summary) -> list:
+        # CloudWatch Embedded Metric Format, 스케쥴별 집계는 dimension 수가 늘지 않도록 로그 속성으로만 남긴다
+        timestamp = int(time.time() * 1000)
+        total = summary['Total']
+        property_metric_list = [name for name, value in self.property_map.items() if type(value) in [int, float]]
+        record = OrderedDict([
+            ('_aws', {
+                'Timestamp': timestamp,
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Invocation']],
+                    'Metrics': [{'Name': 'AwsCalls', 'Unit': 'Count'}, {'Name': 'AwsErrors', 'Unit': 'Count'},
+                                {'Name': 'AwsRetries', 'Unit': 'Count'}, {'Name': 'AwsThrottles', 'Unit': 'Count'},
+                                {'Name': 'ElapsedSecond', 'Unit': 'Seconds'}] +
+                               [{'Name': name, 'Unit': 'Count'} for name in property_metric_list]
+                }]
+            }),
+            ('Invocation', summary['Invocation']),
+            ('AwsCalls', total['Calls']),
+            ('AwsErrors', total['Errors']),
+            ('AwsRetries', total['Retries']),
+            ('AwsThrottles', total['Throttles']),
+            ('ElapsedSecond', summary['ElapsedSecond'])
+        ])
+        record.update(self.property_map)
+        record['AwsCallStats'] = summary
+        record_list = [record]
+
+        for operation_key, operation_summary in summary['Operations'].items():
+            metric_list = [{'Name': 'Calls', 'Unit': 'Count'}, {'Name': 'Errors', 'Unit': 'Count'},
+                           {'Name': 'Retries', 'Unit': 'Count'}, {'Name': 'Throttles', 'Unit': 'Count'}]
+            operation_record = OrderedDict([
+                ('_aws', {
+                    'Timestamp': timestamp,
+                    'CloudWatchMetrics': [{
+                        'Namespace': self.namespace,
+                        'Dimensions': [['Invocation', 'Operation']],
+                        'Metrics': metric_list
+                    }]
+                }),
+                ('Invocation', summary['Invocation']),
+                ('Operation', operation_key)
+            ])
+
+            for name in ['Calls', 'Errors', 'Retries', 'Throttles']:
+                operation_record[name] = operation_summary[name]
+
+            if 'AvgLatencyMs' in operation_summary:
+                metric_list.extend([{'Name': 'AvgLatencyMs', 'Unit': 'Milliseconds'},
+                                    {'Name': 'MaxLatencyMs', 'Unit': 'Milliseconds'}])
+                operation_record['AvgLatencyMs'] = operation_summary['AvgLatencyMs']
+                operation_record['MaxLatencyMs'] = operation_summary['MaxLatencyMs']
+
+            record_list.append(operation_record)
+
+        return record_list
+
+    def print_summary(self):
+        if not self.is_enabled():
+            return
+
+        summary = self.get_summary()
+        record_list = self.build_emf_record_list(summary) if self.output == 'emf' else [{'AwsCallStats': summary}]
+
+        # CloudWatch Logs 에서 한 줄이 하나의 이벤트가 되도록 출력한다
+        for record in record_list:
+            print(json.dumps(record, separators=(',', ':'), default=str))
+
+
+AWS_CALL_STATS = AwsCallStats(AWS_CALL_STATS_OUTPUT, AWS_CALL_STATS_NAMESPACE)
+
+
+class AwsSession:
+    # 모든 client / resource 가 하나의 boto3 Session 을 공유하여 botocore 의 service model 로딩을 재사용한다
+    session = None
+    # boto3 Session 의 client 생성은 thread safe 하지 않다
+    lock = threading.RLock()
+
+    @staticmethod
+    def get_session():
+        with AwsSession.lock:
+            if AwsSession.session is None:
+                AwsSession.session = boto3.session.Session()
+
+            return AwsSession.session
+
+    @staticmethod
+    def client(service_name):
+        with AwsSession.lock:
+            return AWS_CALL_STATS.install(AWS_RATE_LIMITER.install(AwsSession.get_session().client(service_name)))
+
+    @staticmethod
+    def resource(service_name):
+        with AwsSession.lock:
+            return AWS_CALL_STATS.install(AWS_RATE_LIMITER.install(AwsSession.get_session().resource(service_name)))
+
+
+class LazyAttribute:
+    # 클래스 속성을 처음 접근할 때 factory 로 만들고 이후에는 같은 객체를 반환한다
+    def __init__(self, factory):
+        self.factory = factory
+        self.value = None
+        self.lock = threading.Lock()
+
+    def __get__(self, instance, owner):
+        if self.value is None:
+            with self.lock:
+                if self.value is None:
+                    self.value = self.factory()
+
+        return self.value
+
+
+class ThreadLocalAttribute:
+    # thread safe 하지 않은 boto3 resource 는 스레드별로 처음 접근할 때 만들어 같은 스레드에서만 재사용한다
+    def __init__(self, factory):
+        self.factory = factory
+        self.local = threading.local()
+
+    def __get__(self, instance, owner):
+        value = getattr(self.local, 'value', None)
+
+        if value is None:
+            value = self.local.value = self.factory()
+
+        return value
+
+
+class ScheduleInventory:
+    # 계정 전체 EC2 / RDS 인스턴스를 한번에 조회하여 ScheduleName / ScheduleGroupName 태그로 색인한다
+    ec2 = None
+    rds = None
+    tagging = None
+    schedule_tag_value_list = None
+    is_loaded = False
+
+    def __init__(self, ec2, rds, schedule_tag_value_list=None, tagging=None):
+        self.ec2 = ec2
+        self.rds = rds
+        self.tagging = tagging
+        self.schedule_tag_value_list = schedule_tag_value_list
+        self.ec2_schedule_index = {}
+        self.ec2_group_index = {}
+        self.rds_schedule_index = {}
+        self.rds_group_index = {}
+        self.lock = threading.Lock()
+
+    def load(self):
+        ec2_schedule_index = {}
+        ec2_group_index = {}
+        rds_schedule_index = {}
+        rds_group_index = {}
+
+        for ec2_instance in self.describe_ec2_instance_list():
+            self.add_to_index(ec2_schedule_index, ec2_group_index, ec2_instance, ec2_instance.get('Tags', []))
+
+        rds_instance_list = self.describe_rds_instance_list()
+        rds_tag_map = self.resolve_rds_tag_map(rds_instance_list)
+
+        for rds_instance in rds_instance_list:
+            self.add_to_index(rds_schedule_index, rds_group_index, rds_instance,
+                              rds_tag_map.get(rds_instance['DBInstanceArn'], []))
+
+        self.ec2_schedule_index = ec2_schedule_index
+        self.ec2_group_index = ec2_group_index
+        self.rds_schedule_index = rds_schedule_index
+        self.rds_group_index = rds_group_index
+        self.is_loaded = True
+
+    def ensure_loaded(self):
+        if self.is_loaded:
+            return
+
+        # 여러 스케쥴이 병렬로 실행되어도 인벤토리 조회는 한번만 한다
+        with self.lock:
+            if not self.is_loaded:
+                with AwsCallStats.scope('inventory'), TRACER.span('inventory') as attributes:
+                    self.load()
+                    attributes['EC2Count'] = sum(len(v) for v in self.ec2_schedule_index.values())
+                    attributes['RDSCount'] = sum(len(v) for v in self.rds_schedule_index.values())
+
+    def refresh_instance_status(self, schedule_tag_value_list):
+        # 시작 / 중지한 스케쥴의 인스턴스만 다시 조회하여 색인의 인스턴스 상태를 갱신한다
+        ec2_instance_ids = []
+        rds_instance_ids = []
+
+        for tag_value in set(schedule_tag_value_list):
+            ec2_instance_ids.extend(ScheduleUtil.get_ec2_instance_ids(self.ec2_schedule_index.get(tag_value, [])))
+            rds_instance_ids.extend(ScheduleUtil.get_rds_instance_ids(self.rds_schedule_index.get(tag_value, [])))
+
+        ec2_instance_map = {ec2_instance['InstanceId']: ec2_instance
+                            for ec2_instance in self.describe_ec2_instance_list_by_ids(ec2_instance_ids)}
+        rds_instance_map = {rds_instance['DBInstanceIdentifier']: rds_instance
+                            for rds_instance in self.describe_rds_instance_list_by_ids(rds_instance_ids)}
+
+        with self.lock:
+            for index in (self.ec2_schedule_index, self.ec2_group_index):
+                for key, instance_list in index.items():
+                    index[key] = [ec2_instance_map.get(instance['InstanceId'], instance) for instance in instance_list]
+
+            for index in (self.rds_schedule_index, self.rds_group_index):
+                for key, instance_list in index.items():
+                    index[key] = [rds_instance_map.get(instance['DBInstanceIdentifier'], instance)
+                                  for instance in instance_list]
+
+    def describe_ec2_instance_list(self) -> list:
+        if self.schedule_tag_value_list is None:
+            ec2_schedule_filter = [{
+                'Name': 'tag-key',
+                'Values': ['ScheduleName']
+            }]
+        else:
+            ec2_schedule_filter = [{
+                'Name': 'tag:ScheduleName',
+                'Values': self.schedule_tag_value_list
+            }]
+
+        instance_list = []
+        paginator = self.ec2.get_paginator('describe_instances')
+
+        for page in paginator.paginate(Filters=ec2_schedule_filter):
+            for reservation in page['Reservations']:
+                instance_list.extend(reservation['Instances'])
+
+        return instance_list
+
+    def describe_rds_instance_list(self) -> list:
+        instance_list = []
+        paginator = self.rds.get_paginator('describe_db_instances')
+
+        for page in paginator.paginate():
+            instance_list.extend(page['DBInstances'])
+
+        return instance_list
+
+    def describe_ec2_instance_list_by_ids(self, ec2_instance_ids) -> list:
+        if not ec2_instance_ids:
+            return []
+
+        instance_list = []
+        paginator = self.ec2.get_paginator('describe_instances')
+
+        try:
+            for page in paginator.paginate(InstanceIds=ec2_instance_ids):
+                for reservation in page['Reservations']:
+                    instance_list.extend(reservation['Instances'])
+        except ClientError as e:
+            if ActionDispatcher.get_error_code(e) != 'InvalidInstanceID.NotFound':
+                raise
+
+            # 종료되어 조회되지 않는 인스턴스가 있으면 에러가 나지 않는 instance-id 필터로 다시 조회한다 (필터 값은 최대 200개)
+            print('Describe EC2 by ids failed, retry with filter : ' + str(e))
+            ec2_instance_ids = list(ec2_instance_ids)
+            instance_list = []
+
+            for i in range(0, len(ec2_instance_ids), 200):
+                for page in paginator.paginate(Filters=[{
+                    'Name': 'instance-id',
+                    'Values': ec2_instance_ids[i:i + 200]
+                }]):
+                    for reservation in page['Reservations']:
+                        instance_list.extend(reservation['Instances'])
+
+        return instance_list
+
+    def describe_rds_instance_list_by_ids(self, rds_instance_ids) -> list:
+        if not rds_instance_ids:
+            return []
+
+        rds_instance_ids = list(rds_instance_ids)
+        instance_list = []
+        paginator = self.rds.get_paginator('describe_db_instances')
+
+        # 전체 인스턴스를 조회하지 않도록 db-instance-id 필터로 필요한 인스턴스만 조회한다 (필터 값은 최대 100개)
+        for i in range(0, len(rds_instance_ids), 100):
+            for page in paginator.paginate(Filters=[{
+                'Name': 'db-instance-id',
+                'Values': rds_instance_ids[i:i + 100]
+            }]):
+                instance_list.extend(page['DBInstances'])
+
+        return instance_list
+
+    def resolve_rds_tag_map(self, rds_instance_list) -> dict:
+        rds_tag_map = {}
+        untagged_rds_instance_list = []
+
+        RDS_TAG_CACHE.restore()
+        RDS_TAG_CACHE.retain([rds_instance['DBInstanceArn'] for rds_instance in rds_instance_list])
+
+        for rds_instance in rds_instance_list:
+            arn = rds_instance['DBInstanceArn']
+
+            # 최신 API 는 describe_db_instances 응답에 TagList 를 포함한다
+            if 'TagList' in rds_instance:
+                RDS_TAG_CACHE.put_tag_list(arn, rds_instance['TagList'])
+                rds_tag_map[arn] = rds_instance['TagList']
+                continue
+
+            cached_tag_list = RDS_TAG_CACHE.get_tag_list(arn)
+
+            if cached_tag_list is not None:
+                rds_tag_map[arn] = cached_tag_list
+            else:
+                untagged_rds_instance_list.append(rds_instance)
+
+        if untagged_rds_instance_list:
+            tagging_rds_tag_map = self.get_tagging_rds_tag_map()
+
+            for rds_instance in untagged_rds_instance_list:
+                arn = rds_instance['DBInstanceArn']
+
+                if tagging_rds_tag_map is not None:
+                    rds_tag_map[arn] = tagging_rds_tag_map.get(arn, [])
+                else:
+                    rds_tag_map[arn] = self.get_rds_tag_list(rds_instance)
+
+                RDS_TAG_CACHE.put_tag_list(arn, rds_tag_map[arn])
+
+        RDS_TAG_CACHE.persist()
+
+        return rds_tag_map
+
+    def get_tagging_rds_tag_map(self):
+        if self.tagging is None:
+            return None
+
+        # 결과를 RdsTagCache 에 저장하므로 스케쥴 범위와 상관없이 ScheduleName 태그가 있는 모든 RDS 를 조회한다
+        rds_tag_map = {}
+
+        try:
+            paginator = self.tagging.get_paginator('get_resources')
+
+            for page in paginator.paginate(ResourceTypeFilters=['rds:db'], TagFilters=[{'Key': 'ScheduleName'}]):
+                for resource in page['ResourceTagMappingList']:
+                    rds_tag_map[resource['ResourceARN']] = resource['Tags']
+        except ClientError as e:
+            # Tagging API 권한이 없으면 인스턴스별 list_tags_for_resource 로 조회한다
+            print('Resource Groups Tagging API unavailable : ' + str(e))
+            return None
+
+        return rds_tag_map
+
+    def get_rds_tag_list(self, rds_instance) -> list:
+        tags = self.rds.list_tags_for_resource(ResourceName=rds_instance['DBInstanceArn'])
+
+        return tags['TagList']
+
+    def add_to_index(self, schedule_index, group_index, instance, tag_list):
+        schedule_tag_value = ScheduleUtil.get_tag_value(tag_list, 'ScheduleName')
+
+        if schedule_tag_value is None:
+            return
+
+        if self.schedule_tag_value_list is not None and schedule_tag_value not in self.schedule_tag_value_list:
+            return
+
+        schedule_index.setdefault(schedule_tag_value, []).append(instance)
+
+        group_name = ScheduleUtil.get_tag_value(tag_list, 'ScheduleGroupName')
+
+        if group_name is not None:
+            group_index.setdefault((schedule_tag_value, group_name), []).append(instance)
+
+    def get_instance_group_name_map(self) -> dict:
+        # EC2 InstanceId / RDS DBInstanceIdentifier 별 ScheduleGroupName
+        self.ensure_loaded()
+        group_name_map = {}
+
+        for (schedule_tag_value, group_name), instance_list in self.ec2_group_index.items():
+            for ec2_instance in instance_list:
+                group_name_map[ec2_instance['InstanceId']] = group_name
+
+        for (schedule_tag_value, group_name), instance_list in self.rds_group_index.items():
+            for rds_instance in instance_list:
+                group_name_map[rds_instance['DBInstanceIdentifier']] = group_name
+
+        return group_name_map
+
+    def get_ec2_instance_list(self, schedule_tag_value) -> list:
+        self.ensure_loaded()
+        return list(self.ec2_schedule_index.get(schedule_tag_value, []))
+
+    def get_rds_instance_list(self, schedule_tag_value) -> list:
+        self.ensure_loaded()
+        return list(self.rds_schedule_index.get(schedule_tag_value, []))
+
+    def get_server_group_ec2_instance_list(self, schedule_tag_value, group_name) -> list:
+        self.ensure_loaded()
+        return list(self.ec2_group_index.get((schedule_tag_value, group_name), []))
+
+    def get_server_group_rds_instance_list(self, schedule_tag_value, group_name) -> list:
+        self.ensure_loaded()
+        return list(self.rds_group_index.get((schedule_tag_value, group_name), []))
+
+
+class InventorySnapshot:
+    # Bot status 가 API Gateway 제한 시간 안에 응답하도록 스케쥴별 인스턴스 이름 / 상태 / 그룹을 저장해둔다
+    # 스냅샷 형식 : {'EC2': [[이름, 상태, 그룹명], ...], 'RDS': [...], 'CapturedAt': epoch}
+    last_persisted_at = None
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return INVENTORY_SNAPSHOT
+
+    @staticmethod
+    def build(inventory, schedule_tag_value, group_name_map) -> dict:
+        return {
+            'EC2': [[ScheduleUtil.get_ec2_instance_name(ec2_instance),
+                     ScheduleUtil.get_ec2_instance_status(ec2_instance),
+                     group_name_map.get(ec2_instance['InstanceId'])]
+                    for ec2_instance in inventory.get_ec2_instance_list(schedule_tag_value)],
+            'RDS': [[ScheduleUtil.get_rds_instance_name(rds_instance),
+                     ScheduleUtil.get_rds_instance_status(rds_instance),
+                     group_name_map.get(rds_instance['DBInstanceIdentifier'])]
+                    for rds_instance in inventory.get_rds_instance_list(schedule_tag_value)]
+        }
+
+    @staticmethod
+    def build_map(inventory, item_list) -> dict:
+        group_name_map = inventory.get_instance_group_name_map()
+
+        return {item['ScheduleName']: InventorySnapshot.build(inventory, item.get('TagValue'), group_name_map)
+                for item in item_list}
+
+    @staticmethod
+    def save_map(snapshot_map, captured_at, is_strict=False):
+        try:
+            Schedule.repository.put_inventory_snapshot_map(snapshot_map, captured_at,
+                                                           captured_at + INVENTORY_SNAPSHOT_EXPIRE_DAY * 86400)
+        except Exception as e:
+            # Bot 은 저장하지 못해도 실시간으로 조회한 결과로 응답한다
+            if is_strict:
+                raise
+
+            print('Inventory snapshot save failed : {0}'.format(e))
+
+    @staticmethod
+    def is_persist_needed(has_due_item, now_epoch) -> bool:
+        if not InventorySnapshot.is_enabled():
+            return False
+
+        # 시작 / 중지한 스케쥴이 있으면 바뀐 상태를 바로 저장한다
+        if has_due_item:
+            return True
+
+        # 실행할 스케쥴이 없으면 인벤토리를 조회하지 않으므로 주기를 설정한 경우에만 전체를 조회하여 저장한다
+        if INVENTORY_SNAPSHOT_INTERVAL_SECOND <= 0:
+            return False
+
+        return InventorySnapshot.last_persisted_at is None or \
+            now_epoch - InventorySnapshot.last_persisted_at >= INVENTORY_SNAPSHOT_INTERVAL_SECOND
+
+    @staticmethod
+    def capture_all(item_list, is_strict=False) -> dict:
+        # 계정 전체 인벤토리를 한번 조회하여 모든 스케쥴의 스냅샷을 만들고 저장한다
+        captured_at = time.time()
+        inventory = ScheduleInventory(Schedule.ec2, Schedule.rds, tagging=Schedule.tagging)
+        snapshot_map = InventorySnapshot.build_map(inventory, item_list)
+
+        if InventorySnapshot.is_enabled():
+            InventorySnapshot.save_map(snapshot_map, captured_at, is_strict)
+
+        for snapshot in snapshot_map.values():
+            snapshot['CapturedAt'] = int(captured_at)
+
+        return snapshot_map
+
+    @staticmethod
+    def persist(inventory, item_list, due_item_list):
+        # 이번 실행에서 조회한 인벤토리를 그대로 사용하고 시작 / 중지한 스케쥴의 인스턴스만 다시 조회한다
+        captured_at = time.time()
+
+        if inventory.is_loaded:
+            inventory.refresh_instance_status([item.get('TagValue') for item in due_item_list])
+
+        snapshot_map = InventorySnapshot.build_map(inventory, item_list)
+        InventorySnapshot.save_map(snapshot_map, captured_at, True)
+
+        InventorySnapshot.last_persisted_at = captured_at
+        print('Inventory snapshots saved : {0}'.format(len(snapshot_map)))
+
+    @staticmethod
+    def load(schedule_name):
+        # ScheduleState 테이블이 없거나 읽지 못하면 스냅샷이 없는 것으로 보고 실시간으로 조회한다
+        try:
+            return Schedule.repository.get_inventory_snapshot(schedule_name)
+        except Exception as e:
+            print('Inventory snapshot read failed : {0}'.format(e))
+            return None
+
+    @staticmethod
+    def load_map(schedule_name_list) -> dict:
+        try:
+            return Schedule.repository.batch_get_inventory_snapshot_map(schedule_name_list)
+        except Exception as e:
+            print('Inventory snapshot read failed : {0}'.format(e))
+            return {}
+
+    @staticmethod
+    def count_status(snapshot) -> tuple:
+        on = len([row for row in snapshot['EC2'] if row[1] == 'running']) + \
+            len([row for row in snapshot['RDS'] if row[1] == 'available'])
+
+        return on, len(snapshot['EC2']) + len(snapshot['RDS']) - on
+
+    @staticmethod
+    def capture(schedule):
+        # 해당 스케쥴의 인스턴스만 실시간으로 조회하고 저장된 스냅샷도 갱신한다
+        captured_at = time.time()
+        inventory = schedule.get_inventory()
+        snapshot = InventorySnapshot.build(inventory, schedule.get_schedule_property('TagValue'),
+                                           inventory.get_instance_group_name_map())
+
+        if InventorySnapshot.is_enabled():
+            InventorySnapshot.save_map({schedule.schedule_name: snapshot}, captured_at)
+
+        snapshot['CapturedAt'] = int(captured_at)
+
+        return snapshot
+
+    @staticmethod
+    def get_age_text(captured_at, now_epoch) -> str:
+        age_second = max(0, int(now_epoch - captured_at))
+
+        if age_second < 60:
+            return '{0}초 전'.format(age_second)
+        elif age_second < 3600:
+            return '{0}분 전'.format(age_second // 60)
+        else:
+            return '{0}시간 {1}분 전'.format(age_second // 3600, age_second % 3600 // 60)
+
+
+class ScheduleLog:
+    # 병렬 실행시 스케쥴별 print 출력이 섞이지 않도록 스레드별로 모았다가 한번에 출력한다
+    local = threading.local()
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.lock = threading.Lock()
+
+    def write(self, text):
+        buffer = getattr(self.local, 'buffer', None)
+
+        if buffer is None:
+            with self.lock:
+                return self.stream.write(text)
+
+        buffer.append(text)
+
+        return len(text)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.stream.flush()
+
+    def begin(self, schedule_name):
+        self.local.buffer = []
+        self.local.schedule_name = schedule_name
+
+    def end(self):
+        buffer = getattr(self.local, 'buffer', None)
+        self.local.buffer = None
+        self.local.schedule_name = None
+
+        if buffer:
+            with self.lock:
+                self.stream.write(''.join(buffer))
+                self.stream.flush()
+
+    @staticmethod
+    def get_schedule_name():
+        return getattr(ScheduleLog.local, 'schedule_name', None)
+
+    @staticmethod
+    def bind(fn):
+        # 스케쥴 안에서 만든 스레드의 출력도 해당 스케쥴의 로그로 모으고 span 과 프로파일링도 이어간다
+        buffer = getattr(ScheduleLog.local, 'buffer', None)
+        schedule_name = ScheduleLog.get_schedule_name()
+        span = Tracer.get_current_span()
+        fn = PROFILER.bind(fn)
+
+        def run(*args, **kwargs):
+            ScheduleLog.local.buffer = buffer
+            ScheduleLog.local.schedule_name = schedule_name
+            Tracer.set_current_span(span)
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ScheduleLog.local.buffer = None
+                ScheduleLog.local.schedule_name = None
+                Tracer.set_current_span(None)
+
+        return run
+
+    @staticmethod
+    @contextmanager
+    def capture():
+        origin_stdout = sys.stdout
+        schedule_log = ScheduleLog(origin_stdout)
+        sys.stdout = schedule_log
+
+        try:
+            yield schedule_log
+        finally:
+            sys.stdout = origin_stdout
+
+
+class Tracer:
+    # 실행 단계를 span 으로 측정하여 한 줄 JSON 로그로 출력한다, 하위 span 은 상위 span 의 그룹 속성을 물려받는다
+    inherited_attribute_list = ['GroupName']
+    local = threading.local()
+
+    def __init__(self, is_enabled):
+        self.is_enabled = is_enabled
+        self.invocation = None
+        self.trace_id = None
+
+    def reset(self, invocation, context=None):
+        self.invocation = invocation
+        self.trace_id = getattr(context, 'aws_request_id', None) or uuid.uuid4().hex
+        Tracer.set_current_span(None)
+
+    @staticmethod
+    def get_current_span():
+        return getattr(Tracer.local, 'span', None)
+
+    @staticmethod
+    def set_current_span(span):
+        Tracer.local.span = span
+
+    @contextmanager
+    def span(self, name, **attributes):
+        if not self.is_enabled:
+            yield attributes
+            return
+
+        parent = Tracer.get_current_span()
+        span_attributes = OrderedDict()
+        schedule_name = ScheduleLog.get_schedule_name()
+
+        if schedule_name:
+            span_attributes['ScheduleName'] = schedule_name
+
+        if parent is not None:
+            span_attributes.update((key, value) for key, value in parent['Attributes'].items()
+                                   if key in self.inherited_attribute_list)
+
+        span_attributes.update(attributes)
+        span = {
+            'SpanId': uuid.uuid4().hex[:16],
+            'ParentSpanId': parent['SpanId'] if parent is not None else None,
+            'Attributes': span_attributes
+        }
+        started_at = time.time()
+        status = 'ok'
+        Tracer.set_current_span(span)
+
+        try:
+            yield span_attributes
+        except Exception as e:
+            status = 'error'
+            span_attributes['Error'] = '{0}: {1}'.format(type(e).__name__, e)[:200]
+            raise
+        finally:
+            Tracer.set_current_span(parent)
+            print(json.dumps(OrderedDict([
+                ('Span', name),
+                ('TraceId', self.trace_id),
+                ('SpanId', span['SpanId']),
+                ('ParentSpanId', span['ParentSpanId']),
+                ('Invocation', self.invocation),
+                ('StartTime', datetime.fromtimestamp(started_at).isoformat()),
+                ('DurationMs', round((time.time() - started_at) * 1000, 1)),
+                ('Status', status),
+                ('Attributes', span_attributes)
+            ]), separators=(',', ':'), default=str))
+
+
+TRACER = Tracer(TRACE_SPANS)
+
+
+class InvocationProfiler:
+    # 실행 한번을 cProfile 또는 주기적인 stack sampling 으로 프로파일링하여 /tmp 나 S3 에 저장한다
+    s3 = LazyAttribute(lambda: AwsSession.client('s3'))
+    mode_list = ['cprofile', 'sample']
+    top_count = 20
+
+    def __init__(self, mode, target, output, sample_interval_ms):
+        self.mode = mode
+        self.target = target
+        self.output = output
+        self.sample_interval_second = max(0.001, sample_interval_ms / 1000.0)
+        self.lock = threading.Lock()
+        self.profile_list = None
+        self.sample_count_map = None
+        self.sample_stop_event = None
+
+    def is_target(self, invocation) -> bool:
+        return self.mode in self.mode_list and self.target in ['all', invocation]
+
+    @contextmanager
+    def profile(self, invocation, context=None):
+        if not self.is_target(invocation):
+            yield
+            return
+
+        file_name = 'profile-{0}-{1}-{2}'.format(invocation, datetime.now().strftime('%Y%m%d%H%M%S'),
+                                                  getattr(context, 'aws_request_id', None) or uuid.uuid4().hex[:8])
+        print('Profile {0} : {1}'.format(self.mode, file_name))
+
+        if self.mode == 'cprofile':
+            self.profile_list = []
+            profile = self.enable_cprofile()
+        else:
+            sampler = self.start_sampler()
+
+        try:
+            yield
+        finally:
+            # 프로파일 저장 실패는 실행 결과에 영향을 주지 않는다
+            try:
+                if self.mode == 'cprofile':
+                    self.save_cprofile(profile, file_name + '.pstats')
+                else:
+                    self.save_sample(sampler, file_name + '.collapsed')
+            except Exception:
+                print(traceback.format_exc())
+            finally:
+                self.profile_list = None
+                self.sample_count_map = None
+
+    def enable_cprofile(self):
+        import cProfile
+        profile = cProfile.Profile()
+
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12 부터는 한번에 하나의 스레드만 cProfile 을 켤 수 있다
+            return None
+
+        with self.lock:
+            self.profile_list.append(profile)
+
+        return profile
+
+    def bind(self, fn):
+        # cProfile 은 스레드별로 동작하므로 스케쥴 스레드도 따로 측정하여 합친다
+        def run(*args, **kwargs):
+            profile = self.enable_cprofile() if self.profile_list is not None else None
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if profile is not None:
+                    profile.disable()
+
+        return run
+
+    def save_cprofile(self, profile, file_name):
+        import io
+        import pstats
+
+        if profile is not None:
+            profile.disable()
+
+        with self.lock:
+            profile_list = list(self.profile_list)
+
+        if not profile_list:
+            print('Profile skipped : cProfile is not available')
+            return
+
+        stream = io.StringIO()
+        stats = pstats.Stats(*profile_list, stream=stream)
+        path = self.get_local_path(file_name)
+        stats.dump_stats(path)
+        stats.sort_stats('cumulative').print_stats(self.top_count)
+
+        print(stream.getvalue())
+        self.upload(path, file_name)
+
+    def start_sampler(self):
+        self.sample_count_map = {}
+        self.sample_stop_event = threading.Event()
+        sampler = threading.Thread(target=self.sample, args=(self.sample_count_map, self.sample_stop_event),
+                                   name='profile-sampler')
+        sampler.daemon = True
+        sampler.start()
+
+        return sampler
+
+    def sample(self, sample_count_map, stop_event):
+        sampler_thread_id = threading.get_ident()
+
+        while not stop_event.wait(self.sample_interval_second):
+            thread_name_map = {thread.ident: thread.name for thread in threading.enumerate()}
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == sampler_thread_id:
+                    continue
+
+                frame_list = []
+
+                while frame is not None:
+                    code = frame.f_code
+                    frame_list.append('{0} ({1}:{2})'.format(code.co_name, os.path.basename(code.co_filename),
+                                                             code.co_firstlineno))
+                    frame = frame.f_back
+
+                # flamegraph 의 collapsed stack 형식으로 스레드 이름부터 호출 순서대로 모은다
+                frame_list.append(thread_name_map.get(thread_id, str(thread_id)))
+                stack = ';'.join(reversed(frame_list))
+                sample_count_map[stack] = sample_count_map.get(stack, 0) + 1
+
+    def save_sample(self, sampler, file_name):
+        self.sample_stop_event.set()
+        sampler.join()
+
+        sample_count_map = self.sample_count_map
+        self_count_map = {}
+
+        for stack, count in sample_count_map.items():
+            leaf = stack.rsplit(';', 1)[-1]
+            self_count_map[leaf] = self_count_map.get(leaf, 0) + count
+
+        path = self.get_local_path(file_name)
+
+        with open(path, 'w') as f:
+            for stack, count in sorted(sample_count_map.items(), key=lambda i: i[1], reverse=True):
+                f.write('{0} {1}\n'.format(stack, count))
+
+        print('Profile samples : {0}'.format(sum(sample_count_map.values())))
+
+        for leaf, count in sorted(self_count_map.items(), key=lambda i: i[1], reverse=True)[:self.top_count]:
+            print('{0:>6} {1}'.format(count, leaf))
+
+        self.upload(path, file_name)
+
+    def get_local_path(self, file_name) -> str:
+        directory = '/tmp' if self.output.startswith('s3://') else self.output
+
+        return os.path.join(directory, file_name)
+
+    def upload(self, path, file_name):
+        if not self.output.startswith('s3://'):
+            print('Profile saved : {0}'.format(path))
+            return
+
+        bucket, _, prefix = self.output[len('s3://'):].partition('/')
+        key = '{0}/{1}'.format(prefix.rstrip('/'), file_name) if prefix.strip('/') else file_name
+
+        with open(path, 'rb') as f:
+            self.s3.put_object(Bucket=bucket, Key=key, Body=f.read())
+
+        os.remove(path)
+        print('Profile saved : s3://{0}/{1}'.format(bucket, key))
+
+
+PROFILER = InvocationProfiler(PROFILE_MODE, PROFILE_TARGET, PROFILE_OUTPUT, PROFILE_SAMPLE_INTERVAL_MS)
+
+
+class WebhookDispatcher:
+    # 웹훅 메세지를 큐에 넣고 백그라운드 스레드에서 보내서 느린 웹훅이 스케쥴 실행을 막지 않도록 한다
+    retry_status_code_list = [429, 500, 502, 503, 504]
+    retry_base_delay_second = 0.5
+    retry_max_delay_second = 5
+
+    def __init__(self, url, concurrency):
+        self.url = url
+        self.concurrency = max(1, concurrency)
+        self.queue = queue.Queue()
+        self.session = None
+        self.worker_list = []
+        self.lock = threading.Lock()
+        self.sent_count = 0
+        self.failed_count = 0
+
+    def get_session(self):
+        if self.session is None:
+            with self.lock:
+                if self.session is None:
+                    # Bot 등 웹훅을 보내지 않는 실행은 requests 를 import 하지 않는다
+                    import requests
+                    session = requests.Session()
+                    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=self.concurrency)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    session.headers.update({
+                        'Accept': 'application/vnd.tosslab.jandi-v2+json',
+                        'Content-Type': 'application/json'
+                    })
+                    self.session = session
+
+        return self.session
+
+    def submit(self, payload):
+        self.start_workers()
+        self.queue.put((payload, ScheduleLog.get_schedule_name()))
+
+    def start_workers(self):
+        if len(self.worker_list) >= self.concurrency:
+            return
+
+        with self.lock:
+            while len(self.worker_list) < self.concurrency:
+                worker = threading.Thread(target=self.work, name='webhook-{0}'.format(len(self.worker_list)))
+                worker.daemon = True
+                worker.start()
+                self.worker_list.append(worker)
+
+    def work(self):
+        while True:
+            payload, schedule_name = self.queue.get()
+
+            try:
+                self.post(payload, schedule_name)
+            finally:
+                self.queue.task_done()
+
+    def post(self, payload, schedule_name):
+        import requests
+        attempt = 1
+
+        while True:
+            try:
+                res = self.get_session().post(
+                    self.url, data=payload, timeout=(WEBHOOK_CONNECT_TIMEOUT_SECOND, WEBHOOK_READ_TIMEOUT_SECOND))
+
+                if res.status_code not in self.retry_status_code_list:
+                    print('response : {0} ({1})'.format(res.status_code, schedule_name))
+                    res.raise_for_status()
+                    self.count_result(True)
+                    return
+
+                error = 'HTTP {0}'.format(res.status_code)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                error = str(e)
+            except Exception as e:
+                print('Webhook failed ({0}) : {1}'.format(schedule_name, e))
+                self.count_result(False)
+                return
+
+            if attempt >= WEBHOOK_MAX_ATTEMPTS:
+                print('Webhook failed after {0} attempts ({1}) : {2}'.format(attempt, schedule_name, error))
+                self.count_result(False)
+                return
+
+            # Full Jitter
+            delay = random.uniform(0, min(self.retry_max_delay_second, self.retry_base_delay_second * (2 ** attempt)))
+            print('Retry webhook after {0:.1f}s ({1}, attempt {2})'.format(delay, error, attempt))
+            time.sleep(delay)
+            attempt += 1
+
+    def count_result(self, is_success):
+        with self.lock:
+            if is_success:
+                self.sent_count += 1
+            else:
+                self.failed_count += 1
+
+    def flush(self, timeout) -> bool:
+        # 큐의 메세지를 모두 보낼 때까지 최대 timeout 초 동안 기다린다
+        deadline = time.time() + max(0.0, timeout)
+
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = deadline - time.time()
+
+                if remaining <= 0:
+                    print('Webhook flush timeout, {0} messages are not sent'.format(self.queue.unfinished_tasks))
+                    return False
+
+                self.queue.all_tasks_done.wait(remaining)
+
+        return True
+
+
+WEBHOOK_DISPATCHER = WebhookDispatcher(WEBHOOK_URL, WEBHOOK_CONCURRENCY)
+
+
+class NotificationDigest:
+    # 한 실행 동안의 알림을 모았다가 크기 제한에 맞춘 요약 메세지 몇개로 보낸다
+    def __init__(self, max_length):
+        self.max_length = max_length
+        self.event_list = []
+        self.lock = threading.Lock()
+
+    def add(self, msg, color, connect_info_list=None):
+        with self.lock:
+            self.event_list.append((ScheduleLog.get_schedule_name() or '', msg, color, connect_info_list or []))
+
+    def build_connect_info(self, msg, connect_info_list) -> dict:
+        description_list = []
+
+        for connect_info in connect_info_list:
+            if 'description' in connect_info:
+                description_list.append('[{0}]\n{1}'.format(connect_info['title'], connect_info['description']))
+            else:
+                description_list.append(connect_info['title'])
 
-    @staticmethod
-    def replace_time(date_time, hm):
-        split_time = hm.split(':')
-        hour = split_time[0]
-        minute = split_time[1]
-        return date_time.replace(hour=int(hour), minute=int(minute))
+        description = '\n'.join(description_list)
 
-    @staticmethod
-    def is_valid_time(hm):
-        try:
-            datetime.strptime(hm, '%H:%M')
-            return True
-        except ValueError:
-            return False
+        if len(msg) + len(description) > self.max_length:
+            description = description[:max(0, self.max_length - len(msg) - 3)] + '...'
 
-    @staticmethod
-    def is_valid_date(ymd):
-        try:
-            datetime.strptime(ymd, '%Y-%m-%d')
-            return True
-        except ValueError:
-            return False
+        return JandiWebhook.build_connect_info(msg, description)
 
     @staticmethod
-    def equals_rds_schedule_group_name(rds_tags, server_group) -> bool:
-        for t in rds_tags['TagList']:
-            if t['Key'] != 'ScheduleGroupName':
-                continue
-            if t['Value'] == server_group['GroupName']:
-                return True
+    def get_digest_color(color_list) -> str:
+        for color in [JandiWebhook.color_err, JandiWebhook.color_warning]:
+            if color in color_list:
+                return color
+
+        return JandiWebhook.color_ok
+
+    def build_message_list(self) -> list:
+        with self.lock:
+            event_list = sorted(self.event_list, key=lambda event: event[0])
+
+        chunk_list = []
+        chunk = []
+        chunk_length = 0
+
+        for schedule_name, msg, color, connect_info_list in event_list:
+            connect_info = self.build_connect_info(msg, connect_info_list)
+            length = len(connect_info['title']) + len(connect_info['description'])
+
+            if chunk and chunk_length + length > self.max_length:
+                chunk_list.append(chunk)
+                chunk = []
+                chunk_length = 0
+
+            chunk.append((color, connect_info))
+            chunk_length += length
+
+        if chunk:
+            chunk_list.append(chunk)
+
+        return [
+            JandiWebhook.build_message(
+                '스케쥴 실행 알림 {0}건 ({1}/{2})'.format(len(chunk), i + 1, len(chunk_list)),
+                self.get_digest_color([color for color, connect_info in chunk]),
+                [connect_info for color, connect_info in chunk])
+            for i, chunk in enumerate(chunk_list)
+        ]
 
-        return False
+    def send(self):
+        message_list = self.build_message_list()
+        print('Send Notification Digest : {0} events, {1} messages'.format(len(self.event_list), len(message_list)))
+
+        for message in message_list:
+            WEBHOOK_DISPATCHER.submit(json.dumps(message))
 
 
 class JandiWebhook:
     color_err = '#FF0000'
     color_ok = '#1DDB16'
     color_warning = '#FFBB00'
+    # 요약 모드로 실행 중이면 메세지를 바로 보내지 않고 모은다
+    digest = None
 
     @staticmethod
     def build_connect_info(title, description=None, image_url=None):
@@ -175,21 +2381,17 @@ class JandiWebhook:
     @staticmethod
     def send_message(msg, color, connect_info_list=None):
         try:
-            print("Send Webhook Message")
+            if JandiWebhook.digest is not None:
+                JandiWebhook.digest.add(msg, color, connect_info_list)
+                return
 
-            headers = {
-                'Accept': 'application/vnd.tosslab.jandi-v2+json',
-                'Content-Type': 'application/json'
-            }
+            print("Send Webhook Message")
 
             payload = json.dumps(JandiWebhook.build_message(msg, color, connect_info_list))
 
             print('body : ' + payload)
 
-            res = requests.post(WEBHOOK_URL, headers=headers, data=payload)
-
-            print('response : ' + str(res.status_code))
-            res.raise_for_status()
+            WEBHOOK_DISPATCHER.submit(payload)
         except Exception as e:
             print(e)
 
@@ -241,6 +2443,18 @@ class JandiWebhook:
             '{0} 스케쥴의 RDS 서버를 중지합니다'.format(schedule['ScheduleName']),
             JandiWebhook.get_rds_server_connect_info_list('RDS 중지 서버 목록', stop_rds_instance_list))
 
+    @staticmethod
+    def send_stop_ec2_server_group_message(schedule, server_group, stop_ec2_instance_list):
+        JandiWebhook.send_ok_message(
+            '{0} 스케쥴의 {1} 서버 그룹을 중지합니다'.format(schedule['ScheduleName'], server_group['GroupName']),
+            JandiWebhook.get_ec2_server_connect_info_list('EC2 중지 서버 목록', stop_ec2_instance_list))
+
+    @staticmethod
+    def send_stop_rds_server_group_message(schedule, server_group, stop_rds_instance_list):
+        JandiWebhook.send_ok_message(
+            '{0} 스케쥴의 {1} 서버 그룹을 중지합니다'.format(schedule['ScheduleName'], server_group['GroupName']),
+            JandiWebhook.get_rds_server_connect_info_list('RDS 중지 서버 목록', stop_rds_instance_list))
+
     @staticmethod
     def send_stop_alert_message(schedule_name, stop_date_time, remain):
         stop_alert_msg = '잠시후 {0} 스케쥴의 모든 서버가 중지 됩니다.'.format(schedule_name)
@@ -248,6 +2462,12 @@ class JandiWebhook:
         remain_time_msg = JandiWebhook.build_connect_info('남은 시간', str(remain) + '분')
         JandiWebhook.send_warning_message(stop_alert_msg, [stop_time_msg, remain_time_msg])
 
+    @staticmethod
+    def send_action_failure_message(schedule, title, failure_description_list):
+        JandiWebhook.send_err_message(
+            '{0} 스케쥴의 일부 서버 작업이 실패하였습니다'.format(schedule['ScheduleName']),
+            [JandiWebhook.build_connect_info(title, '\n'.join(failure_description_list))])
+
     @staticmethod
     def send_exception_err_message(schedule, e, error_stack):
         connect_info = JandiWebhook.build_connect_info(str(e), error_stack)
@@ -284,26 +2504,212 @@ class JandiWebhook:
         return [connect_info]
 
 
+class ScheduleSpec:
+    # Schedule Item 을 한번만 해석하여 요일 bitmask 와 하루 중 분(minute) 정수로 보관한다
+    __slots__ = ('schedule_name', 'is_enabled', 'is_force_start', 'weekday_mask', 'start_minute', 'stop_minute')
+    # datetime.weekday() 순서
+    week_day_list = ['mon', 'tue', 'wed', 'thu', 'fri', 'sat', 'sun']
+    no_minute = -1
+    # Schedule.is_start_time / is_stop_time 의 59분 구간
+    window_second = 59 * 60
+    # DaysActive / 시각 문자열은 종류가 적으므로 해석 결과를 재사용한다
+    weekday_mask_map = {}
+    minute_map = {}
+
+    def __init__(self, schedule_name, is_enabled, is_force_start, weekday_mask, start_minute, stop_minute):
+        self.schedule_name = schedule_name
+        self.is_enabled = is_enabled
+        self.is_force_start = is_force_start
+        self.weekday_mask = weekday_mask
+        self.start_minute = start_minute
+        self.stop_minute = stop_minute
+
+    @staticmethod
+    def parse_minute(hm) -> int:
+        if hm is None or hm == 'None':
+            return ScheduleSpec.no_minute
+
+        minute = ScheduleSpec.minute_map.get(hm)
+
+        if minute is None:
+            hour, minute = hm.split(':')
+            minute = int(hour) * 60 + int(minute)
+            ScheduleSpec.minute_map[hm] = minute
+
+        return minute
+
+    @staticmethod
+    def parse_weekday_mask(days_active) -> int:
+        weekday_mask = ScheduleSpec.weekday_mask_map.get(days_active)
+
+        if weekday_mask is None:
+            weekday_mask = 0
+
+            for weekday, week_day in enumerate(ScheduleSpec.week_day_list):
+                if ScheduleUtil.is_active_week_day(days_active, week_day):
+                    weekday_mask |= 1 << weekday
+
+            ScheduleSpec.weekday_mask_map[days_active] = weekday_mask
+
+        return weekday_mask
+
+    @staticmethod
+    def compile(item, exception_value_map=None):
+        schedule_name = item.get('ScheduleName')
+        start_hm = item.get('StartTime', 'None')
+        stop_hm = item.get('StopTime', 'None')
+
+        # 실행일의 예외 시각이 있으면 기본 시각 대신 사용한다 ('None' 이면 해당 작업을 하지 않음)
+        if exception_value_map:
+            start_hm = exception_value_map.get((schedule_name, 'start'), start_hm)
+            stop_hm = exception_value_map.get((schedule_name, 'stop'), stop_hm)
+
+        return ScheduleSpec(schedule_name, bool(item.get('Enabled')), bool(item.get('ForceStart', False)),
+                            ScheduleSpec.parse_weekday_mask(item.get('DaysActive')),
+                            ScheduleSpec.parse_minute(start_hm), ScheduleSpec.parse_minute(stop_hm))
+
+    @staticmethod
+    def get_day_microsecond(now) -> int:
+        return ((now.hour * 60 + now.minute) * 60 + now.second) * 1000000 + now.microsecond
+
+    def is_active_week_day(self, weekday) -> bool:
+        return bool(self.weekday_mask & (1 << weekday))
+
+    @staticmethod
+    def get_date_time(day, minute):
+        if minute == ScheduleSpec.no_minute:
+            return None
+
+        return day.replace(hour=minute // 60, minute=minute % 60, second=0, microsecond=0)
+
+    def get_start_date_time(self, day) -> datetime:
+        return self.get_date_time(day, self.start_minute)
+
+    def get_stop_date_time(self, day) -> datetime:
+        return self.get_date_time(day, self.stop_minute)
+
+    def evaluate(self, now) -> tuple:
+        # (시작 시간, 중지 시간, 중지 알림 시간) 여부, ScheduleSpecEvaluator 와 같은 계산
+        if not self.is_active_week_day(now.weekday()):
+            return False, False, False
+
+        now_us = self.get_day_microsecond(now)
+        window_us = self.window_second * 1000000
+        is_start = False
+        is_stop = False
+        is_alert = False
+
+        if self.start_minute != self.no_minute:
+            start_us = self.start_minute * 60000000
+            is_start = now_us - window_us <= start_us <= now_us
+
+        if self.stop_minute != self.no_minute:
+            stop_us = self.stop_minute * 60000000
+            is_stop = now_us - window_us <= stop_us <= now_us
+            # ScheduleUtil.get_diff_minute 처럼 초 단위로 버리고 분으로 반올림한다
+            remain = int(round(((stop_us - now_us) // 1000000) / 60))
+            is_alert = 0 < remain <= STOP_ALERT_BEFORE_TIME_MINUTE
+
+        return is_start, is_stop, is_alert
+
+    def is_due(self, now) -> bool:
+        if self.is_force_start:
+            return True
+
+        return self.is_enabled and any(self.evaluate(now))
+
+
+class ScheduleSpecEvaluator:
+    # 많은 ScheduleSpec 의 시작 / 중지 / 중지 알림 여부를 numpy 로 한번에 계산한다
+    # numpy 가 없거나 스케쥴이 적으면 ScheduleSpec.evaluate 를 차례로 호출한다
+    vectorize_min_size = 256
+    numpy = None
+    is_numpy_loaded = False
+
+    def __init__(self, spec_list):
+        self.spec_list = spec_list
+        self.is_vectorized = len(spec_list) >= self.vectorize_min_size and self.get_numpy() is not None
+
+        if self.is_vectorized:
+            numpy = self.get_numpy()
+            self.is_enabled = numpy.array([spec.is_enabled for spec in spec_list], dtype=bool)
+            self.is_force_start = numpy.array([spec.is_force_start for spec in spec_list], dtype=bool)
+            self.weekday_mask = numpy.array([spec.weekday_mask for spec in spec_list], dtype=numpy.int64)
+            self.start_minute = numpy.array([spec.start_minute for spec in spec_list], dtype=numpy.int64)
+            self.stop_minute = numpy.array([spec.stop_minute for spec in spec_list], dtype=numpy.int64)
+
+    @staticmethod
+    def get_numpy():
+        # numpy 는 스케쥴이 많을 때만 필요하므로 처음 사용할 때 import 한다
+        if not ScheduleSpecEvaluator.is_numpy_loaded:
+            try:
+                import numpy
+                ScheduleSpecEvaluator.numpy = numpy
+            except ImportError:
+                pass
+
+            ScheduleSpecEvaluator.is_numpy_loaded = True
+
+        return ScheduleSpecEvaluator.numpy
+
+    def evaluate(self, now) -> tuple:
+        if not self.is_vectorized:
+            result_list = [spec.evaluate(now) for spec in self.spec_list]
+            return ([result[0] for result in result_list], [result[1] for result in result_list],
+                    [result[2] for result in result_list])
+
+        numpy = self.get_numpy()
+        now_us = ScheduleSpec.get_day_microsecond(now)
+        window_us = ScheduleSpec.window_second * 1000000
+        is_active = (self.weekday_mask & (1 << now.weekday())) != 0
+        start_us = self.start_minute * 60000000
+        stop_us = self.stop_minute * 60000000
+
+        is_start = is_active & (self.start_minute != ScheduleSpec.no_minute) & \
+            (now_us - window_us <= start_us) & (start_us <= now_us)
+        has_stop = is_active & (self.stop_minute != ScheduleSpec.no_minute)
+        is_stop = has_stop & (now_us - window_us <= stop_us) & (stop_us <= now_us)
+        # numpy.round 도 round 와 같이 짝수 쪽으로 반올림한다
+        remain = numpy.round(numpy.floor_divide(stop_us - now_us, 1000000) / 60)
+        is_alert = has_stop & (remain > 0) & (remain <= STOP_ALERT_BEFORE_TIME_MINUTE)
+
+        return is_start.tolist(), is_stop.tolist(), is_alert.tolist()
+
+    def get_due_list(self, now) -> list:
+        if not self.is_vectorized:
+            return [spec.is_due(now) for spec in self.spec_list]
+
+        numpy = self.get_numpy()
+        is_start, is_stop, is_alert = (numpy.array(result, dtype=bool) for result in self.evaluate(now))
+
+        return (self.is_force_start | (self.is_enabled & (is_start | is_stop | is_alert))).tolist()
+
+
 class Schedule:
     schedule_name = None
     schedule_data = {}
-
-    db = boto3.resource('dynamodb')
-    ec2 = boto3.client('ec2')
-    rds = boto3.client('rds')
-
-    def __init__(self, schedule_name):
+    inventory = None
+    time_budget = None
+    schedule_spec = None
+
+    # Bot 처럼 DynamoDB 만 쓰는 실행은 EC2 / RDS client 를 만들지 않도록 처음 사용할 때 만든다
+    # 스케쥴 / 서버 그룹을 병렬로 실행하므로 DynamoDB resource 와 이를 쓰는 repository 는 스레드별로 만든다
+    db = ThreadLocalAttribute(lambda: AwsSession.resource('dynamodb'))
+    repository = ThreadLocalAttribute(lambda: ScheduleRepository(Schedule.db))
+    ec2 = LazyAttribute(lambda: AwsSession.client('ec2'))
+    rds = LazyAttribute(lambda: AwsSession.client('rds'))
+    tagging = LazyAttribute(lambda: AwsSession.client('resourcegroupstaggingapi'))
+
+    def __init__(self, schedule_name, inventory=None, time_budget=None):
         self.schedule_name = schedule_name
+        self.inventory = inventory
+        self.time_budget = time_budget
 
     def load_schedule_item_from_db(self):
-        table = self.db.Table('Schedule')
-        response = table.get_item(
-            Key={
-                'ScheduleName': self.schedule_name
-            }
-        )
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_schedule_item(self.schedule_name)
 
-        return response['Item'] if 'Item' in response else {}
+        return self.repository.get_schedule_item(self.schedule_name)
 
     def get_schedule_property(self, property_name, default_value=None):
         if property_name in self.get_schedule():
@@ -317,28 +2723,20 @@ class Schedule:
 
         return self.schedule_data
 
-    def get_start_date_time(self) -> datetime:
-        start_time = self.get_schedule_property('StartTime')
-
-        if start_time == 'None':
-            return None
+    def get_schedule_spec(self) -> ScheduleSpec:
+        if self.schedule_spec is None:
+            self.schedule_spec = ScheduleSpec.compile(self.get_schedule())
 
-        start_date_time = ScheduleUtil.hm_to_date_time(start_time)
+        return self.schedule_spec
 
-        return start_date_time
+    def get_start_date_time(self) -> datetime:
+        return self.get_schedule_spec().get_start_date_time(datetime.now())
 
     def get_stop_date_time(self) -> datetime:
-        stop_time = self.get_schedule_property('StopTime')
-
-        if stop_time == 'None':
-            return None
-
-        stop_date_time = ScheduleUtil.hm_to_date_time(stop_time)
-
-        return stop_date_time
+        return self.get_schedule_spec().get_stop_date_time(datetime.now())
 
     def set_schedule_force_start(self, flag):
-        return self.db.Table('Schedule').update_item(
+        res = self.db.Table('Schedule').update_item(
             Key={
                 'ScheduleName': self.schedule_name,
             },
@@ -348,30 +2746,15 @@ class Schedule:
             },
             ReturnValues='UPDATED_NEW'
         )
+        CONFIG_CACHE.notify_changed()
+
+        return res
 
     def is_enable(self) -> bool:
         return self.get_schedule_property('Enabled')
 
     def is_active_day(self) -> bool:
-        days_active = self.get_schedule_property('DaysActive')
-        current_week_day = datetime.now().strftime('%a').lower()
-
-        # 매일 작동
-        if days_active == 'all':
-            return True
-        # 월~금만 작동
-        elif days_active == 'weekdays':
-            weekdays = ['mon', 'tue', 'wed', 'thu', 'fri']
-            if current_week_day in weekdays:
-                return True
-        # 지정요일만 작동 (ex : mon,tue)
-        else:
-            days = days_active.split(',')
-            for d in days:
-                if d.lower().strip() == current_week_day:
-                    return True
-
-        return False
+        return self.get_schedule_spec().is_active_week_day(datetime.now().weekday())
 
     def is_start_time(self) -> bool:
         if not self.is_active_day():
@@ -413,71 +2796,80 @@ class Schedule:
 
         return False if len(running_ec2_instance_list) == 0 and len(running_rds_instance_list) == 0 else True
 
-    def get_ec2_instance_list(self) -> list:
+    def get_inventory(self) -> ScheduleInventory:
+        # 공유 인벤토리가 주입되지 않은 경우(Bot 등) 해당 스케쥴의 인스턴스만 조회한다
+        if self.inventory is None:
+            self.inventory = ScheduleInventory(self.ec2, self.rds, [self.get_schedule_property('TagValue')],
+                                               self.tagging)
 
-        schedule_tag_name = self.get_schedule_property('TagValue')
+        return self.inventory
 
-        ec2_schedule_filter = [{
-            'Name': 'tag:ScheduleName',
-            'Values': [schedule_tag_name]
-        }]
+    def get_ec2_instance_list(self) -> list:
+        schedule_tag_value = self.get_schedule_property('TagValue')
 
-        instances = self.ec2.describe_instances(Filters=ec2_schedule_filter)
+        return self.get_inventory().get_ec2_instance_list(schedule_tag_value)
 
-        reservation_list = instances['Reservations']
+    def get_rds_instance_list(self) -> list:
+        schedule_tag_value = self.get_schedule_property('TagValue')
 
-        instance_list = []
+        return self.get_inventory().get_rds_instance_list(schedule_tag_value)
 
-        for reservation in reservation_list:
-            instance_list = instance_list + reservation['Instances']
+    def start_ec2_instances(self, ec2_instance_list) -> list:
+        return ActionDispatcher.dispatch_chunk(self.start_ec2_instance_chunk, ec2_instance_list,
+                                               EC2_ACTION_CHUNK_SIZE, EC2_ACTION_CONCURRENCY)
 
-        return instance_list
+    def stop_ec2_instances(self, ec2_instance_list) -> list:
+        return ActionDispatcher.dispatch_chunk(self.stop_ec2_instance_chunk, ec2_instance_list,
+                                               EC2_ACTION_CHUNK_SIZE, EC2_ACTION_CONCURRENCY)
 
-    def get_rds_instance_list(self) -> list:
+    def start_ec2_instance_chunk(self, ec2_instance_list):
+        ec2_instance_ids = ScheduleUtil.get_ec2_instance_ids(ec2_instance_list)
+        res = ActionDispatcher.call_with_retry(self.ec2.start_instances, InstanceIds=ec2_instance_ids)
+        print('Start EC2 : ' + str(ec2_instance_ids))
 
-        schedule_tag_value = self.get_schedule_property('TagValue')
-        instances = self.rds.describe_db_instances()
+        return res
 
-        schedule_instances_list = []
+    def stop_ec2_instance_chunk(self, ec2_instance_list):
+        ec2_instance_ids = ScheduleUtil.get_ec2_instance_ids(ec2_instance_list)
+        res = ActionDispatcher.call_with_retry(self.ec2.stop_instances, InstanceIds=ec2_instance_ids, Force=True)
+        print('Stop EC2 : ' + str(ec2_instance_ids))
 
-        for instance in instances['DBInstances']:
-            arn = instance['DBInstanceArn']
-            tags = self.rds.list_tags_for_resource(ResourceName=arn)
+        return res
 
-            if ScheduleUtil.equals_rds_schedule_name(tags, schedule_tag_value):
-                schedule_instances_list.append(instance)
+    def start_rds_instances(self, rds_instance_list) -> list:
+        return ActionDispatcher.dispatch(self.start_rds_instance, rds_instance_list, RDS_ACTION_CONCURRENCY)
 
-        return schedule_instances_list
+    def stop_rds_instances(self, rds_instance_list) -> list:
+        return ActionDispatcher.dispatch(self.stop_rds_instance, rds_instance_list, RDS_ACTION_CONCURRENCY)
 
-    def start_ec2_instances(self, ec2_instance_list):
-        ec2_instance_ids = ScheduleUtil.get_ec2_instance_ids(ec2_instance_list)
-        return self.ec2.start_instances(InstanceIds=ec2_instance_ids)
+    def start_rds_instance(self, rds_instance):
+        rds_instance_id = rds_instance['DBInstanceIdentifier']
+        res = ActionDispatcher.call_with_retry(self.rds.start_db_instance, DBInstanceIdentifier=rds_instance_id)
+        print('Start RDS :' + str(rds_instance_id))
 
-    def stop_ec2_instances(self, ec2_instance_list):
-        ec2_instance_ids = ScheduleUtil.get_ec2_instance_ids(ec2_instance_list)
-        return self.ec2.stop_instances(InstanceIds=ec2_instance_ids, Force=True)
+        return res
 
-    def start_rds_instances(self, rds_instance_list):
-        response_list = []
-        rds_instance_ids = ScheduleUtil.get_rds_instance_ids(rds_instance_list)
+    def stop_rds_instance(self, rds_instance):
+        rds_instance_id = rds_instance['DBInstanceIdentifier']
+        res = ActionDispatcher.call_with_retry(self.rds.stop_db_instance, DBInstanceIdentifier=rds_instance_id)
+        print('Stop RDS : ' + str(rds_instance_id))
 
-        for rdb_instance_id in rds_instance_ids:
-            res = self.rds.start_db_instance(DBInstanceIdentifier=rdb_instance_id)
-            print('Start RDS :' + str(rdb_instance_id))
-            response_list.append(res)
+        return res
 
-        return response_list
+    def send_ec2_action_failure_message(self, title, result_list):
+        self.send_action_failure_message(title, result_list, lambda ec2_instance: '{0} ({1})'.format(
+            ScheduleUtil.get_ec2_instance_name(ec2_instance), ec2_instance['InstanceId']))
 
-    def stop_rds_instances(self, rds_instance_list):
-        response_list = []
-        rds_instance_ids = ScheduleUtil.get_rds_instance_ids(rds_instance_list)
+    def send_rds_action_failure_message(self, title, result_list):
+        self.send_action_failure_message(title, result_list, ScheduleUtil.get_rds_instance_name)
 
-        for rdb_instance_id in rds_instance_ids:
-            res = self.rds.stop_db_instance(DBInstanceIdentifier=rdb_instance_id)
-            print('Stop RDS : ' + str(rdb_instance_id))
-            response_list.append(res)
+    def send_action_failure_message(self, title, result_list, get_instance_name):
+        failed_result_list = ActionDispatcher.get_failed_result_list(result_list)
 
-        return response_list
+        if len(failed_result_list) > 0:
+            JandiWebhook.send_action_failure_message(self.get_schedule(), title, [
+                '{0} : {1}'.format(get_instance_name(result['Target']), result['Error'])
+                for result in failed_result_list])
 
     def check_remain_stop_time(self):
         if not self.is_active_day():
@@ -491,11 +2883,28 @@ class Schedule:
         now = datetime.now()
         remain = int(round(ScheduleUtil.get_diff_minute(stop_date_time, now)))
 
+        if not 0 < remain <= STOP_ALERT_BEFORE_TIME_MINUTE:
+            return
+
         if not self.has_running_instance():
             return
 
-        if 0 < remain <= STOP_ALERT_BEFORE_TIME_MINUTE:
-            JandiWebhook.send_stop_alert_message(self.schedule_name, stop_date_time, remain)
+        # 요약 모드에서는 같은 중지 시간에 대한 알림을 한번만 보낸다
+        if NOTIFICATION_DIGEST and not self.is_new_notification(
+                'StopAlert#' + self.schedule_name, str(stop_date_time),
+                time.mktime((stop_date_time + timedelta(days=1)).timetuple())):
+            print('Stop alert already sent : ' + str(stop_date_time))
+            return
+
+        JandiWebhook.send_stop_alert_message(self.schedule_name, stop_date_time, remain)
+
+    def is_new_notification(self, state_key, value, expire_at) -> bool:
+        # 알림 중복 확인에 실패해도 스케쥴 실행은 계속되어야 하므로 중복 제거 없이 알림을 보낸다
+        try:
+            return self.repository.put_state_if_changed(state_key, value, expire_at)
+        except Exception as e:
+            print('Notification state update failed : ' + str(e))
+            return True
 
     def start(self, is_force=False):
 
@@ -510,15 +2919,25 @@ class Schedule:
 
         if len(start_ec2_instance_list) > 0:
             try:
-                self.start_ec2_instances(start_ec2_instance_list)
-                JandiWebhook.send_start_ec2_server_message(self.get_schedule(), start_ec2_instance_list)
+                result_list = self.start_ec2_instances(start_ec2_instance_list)
+                started_ec2_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(started_ec2_instance_list) > 0:
+                    JandiWebhook.send_start_ec2_server_message(self.get_schedule(), started_ec2_instance_list)
+
+                self.send_ec2_action_failure_message('EC2 시작 실패 서버 목록', result_list)
             except Exception as e:
                 JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
         if len(start_rds_instance_list) > 0:
             try:
-                self.start_rds_instances(start_rds_instance_list)
-                JandiWebhook.send_start_rds_server_message(self.get_schedule(), start_rds_instance_list)
+                result_list = self.start_rds_instances(start_rds_instance_list)
+                started_rds_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(started_rds_instance_list) > 0:
+                    JandiWebhook.send_start_rds_server_message(self.get_schedule(), started_rds_instance_list)
+
+                self.send_rds_action_failure_message('RDS 시작 실패 서버 목록', result_list)
             except Exception as e:
                 JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
@@ -530,23 +2949,33 @@ class Schedule:
         if not self.is_stop_time() and not is_force:
             return
 
-        ec2_instance_list = self.get_ec2_instance_list()
-        rds_instance_list = self.get_rds_instance_list()
+        self.stop_instances(self.get_ec2_instance_list(), self.get_rds_instance_list())
 
+    def stop_instances(self, ec2_instance_list, rds_instance_list):
         stop_ec2_instance_list = ScheduleUtil.get_ec2_instance_list_by_status(ec2_instance_list, 'running')
         stop_rds_instance_list = ScheduleUtil.get_rds_instance_list_by_status(rds_instance_list, 'available')
 
         if len(stop_ec2_instance_list) > 0:
             try:
-                self.stop_ec2_instances(stop_ec2_instance_list)
-                JandiWebhook.send_stop_ec2_server_message(self.get_schedule(), stop_ec2_instance_list)
+                result_list = self.stop_ec2_instances(stop_ec2_instance_list)
+                stopped_ec2_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(stopped_ec2_instance_list) > 0:
+                    JandiWebhook.send_stop_ec2_server_message(self.get_schedule(), stopped_ec2_instance_list)
+
+                self.send_ec2_action_failure_message('EC2 중지 실패 서버 목록', result_list)
             except Exception as e:
                 JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
         if len(stop_rds_instance_list) > 0:
             try:
-                JandiWebhook.send_stop_rds_server_message(self.get_schedule(), stop_rds_instance_list)
-                self.stop_rds_instances(stop_rds_instance_list)
+                result_list = self.stop_rds_instances(stop_rds_instance_list)
+                stopped_rds_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(stopped_rds_instance_list) > 0:
+                    JandiWebhook.send_stop_rds_server_message(self.get_schedule(), stopped_rds_instance_list)
+
+                self.send_rds_action_failure_message('RDS 중지 실패 서버 목록', result_list)
             except Exception as e:
                 JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
@@ -566,23 +2995,30 @@ class Schedule:
 
 
 class GroupSchedule(Schedule):
-    schedule_server_group_list = []
-
-    def __init__(self, schedule_name):
-        super().__init__(schedule_name)
+    schedule_server_group_list = None
+    server_group_instance_map = None
+    invalidated_server_group_name_set = None
+
+    ec2_start_transition_status_list = ['pending']
+    rds_start_transition_status_list = ['starting', 'rebooting', 'modifying', 'backing-up',
+                                        'configuring-enhanced-monitoring', 'configuring-log-exports']
+    ec2_stop_transition_status_list = ['stopping', 'shutting-down']
+    rds_stop_transition_status_list = ['stopping']
+
+    def __init__(self, schedule_name, inventory=None, time_budget=None):
+        super().__init__(schedule_name, inventory, time_budget)
+        # 실행중에 조회한 그룹별 인스턴스 목록, 시작 / 중지한 그룹만 무효화하여 다시 조회한다
+        self.server_group_instance_map = {}
+        self.invalidated_server_group_name_set = set()
 
     def load_schedule_server_group_list_from_db(self) -> list:
-        table = self.db.Table('ScheduleServerGroup')
-
-        response = table.scan(
-            Select='ALL_ATTRIBUTES',
-            FilterExpression=Attr('ScheduleName').eq(self.schedule_name)
-        )
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_schedule_server_group_list(self.schedule_name)
 
-        return response['Items']
+        return self.repository.query_schedule_server_group_list(self.schedule_name)
 
     def get_schedule_server_group_list(self) -> list:
-        if not self.schedule_server_group_list:
+        if self.schedule_server_group_list is None:
             self.schedule_server_group_list = self.load_schedule_server_group_list_from_db()
 
         return self.schedule_server_group_list
@@ -597,42 +3033,163 @@ class GroupSchedule(Schedule):
         return None
 
     def get_server_group_ec2_instance_list(self, server_group) -> list:
-        schedule_tag_name = self.get_schedule_property('TagValue')
+        return self.get_memoized_server_group_instance_list(server_group, self.load_server_group_ec2_instance_list)
+
+    def get_server_group_rds_instance_list(self, server_group) -> list:
+        return self.get_memoized_server_group_instance_list(server_group, self.load_server_group_rds_instance_list)
 
-        ec2_schedule_filter = [{
-            'Name': 'tag:ScheduleName',
-            'Values': [schedule_tag_name]
-        }, {
-            'Name': 'tag:ScheduleGroupName',
-            'Values': [server_group['GroupName']]
-        }]
-        instances = self.ec2.describe_instances(Filters=ec2_schedule_filter)
+    def load_server_group_ec2_instance_list(self, server_group) -> list:
+        schedule_tag_value = self.get_schedule_property('TagValue')
 
-        reservation_list = instances['Reservations']
+        return self.get_inventory().get_server_group_ec2_instance_list(schedule_tag_value, server_group['GroupName'])
 
-        instance_list = []
+    def load_server_group_rds_instance_list(self, server_group) -> list:
+        schedule_tag_value = self.get_schedule_property('TagValue')
+
+        return self.get_inventory().get_server_group_rds_instance_list(schedule_tag_value, server_group['GroupName'])
+
+    def get_memoized_server_group_instance_list(self, server_group, loader) -> list:
+        group_name = server_group['GroupName']
+
+        if group_name in self.invalidated_server_group_name_set:
+            self.refresh_server_group_instance_list(server_group)
+        elif group_name not in self.server_group_instance_map:
+            self.server_group_instance_map[group_name] = loader(server_group)
+
+        return list(self.server_group_instance_map[group_name])
 
-        for reservation in reservation_list:
-            instance_list = instance_list + reservation['Instances']
+    def invalidate_server_group_instance_list(self, server_group):
+        self.invalidated_server_group_name_set.add(server_group['GroupName'])
+
+    def refresh_server_group_instance_list(self, server_group) -> list:
+        group_name = server_group['GroupName']
+        instance_list = self.server_group_instance_map.get(group_name)
+
+        if server_group['InstanceType'] == 'EC2':
+            if instance_list is None:
+                instance_list = self.load_server_group_ec2_instance_list(server_group)
+            instance_list = self.get_inventory().describe_ec2_instance_list_by_ids(
+                ScheduleUtil.get_ec2_instance_ids(instance_list))
+        elif server_group['InstanceType'] == 'RDS':
+            if instance_list is None:
+                instance_list = self.load_server_group_rds_instance_list(server_group)
+            instance_list = self.get_inventory().describe_rds_instance_list_by_ids(
+                ScheduleUtil.get_rds_instance_ids(instance_list))
+        else:
+            instance_list = []
+
+        self.server_group_instance_map[group_name] = instance_list
+        self.invalidated_server_group_name_set.discard(group_name)
 
         return instance_list
 
-    def get_server_group_rds_instance_list(self, server_group) -> list:
-        schedule_tag_value = self.get_schedule_property('TagValue')
-        instances = self.rds.describe_db_instances()
+    def build_server_group_level_list(self) -> tuple:
+        # Dependency 그래프를 위상정렬하여 같은 level 의 그룹끼리 묶는다
+        # 순환에 포함되거나 순환에 의존하여 정렬할 수 없는 그룹은 따로 반환한다
+        server_group_list = self.get_schedule_server_group_list()
+        group_name_set = set(server_group['GroupName'] for server_group in server_group_list)
+        remain_dependency_map = {}
+
+        for server_group in server_group_list:
+            remain_dependency_map[server_group['GroupName']] = \
+                set(dependency for dependency in server_group.get('Dependency', []) if dependency in group_name_set)
+
+        level_list = []
+        remain_server_group_list = list(server_group_list)
+
+        while remain_server_group_list:
+            level = [server_group for server_group in remain_server_group_list
+                     if not remain_dependency_map[server_group['GroupName']]]
+
+            if not level:
+                break
+
+            level_group_name_set = set(server_group['GroupName'] for server_group in level)
+            remain_server_group_list = [server_group for server_group in remain_server_group_list
+                                        if server_group['GroupName'] not in level_group_name_set]
+
+            for server_group in remain_server_group_list:
+                remain_dependency_map[server_group['GroupName']].difference_update(level_group_name_set)
+
+            level_list.append(level)
+
+        return level_list, remain_server_group_list
+
+    def send_server_group_cycle_message(self, cyclic_server_group_list):
+        group_names = ', '.join(sorted(server_group['GroupName'] for server_group in cyclic_server_group_list))
+
+        # 매 실행마다 같은 알림을 보내지 않도록 같은 순환은 하루에 한번만 알린다
+        if not self.is_new_notification('DependencyCycle#' + self.schedule_name, group_names,
+                                        time.time() + 24 * 60 * 60):
+            print('Dependency cycle alert already sent : ' + group_names)
+            return
+
+        JandiWebhook.send_err_message(
+            '{0} 스케쥴의 서버 그룹 의존관계에 순환이 있습니다'.format(self.schedule_name),
+            [JandiWebhook.build_connect_info('순환에 포함되거나 순환에 의존하는 서버 그룹', group_names)])
+
+    def is_server_group_in_transition(self, server_group, ec2_transition_status_list, rds_transition_status_list):
+        for instance in self.get_server_group_instance_list(server_group):
+            if server_group['InstanceType'] == 'EC2':
+                if ScheduleUtil.get_ec2_instance_status(instance) in ec2_transition_status_list:
+                    return True
+            elif server_group['InstanceType'] == 'RDS':
+                if ScheduleUtil.get_rds_instance_status(instance) in rds_transition_status_list:
+                    return True
+
+        return False
+
+    def wait_server_group_list_running(self, server_group_list) -> bool:
+        with TRACER.span('server-group-wait', Action='start', GroupName=', '.join(
+                server_group['GroupName'] for server_group in server_group_list)) as attributes:
+            attributes['Done'] = self.wait_server_group_list(server_group_list, self.is_server_group_running,
+                                                             self.ec2_start_transition_status_list,
+                                                             self.rds_start_transition_status_list, '시작')
+            return attributes['Done']
+
+    def wait_server_group_list_stopped(self, server_group_list) -> bool:
+        with TRACER.span('server-group-wait', Action='stop', GroupName=', '.join(
+                server_group['GroupName'] for server_group in server_group_list)) as attributes:
+            attributes['Done'] = self.wait_server_group_list(server_group_list, self.is_server_group_stopped,
+                                                             self.ec2_stop_transition_status_list,
+                                                             self.rds_stop_transition_status_list, '중지')
+            return attributes['Done']
+
+    def wait_server_group_list(self, server_group_list, is_done, ec2_transition_status_list,
+                               rds_transition_status_list, action_name) -> bool:
+        delay = SERVER_GROUP_WAIT_DELAY_SECOND
+
+        while True:
+            pending_server_group_list = []
+
+            for server_group in server_group_list:
+                self.refresh_server_group_instance_list(server_group)
 
-        schedule_instances_list = []
+                if not is_done(server_group):
+                    pending_server_group_list.append(server_group)
 
-        for instance in instances['DBInstances']:
-            arn = instance['DBInstanceArn']
-            tags = self.rds.list_tags_for_resource(ResourceName=arn)
+            if not pending_server_group_list:
+                return True
+
+            # 상태가 바뀌는 중인 인스턴스가 없으면 더 기다려도 바뀌지 않는다
+            is_in_transition = False
+
+            for server_group in pending_server_group_list:
+                if self.is_server_group_in_transition(server_group, ec2_transition_status_list,
+                                                      rds_transition_status_list):
+                    is_in_transition = True
+
+            if not is_in_transition:
+                return False
 
-            if False not in \
-                    (ScheduleUtil.equals_rds_schedule_name(tags, schedule_tag_value),
-                     ScheduleUtil.equals_rds_schedule_group_name(tags, server_group)):
-                schedule_instances_list.append(instance)
+            if self.time_budget is None or self.time_budget.get_remaining_second() < delay:
+                print('스케쥴에 할당된 실행시간이 부족하여 {0} 그룹의 {1}을 기다리지 않습니다'.format(
+                    ', '.join(server_group['GroupName'] for server_group in pending_server_group_list),
+                    action_name))
+                return False
 
-        return schedule_instances_list
+            time.sleep(delay)
+            delay = min(delay * 2, SERVER_GROUP_WAIT_MAX_DELAY_SECOND)
 
     def get_server_group_instance_list(self, server_group) -> list:
         if server_group is None:
@@ -664,6 +3221,17 @@ class GroupSchedule(Schedule):
 
             return True
 
+    def is_server_group_stopped(self, server_group) -> bool:
+        for instance in self.get_server_group_instance_list(server_group):
+            if server_group['InstanceType'] == 'EC2':
+                if ScheduleUtil.get_ec2_instance_status(instance) not in ('stopped', 'terminated'):
+                    return False
+            elif server_group['InstanceType'] == 'RDS':
+                if ScheduleUtil.get_rds_instance_status(instance) != 'stopped':
+                    return False
+
+        return True
+
     def is_dependency_server_group_all_running(self, server_group) -> bool:
         dependency_list = server_group['Dependency']
 
@@ -683,10 +3251,16 @@ class GroupSchedule(Schedule):
 
             if len(start_ec2_instance_list) > 0:
                 try:
-                    JandiWebhook.send_start_ec2_server_group_message(self.get_schedule(), server_group,
-                                                                     ec2_instance_list)
-                    start_ec2_response = self.start_ec2_instances(start_ec2_instance_list)
-                    return start_ec2_response
+                    result_list = self.start_ec2_instances(start_ec2_instance_list)
+                    self.invalidate_server_group_instance_list(server_group)
+                    started_ec2_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                    if len(started_ec2_instance_list) > 0:
+                        JandiWebhook.send_start_ec2_server_group_message(self.get_schedule(), server_group,
+                                                                         started_ec2_instance_list)
+
+                    self.send_ec2_action_failure_message('EC2 시작 실패 서버 목록', result_list)
+                    return result_list
                 except Exception as e:
                     JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
@@ -696,10 +3270,16 @@ class GroupSchedule(Schedule):
 
             if len(start_rds_instance_list) > 0:
                 try:
-                    JandiWebhook.send_start_rds_server_group_message(self.get_schedule(), server_group,
-                                                                     start_rds_instance_list)
-                    start_rds_response_list = self.start_rds_instances(start_rds_instance_list)
-                    return start_rds_response_list
+                    result_list = self.start_rds_instances(start_rds_instance_list)
+                    self.invalidate_server_group_instance_list(server_group)
+                    started_rds_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                    if len(started_rds_instance_list) > 0:
+                        JandiWebhook.send_start_rds_server_group_message(self.get_schedule(), server_group,
+                                                                         started_rds_instance_list)
+
+                    self.send_rds_action_failure_message('RDS 시작 실패 서버 목록', result_list)
+                    return result_list
                 except Exception as e:
                     JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
 
@@ -707,12 +3287,45 @@ class GroupSchedule(Schedule):
         if server_group['InstanceType'] == 'EC2':
             ec2_instance_list = self.get_server_group_ec2_instance_list(server_group)
             stop_ec2_instance_list = ScheduleUtil.get_ec2_instance_list_by_status(ec2_instance_list, 'running')
-            self.stop_ec2_instances(stop_ec2_instance_list)
+
+            if len(stop_ec2_instance_list) > 0:
+                result_list = self.stop_ec2_instances(stop_ec2_instance_list)
+                self.invalidate_server_group_instance_list(server_group)
+                stopped_ec2_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(stopped_ec2_instance_list) > 0:
+                    JandiWebhook.send_stop_ec2_server_group_message(self.get_schedule(), server_group,
+                                                                    stopped_ec2_instance_list)
+
+                self.send_ec2_action_failure_message('EC2 중지 실패 서버 목록', result_list)
+                return result_list
 
         elif server_group['InstanceType'] == 'RDS':
-            rds_instance_list = self.get_server_group_ec2_instance_list(server_group)
+            rds_instance_list = self.get_server_group_rds_instance_list(server_group)
             stop_rds_instance_list = ScheduleUtil.get_rds_instance_list_by_status(rds_instance_list, 'available')
-            self.stop_rds_instances(stop_rds_instance_list)
+
+            if len(stop_rds_instance_list) > 0:
+                result_list = self.stop_rds_instances(stop_rds_instance_list)
+                self.invalidate_server_group_instance_list(server_group)
+                stopped_rds_instance_list = ActionDispatcher.get_succeeded_target_list(result_list)
+
+                if len(stopped_rds_instance_list) > 0:
+                    JandiWebhook.send_stop_rds_server_group_message(self.get_schedule(), server_group,
+                                                                    stopped_rds_instance_list)
+
+                self.send_rds_action_failure_message('RDS 중지 실패 서버 목록', result_list)
+                return result_list
+
+    def stop_server_group_wave(self, server_group_list):
+        def stop_server_group(server_group):
+            try:
+                with TRACER.span('server-group', Action='stop', GroupName=server_group['GroupName']):
+                    self.stop_server_group_instance(server_group)
+            except Exception as e:
+                JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
+
+        with ThreadPoolExecutor(max_workers=max(1, SERVER_GROUP_CONCURRENCY)) as executor:
+            list(executor.map(ScheduleLog.bind(stop_server_group), server_group_list))
 
     def start(self, is_force=False):
 
@@ -724,39 +3337,111 @@ class GroupSchedule(Schedule):
             return
 
         is_all_server_group_running = True
-        server_group_list = self.get_schedule_server_group_list()
+        level_list, cyclic_server_group_list = self.build_server_group_level_list()
+
+        # 순환과 관계없는 그룹은 그대로 시작하고 순환에 걸린 그룹은 알림만 보낸다
+        if cyclic_server_group_list:
+            is_all_server_group_running = False
+            self.send_server_group_cycle_message(cyclic_server_group_list)
+
+        for level, server_group_list in enumerate(level_list):
+            for server_group in server_group_list:
+                is_dependency_started = self.is_dependency_server_group_all_running(server_group)
+
+                if is_dependency_started:
+                    try:
+                        with TRACER.span('server-group', Action='start', GroupName=server_group['GroupName']):
+                            self.start_server_group_instance(server_group)
+                    except Exception as e:
+                        JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
+                else:
+                    is_all_server_group_running = False
+                    print(server_group['GroupName'] + ' 의 의존관계 ' + str(server_group['Dependency']) +
+                          ' 가 아직 시작하지 않았습니다')
 
-        for server_group in server_group_list:
-            is_dependency_started = self.is_dependency_server_group_all_running(server_group)
+            # 다음 level 이 있으면 이번 level 이 모두 시작될 때까지 남은 실행시간 안에서 기다린다
+            if level + 1 < len(level_list) and self.time_budget is not None:
+                self.wait_server_group_list_running(server_group_list)
 
-            if is_dependency_started:
-                try:
-                    self.start_server_group_instance(server_group)
-                except Exception as e:
-                    JandiWebhook.send_exception_err_message(self.get_schedule(), e, traceback.format_exc())
-            else:
-                is_all_server_group_running = False
-                print(server_group['GroupName'] + ' 의 의존관계 ' + str(server_group['Dependency']) + ' 가 아직 시작하지 않았습니다')
+        if is_force and is_all_server_group_running:
+            self.set_schedule_force_start(False)
+
+    def stop(self, is_force=False):
+
+        if not self.get_schedule_server_group_list():
+            super().stop(is_force)
+            return
+
+        if not self.is_stop_time() and not is_force:
+            return
+
+        level_list, cyclic_server_group_list = self.build_server_group_level_list()
+
+        if cyclic_server_group_list:
+            self.send_server_group_cycle_message(cyclic_server_group_list)
+            # 중지 순서를 정할 수 없으므로 의존관계와 상관없이 스케쥴의 모든 인스턴스를 중지한다
+            self.stop_instances(self.get_ec2_instance_list(), self.get_rds_instance_list())
+            return
+
+        # 의존하는 그룹부터 역순으로 중지하며 같은 wave 의 그룹은 동시에 중지한다
+        wave_list = list(reversed(level_list))
+
+        for wave, server_group_list in enumerate(wave_list):
+            self.stop_server_group_wave(server_group_list)
+
+            if wave + 1 == len(wave_list) or self.time_budget is None:
+                continue
+
+            # 중지되지 않는 그룹(중지 실패, 중지할 수 없는 RDS 등) 때문에 나머지 그룹이 계속 남지 않도록 이어서 중지한다
+            if not self.wait_server_group_list_stopped(server_group_list):
+                JandiWebhook.send_warning_message(
+                    '{0} 스케쥴의 서버 그룹이 중지되지 않았지만 나머지 그룹을 이어서 중지합니다'.format(self.schedule_name),
+                    [JandiWebhook.build_connect_info('중지되지 않은 서버 그룹', ', '.join(
+                        server_group['GroupName'] for server_group in server_group_list))])
+
+        # 그룹에 속하지 않은 인스턴스는 의존관계가 없으므로 그룹 중지와 상관없이 중지한다
+        self.stop_instances(self.get_ungrouped_ec2_instance_list(), self.get_ungrouped_rds_instance_list())
+
+    def get_ungrouped_ec2_instance_list(self) -> list:
+        # ScheduleGroupName 태그가 없거나 등록되지 않은 그룹의 인스턴스
+        grouped_ec2_instance_id_set = set()
+
+        for server_group in self.get_schedule_server_group_list():
+            if server_group['InstanceType'] == 'EC2':
+                grouped_ec2_instance_id_set.update(ScheduleUtil.get_ec2_instance_ids(
+                    self.load_server_group_ec2_instance_list(server_group)))
+
+        return [ec2_instance for ec2_instance in self.get_ec2_instance_list()
+                if ec2_instance['InstanceId'] not in grouped_ec2_instance_id_set]
+
+    def get_ungrouped_rds_instance_list(self) -> list:
+        grouped_rds_instance_id_set = set()
+
+        for server_group in self.get_schedule_server_group_list():
+            if server_group['InstanceType'] == 'RDS':
+                grouped_rds_instance_id_set.update(ScheduleUtil.get_rds_instance_ids(
+                    self.load_server_group_rds_instance_list(server_group)))
 
-        if is_force and is_all_server_group_running:
-            self.set_schedule_force_start(False)
+        return [rds_instance for rds_instance in self.get_rds_instance_list()
+                if rds_instance['DBInstanceIdentifier'] not in grouped_rds_instance_id_set]
 
 
 class ExceptionSchedule(GroupSchedule):
     schedule_exception_list = None
+    exception_value_map = None
 
-    def __init__(self, schedule_name):
-        super().__init__(schedule_name)
+    def __init__(self, schedule_name, inventory=None, exception_value_map=None, time_budget=None):
+        super().__init__(schedule_name, inventory, time_budget)
+        # Scheduler 에서 실행일의 모든 예외를 한번에 조회하여 주입한다
+        self.exception_value_map = exception_value_map
 
     def load_schedule_exception_list_from_db(self):
         schedule_date_ymd = self.get_exception_date_ymd()
-        table = self.db.Table('ScheduleException')
-        response = table.scan(
-            Select='ALL_ATTRIBUTES',
-            FilterExpression=Attr('ScheduleName').eq(self.schedule_name) & Attr('ExceptionDate').eq(schedule_date_ymd)
-        )
 
-        return response['Items']
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_schedule_exception_list(self.schedule_name, schedule_date_ymd)
+
+        return self.repository.query_schedule_exception_list(self.schedule_name, schedule_date_ymd)
 
     def get_exception_date_ymd(self) -> str:
         return datetime.now().strftime('%Y-%m-%d')
@@ -767,100 +3452,44 @@ class ExceptionSchedule(GroupSchedule):
 
         return [] if self.schedule_exception_list is None else self.schedule_exception_list
 
-    def get_exception_value(self, exception_type):
-        exception_list = self.get_schedule_exception_list()
-
-        for exception in exception_list:
-            if exception['ExceptionType'] == exception_type:
-                return exception['ExceptionValue']
-
-        return None
-
-    def get_start_date_time(self):
-        origin_start_date_time = super(ExceptionSchedule, self).get_start_date_time()
+    def get_exception_value_map(self) -> dict:
+        if self.exception_value_map is None:
+            self.exception_value_map = ScheduleRepository.build_exception_value_map(
+                self.get_schedule_exception_list())
 
-        start_exception_value = self.get_exception_value('start')
-
-        if start_exception_value is None:
-            return origin_start_date_time
-        elif start_exception_value == 'None':
-            return None
-        else:
-            if origin_start_date_time is None:
-                return ScheduleUtil.hm_to_date_time(start_exception_value)
-            else:
-                return ScheduleUtil.replace_time(origin_start_date_time, start_exception_value)
+        return self.exception_value_map
 
-    def get_stop_date_time(self):
-        origin_stop_date_time = super(ExceptionSchedule, self).get_stop_date_time()
+    def get_exception_value(self, exception_type):
+        return self.get_exception_value_map().get((self.schedule_name, exception_type))
 
-        stop_exception_value = self.get_exception_value('stop')
+    def get_schedule_spec(self) -> ScheduleSpec:
+        # 실행일의 시작 / 중지 예외를 반영하여 compile 한다
+        if self.schedule_spec is None:
+            self.schedule_spec = ScheduleSpec.compile(self.get_schedule(), self.get_exception_value_map())
 
-        if stop_exception_value is None:
-            return origin_stop_date_time
-        elif stop_exception_value == 'None':
-            return None
-        else:
-            if origin_stop_date_time is None:
-                return ScheduleUtil.hm_to_date_time(stop_exception_value)
-            else:
-                return ScheduleUtil.replace_time(origin_stop_date_time, stop_exception_value)
+        return self.schedule_spec
 
     def set_schedule_exception(self, exception_date, exception_type, exception_value):
-        scan_items = self.scan_schedule_exception(exception_date, exception_type)
-        is_already = True if len(scan_items) > 0 else False
-
-        if is_already:
-            self.update_schedule_exception(scan_items[0], exception_value)
-        else:
-            self.insert_schedule_exception(exception_date, exception_type, exception_value)
-
-    def remove_schedule_exception(self, exception_date, exception_type):
-        scan_items = self.scan_schedule_exception(exception_date, exception_type)
-
-        for item in scan_items:
-            self.delete_schedule_exception(item)
-
-    def scan_schedule_exception(self, exception_date, exception_type):
-        scan_result = self.db.Table('ScheduleException').scan(
-            Select='ALL_ATTRIBUTES',
-            FilterExpression=Attr('ScheduleName').eq(self.schedule_name) & Attr('ExceptionDate').eq(
-                exception_date.strftime('%Y-%m-%d')) & Attr('ExceptionType').eq(exception_type)
-        )
+        self.schedule_exception_list = None
+        self.exception_value_map = None
+        self.schedule_spec = None
 
-        return scan_result['Items']
+        res = self.repository.put_schedule_exception(
+            self.schedule_name, exception_date.strftime('%Y-%m-%d'), exception_type, exception_value)
+        CONFIG_CACHE.notify_changed()
 
-    def insert_schedule_exception(self, exception_date, exception_type, exception_value):
-        new_uuid = str(uuid.uuid4())
+        return res
 
-        return self.db.Table('ScheduleException').put_item(
-            Item={
-                'ExceptionUuid': new_uuid,
-                'ExceptionDate': exception_date.strftime('%Y-%m-%d'),
-                'ExceptionType': exception_type,
-                'ExceptionValue': exception_value,
-                'ScheduleName': self.schedule_name
-            }
-        )
+    def remove_schedule_exception(self, exception_date, exception_type):
+        self.schedule_exception_list = None
+        self.exception_value_map = None
+        self.schedule_spec = None
 
-    def update_schedule_exception(self, item, value):
-        return self.db.Table('ScheduleException').update_item(
-            Key={
-                'ExceptionUuid': item['ExceptionUuid'],
-            },
-            UpdateExpression='set ExceptionValue=:c',
-            ExpressionAttributeValues={
-                ':c': value
-            },
-            ReturnValues='UPDATED_NEW'
-        )
+        res = self.repository.delete_schedule_exception(
+            self.schedule_name, exception_date.strftime('%Y-%m-%d'), exception_type)
+        CONFIG_CACHE.notify_changed()
 
-    def delete_schedule_exception(self, item):
-        return self.db.Table('ScheduleException').delete_item(
-            Key={
-                'ExceptionUuid': item['ExceptionUuid'],
-            }
-        )
+        return res
 
     def print_schedule_data(self):
 
@@ -898,36 +3527,249 @@ class SpecificDateSchedule(ExceptionSchedule):
 
     today_ymd = None
 
-    def __init__(self, schedule_name, today_ymd):
-        super().__init__(schedule_name)
+    def __init__(self, schedule_name, today_ymd, inventory=None):
+        super().__init__(schedule_name, inventory)
         self.today_ymd = today_ymd
 
     def get_exception_date_ymd(self) -> str:
         return datetime.strptime(self.today_ymd, '%Y-%m-%d').strftime('%Y-%m-%d')
 
 
+class ScheduleTimetable:
+    # Schedule Item 과 실행일 예외로 시작 / 중지 / 중지 알림 시각을 계산한다
+    # Scheduler 는 이번 실행에 처리할 시각이 없는 스케쥴을 AWS 조회 없이 건너뛴다
+    max_lookahead_day = 7
+
+    def __init__(self, item, exception_value_map=None):
+        self.item = item
+        self.exception_value_map = exception_value_map
+        self.today_spec = None
+        self.base_spec = None
+
+    def get_spec(self, is_today) -> ScheduleSpec:
+        # 예외는 실행일의 것만 알고 있으므로 이후 날짜는 기본 시각으로 계산한다
+        if is_today:
+            if self.today_spec is None:
+                self.today_spec = ScheduleSpec.compile(self.item, self.exception_value_map)
+            return self.today_spec
+
+        if self.base_spec is None:
+            self.base_spec = ScheduleSpec.compile(self.item)
+
+        return self.base_spec
+
+    def get_event_list(self, day, is_today) -> list:
+        spec = self.get_spec(is_today)
+
+        if not spec.is_active_week_day(day.weekday()):
+            return []
+
+        event_list = []
+        start_date_time = spec.get_start_date_time(day)
+        stop_date_time = spec.get_stop_date_time(day)
+
+        if start_date_time is not None:
+            event_list.append(('start', start_date_time))
+
+        if stop_date_time is not None:
+            event_list.append(('alert', stop_date_time - timedelta(minutes=STOP_ALERT_BEFORE_TIME_MINUTE)))
+            event_list.append(('stop', stop_date_time))
+
+        return event_list
+
+    def is_due(self, now) -> bool:
+        try:
+            return self.get_spec(True).is_due(now)
+        except Exception as e:
+            # 잘못된 스케쥴은 실행하여 에러 메세지를 보내도록 한다
+            print('{0} timetable error : {1}'.format(self.item['ScheduleName'], e))
+            return True
+
+    def get_next_event(self, now):
+        today = now.replace(second=0, microsecond=0)
+
+        try:
+            for day_offset in range(self.max_lookahead_day + 1):
+                event_list = self.get_event_list(today + timedelta(days=day_offset), day_offset == 0)
+                next_event_list = sorted([event for event in event_list if event[1] > now], key=lambda e: e[1])
+
+                if next_event_list:
+                    return next_event_list[0]
+        except Exception as e:
+            print('{0} timetable error : {1}'.format(self.item['ScheduleName'], e))
+
+        return None
+
+
 class Scheduler:
 
     @staticmethod
-    def run_job():
-        db = boto3.resource('dynamodb')
-        table = db.Table('Schedule')
-        response = table.scan()
+    def run_job(context=None):
+        inventory = ScheduleInventory(Schedule.ec2, Schedule.rds, tagging=Schedule.tagging)
+        time_budget = TimeBudget(context)
 
-        for item in response['Items']:
-            schedule = ExceptionSchedule(item['ScheduleName'])
-            schedule.print_schedule_data()
-            schedule.run()
+        with TRACER.span('config') as attributes:
+            exception_value_map = Scheduler.get_exception_value_map(datetime.now().strftime('%Y-%m-%d'))
+            item_list = Scheduler.get_schedule_item_list()
+            attributes['ScheduleCount'] = len(item_list)
+
+        with TRACER.span('decision', ScheduleCount=len(item_list)) as attributes:
+            due_item_list = Scheduler.get_due_item_list(item_list, exception_value_map, datetime.now())
+            attributes['DueScheduleCount'] = len(due_item_list)
+
+        AWS_CALL_STATS.set_property('ScheduleCount', len(item_list))
+        AWS_CALL_STATS.set_property('DueScheduleCount', len(due_item_list))
+
+        if due_item_list and CONFIG_CACHE.is_enabled():
+            # 실행할 스케쥴이 여럿일 수 있으므로 서버 그룹은 스케쥴별로 조회하지 않고 한번에 읽는다
+            CONFIG_CACHE.load_schedule_server_group_map()
+
+        if NOTIFICATION_DIGEST:
+            JandiWebhook.digest = NotificationDigest(NOTIFICATION_DIGEST_MAX_LENGTH)
+
+        # 서버 그룹 대기가 스케쥴 실행 슬롯을 오래 점유하지 않도록 스케쥴별로 남은 실행시간을 나누어 주고
+        # 그 안에 끝나지 않은 그룹은 다음 실행시 이어서 처리한다
+        schedule_concurrency = max(1, SCHEDULE_CONCURRENCY)
+        round_count = max(1, (len(due_item_list) + schedule_concurrency - 1) // schedule_concurrency)
+        schedule_second = time_budget.get_remaining_second() / round_count
+
+        try:
+            with ScheduleLog.capture() as schedule_log:
+                with ThreadPoolExecutor(max_workers=schedule_concurrency) as executor:
+                    result_list = list(executor.map(ScheduleLog.bind(
+                        lambda item: Scheduler.run_schedule(item, inventory, exception_value_map,
+                                                            time_budget.slice(schedule_second), schedule_log)),
+                        due_item_list))
+        finally:
+            digest = JandiWebhook.digest
+            JandiWebhook.digest = None
+
+            if digest is not None:
+                with TRACER.span('notification', Phase='digest', EventCount=len(digest.event_list)):
+                    digest.send()
+
+        Scheduler.print_timing_summary(result_list)
+        Scheduler.persist_inventory_snapshot(inventory, item_list, due_item_list, context, time_budget)
+        AWS_RATE_LIMITER.print_stats()
+
+    @staticmethod
+    def persist_inventory_snapshot(inventory, item_list, due_item_list, context, time_budget):
+        if not InventorySnapshot.is_persist_needed(len(due_item_list) > 0, time.time()):
+            return
+
+        # Lambda 제한 시간이 얼마 남지 않았으면 다음 실행에 저장한다
+        if context is not None and time_budget.is_expired():
+            print('Inventory snapshot skipped : time budget expired')
+            return
+
+        try:
+            with AwsCallStats.scope('inventory-snapshot'), TRACER.span('inventory-snapshot'):
+                InventorySnapshot.persist(inventory, item_list, due_item_list)
+        except Exception:
+            # 스냅샷 저장 실패는 스케쥴 실행 결과에 영향을 주지 않는다, Bot status 는 실시간 조회로 대체된다
+            print(traceback.format_exc())
+
+    @staticmethod
+    def get_schedule_item_list() -> list:
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_schedule_item_list()
+
+        return list(DynamoReader.scan(Schedule.db.Table('Schedule')))
+
+    @staticmethod
+    def get_exception_value_map(exception_date_ymd) -> dict:
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_exception_value_map(exception_date_ymd)
+
+        return Schedule.repository.query_exception_value_map(exception_date_ymd)
+
+    @staticmethod
+    def get_exception_list(exception_date_ymd) -> list:
+        if CONFIG_CACHE.is_enabled():
+            return CONFIG_CACHE.get_exception_list(exception_date_ymd)
+
+        return Schedule.repository.query_exception_list(exception_date_ymd)
+
+    @staticmethod
+    def get_due_item_list(item_list, exception_value_map, now) -> list:
+        due_item_list = []
+        idle_count = 0
+        timetable_list = []
+        spec_list = []
+
+        for item in item_list:
+            timetable = ScheduleTimetable(item, exception_value_map)
+
+            try:
+                spec_list.append(timetable.get_spec(True))
+                timetable_list.append(timetable)
+            except Exception as e:
+                # 잘못된 스케쥴은 실행하여 에러 메세지를 보내도록 한다
+                print('{0} timetable error : {1}'.format(item['ScheduleName'], e))
+                due_item_list.append(item)
+
+        for timetable, is_due in zip(timetable_list, ScheduleSpecEvaluator(spec_list).get_due_list(now)):
+            item = timetable.item
+
+            if is_due:
+                due_item_list.append(item)
+                continue
+
+            idle_count += 1
+            next_event = timetable.get_next_event(now) if item.get('Enabled') else None
+
+            if next_event is not None:
+                print('{0} : idle, next {1} at {2}'.format(item['ScheduleName'], next_event[0], next_event[1]))
+
+        print('Due schedules : {0}, idle schedules : {1}'.format(len(due_item_list), idle_count))
+
+        return due_item_list
+
+    @staticmethod
+    def run_schedule(item, inventory, exception_value_map, time_budget, schedule_log):
+        schedule_name = item['ScheduleName']
+        is_success = True
+        start = time.time()
+
+        schedule_log.begin(schedule_name)
+
+        try:
+            with TRACER.span('schedule'):
+                schedule = ExceptionSchedule(schedule_name, inventory, exception_value_map, time_budget)
+                # Scan 한 Item 을 그대로 사용하여 스케쥴별 get_item 을 생략한다
+                schedule.schedule_data = item
+                schedule.print_schedule_data()
+                schedule.run()
+        except Exception as e:
+            # 한 스케쥴의 에러가 다른 스케쥴 실행에 영향을 주지 않도록 한다
+            is_success = False
+            print(traceback.format_exc())
+            JandiWebhook.send_exception_err_message(item, e, traceback.format_exc())
+        finally:
             Scheduler.print_line()
+            schedule_log.end()
+
+        return {
+            'ScheduleName': schedule_name,
+            'Elapsed': time.time() - start,
+            'Success': is_success
+        }
+
+    @staticmethod
+    def print_timing_summary(result_list):
+        print('Schedule Timing Summary')
+
+        for result in sorted(result_list, key=lambda r: r['Elapsed'], reverse=True):
+            print('{0} : {1:.3f}s {2}'.format(
+                result['ScheduleName'], result['Elapsed'], 'OK' if result['Success'] else 'FAIL'))
 
     @staticmethod
     def print_schedules():
-        db = boto3.resource('dynamodb')
-        table = db.Table('Schedule')
-        response = table.scan()
+        inventory = ScheduleInventory(Schedule.ec2, Schedule.rds, tagging=Schedule.tagging)
+        exception_value_map = Scheduler.get_exception_value_map(datetime.now().strftime('%Y-%m-%d'))
 
-        for item in response['Items']:
-            schedule = ExceptionSchedule(item['ScheduleName'])
+        for item in Scheduler.get_schedule_item_list():
+            schedule = ExceptionSchedule(item['ScheduleName'], inventory, exception_value_map)
             schedule.print_schedule_data()
             schedule.print_schedule_group_data()
             Scheduler.print_line()
@@ -946,9 +3788,11 @@ class BotError(Exception):
         self.value = value
 
     def err_response(self):
+        return SchedulerBot.build_http_response(self.err_message())
+
+    def err_message(self):
         connect_info = JandiWebhook.build_connect_info("Error Stack", traceback.format_exc())
-        return SchedulerBot.build_http_response(
-            JandiWebhook.build_message(self.__str__(), JandiWebhook.color_err, [connect_info]))
+        return JandiWebhook.build_message(self.__str__(), JandiWebhook.color_err, [connect_info])
 
 
 class BotInvalidError(BotError):
@@ -958,9 +3802,8 @@ class BotInvalidError(BotError):
     def __str__(self):
         return str(self.value)
 
-    def err_response(self):
-        return SchedulerBot.build_http_response(
-            JandiWebhook.build_message(self.__str__(), JandiWebhook.color_err))
+    def err_message(self):
+        return JandiWebhook.build_message(self.__str__(), JandiWebhook.color_err)
 
 
 class BotCommandSyntaxError(BotError):
@@ -971,12 +3814,75 @@ class BotCommandSyntaxError(BotError):
         super(BotCommandSyntaxError, self).__init__(value, bot)
         self.description = description
 
-    def err_response(self):
+    def err_message(self):
         connect_info = {} if not self.description else \
             JandiWebhook.build_connect_info(str(self), self.description)
 
-        return SchedulerBot.build_http_response(
-            JandiWebhook.build_message('잘 못들었습니다?', JandiWebhook.color_err, [connect_info]))
+        return JandiWebhook.build_message('잘 못들었습니다?', JandiWebhook.color_err, [connect_info])
+
+
+class BotJob:
+    # 오래 걸리는 Bot 명령은 job 으로 등록하고 바로 응답한 뒤 따로 실행하여 결과를 incoming webhook 으로 보낸다
+    lambda_client = LazyAttribute(lambda: AwsSession.client('lambda'))
+    result_max_length = 1000
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return BOT_ASYNC_MODE in ['lambda', 'local']
+
+    @staticmethod
+    def get_expire_at() -> float:
+        return time.time() + BOT_JOB_EXPIRE_DAY * 86400
+
+    @staticmethod
+    def submit(body, context=None):
+        # job 을 기록하거나 비동기 호출하지 못하면 None 을 반환하고, 호출한 쪽에서 요청 안에서 바로 실행한다
+        job_id = uuid.uuid4().hex[:8]
+        job = {'JobId': job_id, 'Body': body}
+
+        try:
+            Schedule.repository.put_bot_job(job_id, 'queued', body['text'], BotJob.get_expire_at())
+        except Exception as e:
+            print('Bot job record failed, run synchronously : {0}'.format(e))
+            return None
+
+        if BOT_ASYNC_MODE != 'lambda':
+            # Lambda 밖에서는 같은 프로세스에서 바로 실행한다
+            BotJob.run(job)
+            return job_id
+
+        try:
+            function_name = context.invoked_function_arn if context is not None \
+                else os.environ['AWS_LAMBDA_FUNCTION_NAME']
+
+            BotJob.lambda_client.invoke(FunctionName=function_name, InvocationType='Event',
+                                        Payload=json.dumps({'BotJob': job}))
+        except Exception as e:
+            print('Bot job invoke failed, run synchronously : {0}'.format(e))
+            Schedule.repository.put_bot_job(job_id, 'failed', body['text'], BotJob.get_expire_at(),
+                                            'Lambda invoke failed, ran synchronously')
+            return None
+
+        return job_id
+
+    @staticmethod
+    def run(job):
+        job_id = job['JobId']
+        command_text = job['Body']['text']
+        print('Bot job {0} : {1}'.format(job_id, command_text))
+
+        Schedule.repository.put_bot_job(job_id, 'running', command_text, BotJob.get_expire_at())
+
+        message = SchedulerBot({'body': json.dumps(job['Body'])}, job_id=job_id).execute()
+        is_success = message['connectColor'] != JandiWebhook.color_err
+
+        Schedule.repository.put_bot_job(job_id, 'succeeded' if is_success else 'failed', command_text,
+                                        BotJob.get_expire_at(), message['body'][:BotJob.result_max_length])
+
+        JandiWebhook.send_message('[job {0}] {1}'.format(job_id, message['body']), message['connectColor'],
+                                  message.get('connectInfo'))
+
+        return message
 
 
 class SchedulerBot:
@@ -984,31 +3890,40 @@ class SchedulerBot:
     event = None
     body = None
     schedule = None
+    context = None
+    # BotJob 으로 실행 중이면 job id, 요청 안에서 실행 중이면 None
+    job_id = None
+    all_command_list = ['status', 's', 'info', 'i', 'exception', 'e']
 
-    def __init__(self, event) -> None:
+    def __init__(self, event, context=None, job_id=None) -> None:
         super().__init__()
         self.event = event
+        self.context = context
+        self.job_id = job_id
         self.body = json.loads(self.event['body'])
         print(self.body)
 
     def run(self):
+        return self.build_http_response(self.execute())
+
+    def execute(self):
         try:
             if not self.is_valid_token():
-                return self.wrong_response('손들어 움직이면 쏜다!')
+                return JandiWebhook.build_message('손들어 움직이면 쏜다!', JandiWebhook.color_warning)
 
             command_result = self.command()
 
             if type(command_result) == str:
-                return self.build_http_response(JandiWebhook.build_message(command_result, JandiWebhook.color_ok))
+                return JandiWebhook.build_message(command_result, JandiWebhook.color_ok)
             else:
-                return self.build_http_response(command_result)
+                return command_result
 
         except BotError as be:
-            return be.err_response()
+            return be.err_message()
 
         except Exception as e:
             print(traceback.format_exc())
-            return self.not_handle_err_response(e, traceback.format_exc())
+            return self.not_handle_err_message(e, traceback.format_exc())
 
     def is_valid_token(self) -> bool:
         print('token : ' + self.body['token'])
@@ -1025,8 +3940,14 @@ class SchedulerBot:
         # 도움말
         if args[0] == 'help':
             return self.help()
+        elif args[0] == 'job':
+            return self.job(args[1:])
+        elif args[0] in self.all_command_list and 'all' in args[1:3]:
+            return self.command_all(args)
         else:
-            return self.command_schedule(args)
+            # Bot 명령의 AWS 호출은 대상 스케쥴로 집계한다
+            with AwsCallStats.scope(args[0]):
+                return self.command_schedule(args)
 
     def command_schedule(self, args):
         schedule_name = args[0]
@@ -1040,7 +3961,7 @@ class SchedulerBot:
         command = args[1]
 
         if command == 'status' or command == 's':
-            return self.status()
+            return self.status(args[2:])
         elif command == 'info' or command == 'i':
             return self.info(args[2:])
         elif command == 'exception' or command == 'e':
@@ -1052,6 +3973,148 @@ class SchedulerBot:
         else:
             raise BotCommandSyntaxError('Wrong command', self)
 
+    def command_all(self, args):
+        command = args[0]
+
+        if command in ['status', 's'] and args[1] == 'all':
+            return self.status_all(args[2:])
+        elif command in ['info', 'i'] and args[1] == 'all':
+            return self.info_all(args[2:])
+        elif command in ['exception', 'e'] and args[1] in ['info', 'i'] and len(args) > 2 and args[2] == 'all':
+            return self.exception_info_all(args[3:])
+        else:
+            raise BotCommandSyntaxError('Wrong all command', self)
+
+    def get_date_arg(self, args) -> str:
+        if len(args) == 0:
+            return datetime.now().strftime('%Y-%m-%d')
+
+        if not ScheduleUtil.is_valid_date(args[0]):
+            raise BotInvalidError('날짜 형식을 잘못 입력하였습니다', self)
+
+        return args[0]
+
+    @staticmethod
+    def build_bounded_description(line_list, max_length) -> str:
+        # Jandi 메세지가 너무 길어지지 않도록 max_length 를 넘는 줄은 개수만 표시한다
+        description_list = []
+        length = 0
+
+        for i, line in enumerate(line_list):
+            if length + len(line) + 1 > max_length:
+                description_list.append('... 외 {0}개'.format(len(line_list) - i))
+                break
+
+            description_list.append(line)
+            length += len(line) + 1
+
+        return '\n'.join(description_list)
+
+    def status_all(self, args):
+        if len(args) > 0 and args[0] != 'live':
+            raise BotCommandSyntaxError('Wrong command', self)
+
+        item_list = sorted(Scheduler.get_schedule_item_list(), key=lambda item: item['ScheduleName'])
+        is_live = len(args) > 0 or not InventorySnapshot.is_enabled()
+        snapshot_map = {} if is_live else InventorySnapshot.load_map([item['ScheduleName'] for item in item_list])
+
+        # 스냅샷이 없는 스케쥴이 있으면 계정 전체 인벤토리를 한번 조회한다
+        if is_live or len(snapshot_map) < len(item_list):
+            ack_message = self.submit_job('모든 스케쥴의 서버 상태를 조회하겠습니다!')
+
+            if ack_message is not None:
+                return ack_message
+
+            is_live = True
+            snapshot_map = InventorySnapshot.capture_all(item_list)
+
+        now_epoch = time.time()
+        total_on = 0
+        total_off = 0
+        empty_count = 0
+        oldest_captured_at = now_epoch
+        line_list = []
+
+        for item in item_list:
+            snapshot = snapshot_map.get(item['ScheduleName'])
+
+            if snapshot is None:
+                continue
+
+            on, off = InventorySnapshot.count_status(snapshot)
+
+            if on + off == 0:
+                empty_count += 1
+                continue
+
+            total_on += on
+            total_off += off
+            oldest_captured_at = min(oldest_captured_at, snapshot['CapturedAt'])
+            line_list.append('{0} : 총 {1}, 작업 {2}, 열외 {3}'.format(item['ScheduleName'], on + off, on, off))
+
+        captured = '실시간 조회' if is_live else \
+            '가장 오래된 상태 {0}'.format(InventorySnapshot.get_age_text(oldest_captured_at, now_epoch))
+
+        return JandiWebhook.build_message(
+            '보고 합니다! 스케쥴 **{0}**개, 서버 총 : **{1}**, 작업 : **{2}**, 열외 : **{3}** 이상! ({4})'.format(
+                len(item_list), total_on + total_off, total_on, total_off, captured),
+            JandiWebhook.color_ok,
+            [JandiWebhook.build_connect_info(
+                '스케쥴별 서버 상태' + (' (서버 없는 스케쥴 {0}개 제외)'.format(empty_count) if empty_count else ''),
+                self.build_bounded_description(line_list, BOT_MESSAGE_MAX_LENGTH))])
+
+    def info_all(self, args):
+        ymd = self.get_date_arg(args)
+        day = datetime.strptime(ymd, '%Y-%m-%d')
+        exception_value_map = Scheduler.get_exception_value_map(ymd)
+        line_list = []
+
+        for item in sorted(Scheduler.get_schedule_item_list(), key=lambda item: item['ScheduleName']):
+            try:
+                spec = ScheduleSpec.compile(item, exception_value_map)
+            except Exception as e:
+                line_list.append('{0} : 잘못된 스케쥴 ({1})'.format(item['ScheduleName'], e))
+                continue
+
+            start = spec.get_start_date_time(day)
+            stop = spec.get_stop_date_time(day)
+
+            if not spec.is_enabled:
+                state = '꺼짐'
+            elif not spec.is_active_week_day(day.weekday()):
+                state = '휴무'
+            else:
+                state = '근무'
+
+            line_list.append('{0} : {1} ~ {2} ({3}, {4})'.format(
+                item['ScheduleName'],
+                start.strftime('%H:%M') if start is not None else 'None',
+                stop.strftime('%H:%M') if stop is not None else 'None',
+                state, item.get('DaysActive')))
+
+        return JandiWebhook.build_message(
+            '**{0}** 모든 스케쥴 정보 입니다! 총 **{1}**개'.format(ymd, len(line_list)), JandiWebhook.color_ok,
+            [JandiWebhook.build_connect_info('상세정보',
+                                             self.build_bounded_description(line_list, BOT_MESSAGE_MAX_LENGTH))])
+
+    def exception_info_all(self, args):
+        ymd = self.get_date_arg(args)
+        exception_list = sorted(Scheduler.get_exception_list(ymd),
+                                key=lambda e: (e['ScheduleName'], e['ExceptionKey']))
+
+        if len(exception_list) == 0:
+            return '**{0}** 모든 스케쥴의 근무시간 변경이 없습니다'.format(ymd)
+
+        line_list = ['{0} : **{1}** 시간을 **{2}**으로 변경'.format(
+            exception['ScheduleName'], exception['ExceptionType'], exception['ExceptionValue'])
+            for exception in exception_list]
+
+        return JandiWebhook.build_message(
+            '**{0}** 모든 스케쥴의 근무시간 변경표 입니다, 변경 **{1}**건'.format(ymd, len(exception_list)),
+            JandiWebhook.color_ok,
+            [JandiWebhook.build_connect_info('변경표',
+                                             self.build_bounded_description(line_list, BOT_MESSAGE_MAX_LENGTH))])
+
     def help(self):
 
         keyword = self.body['keyword']
@@ -1059,6 +4122,7 @@ class SchedulerBot:
         help_command_list = [
             '/{0} help : 도움말'.format(keyword),
             '/{0} [스케쥴명] status : 현재 서버 상태 조회'.format(keyword),
+            '/{0} [스케쥴명] status live : 현재 서버 상태 실시간 조회'.format(keyword),
             '/{0} [스케쥴명] info : 오늘의 스케쥴 조회'.format(keyword),
             '/{0} [스케쥴명] info [YYYY-MM-DD] : 특정일 스케쥴 조회'.format(keyword),
             '/{0} [스케쥴명] exception info : 오늘의 스케쥴 예외 조회'.format(keyword),
@@ -1066,129 +4130,95 @@ class SchedulerBot:
             '/{0} [스케쥴명] exception set [YYYY-MM-DD] [start|stop] [h:m] : 예외 설정'.format(keyword),
             '/{0} [스케쥴명] exception del [YYYY-MM-DD] [start|stop] : 예외 삭제'.format(keyword),
             '/{0} [스케쥴명] force_start : 서버 강제실행'.format(keyword),
-            '/{0} [스케쥴명] force_stop : 서버 강제중지'.format(keyword)]
+            '/{0} [스케쥴명] force_stop : 서버 강제중지'.format(keyword),
+            '/{0} job [job ID] : 오래 걸리는 명령의 실행 결과 조회'.format(keyword),
+            '/{0} status all : 모든 스케쥴의 서버 상태 조회'.format(keyword),
+            '/{0} info all [YYYY-MM-DD] : 모든 스케쥴의 오늘(특정일) 스케쥴 조회'.format(keyword),
+            '/{0} exception info all [YYYY-MM-DD] : 모든 스케쥴의 오늘(특정일) 스케쥴 예외 조회'.format(keyword)]
 
         connect_info = JandiWebhook.build_connect_info("명령 커멘드", '\n'.join(help_command_list))
 
         return JandiWebhook.build_message('충성!', JandiWebhook.color_ok, [connect_info])
 
-    def status(self):
-
-        has_server_group = self.schedule.has_server_group()
-
-        if has_server_group:
-            info = self.get_server_group_status_connect_info_list()
-        else:
-            info = self.get_server_status_connect_info_list()
+    def status(self, args):
+        if len(args) > 0 and args[0] != 'live':
+            raise BotCommandSyntaxError('Wrong command', self)
 
-        return JandiWebhook.build_message(
-            '보고 합니다! 현재 서버 상태는 총 : **{0}**, 작업 : **{1}**, 열외 : **{2}** 이상!'.format(
-                info['on'] + info['off'], info['on'], info['off']),
-            JandiWebhook.color_ok, info['connect_info_list'])
+        is_live = len(args) > 0 or not InventorySnapshot.is_enabled()
+        snapshot = None if is_live else InventorySnapshot.load(self.schedule.schedule_name)
 
-    def get_server_group_status_connect_info_list(self):
+        # 스냅샷이 아직 없으면 실시간으로 조회한다
+        if snapshot is None:
+            ack_message = self.submit_job('서버 상태를 실시간으로 조회하겠습니다!')
 
-        result = {}
-        on = 0
-        off = 0
-        connect_info_list = []
-        server_group_list = self.schedule.get_schedule_server_group_list()
+            if ack_message is not None:
+                return ack_message
 
-        for server_group in server_group_list:
-            instance_list = self.schedule.get_server_group_instance_list(server_group)
+            is_live = True
+            snapshot = InventorySnapshot.capture(self.schedule)
 
-            description_list = []
+        if self.schedule.has_server_group():
+            info = self.get_server_group_status_connect_info_list(snapshot)
+        else:
+            info = self.get_server_status_connect_info_list(snapshot)
 
-            for instance in instance_list:
+        if is_live:
+            captured = '실시간 조회'
+        else:
+            captured = '{0} 기준, {1}'.format(
+                datetime.fromtimestamp(snapshot['CapturedAt']).strftime('%H:%M:%S'),
+                InventorySnapshot.get_age_text(snapshot['CapturedAt'], time.time()))
 
-                instance_type = server_group['InstanceType']
-
-                if instance_type == 'EC2':
-                    status = ScheduleUtil.get_ec2_instance_status(instance)
-                    description_list.append('{0} : {1}'.format(
-                            ScheduleUtil.get_ec2_instance_name(instance),
-                            status))
-
-                    if status == 'running':
-                        on += 1
-                    else:
-                        off += 1
-
-                elif instance_type == 'RDS':
-                    status = ScheduleUtil.get_rds_instance_status(instance)
-                    description_list.append('{0} : {1}'.format(
-                            ScheduleUtil.get_rds_instance_name(instance),
-                            status))
-
-                    if status == 'available':
-                        on += 1
-                    else:
-                        off += 1
-                else:
-                    continue
+        return JandiWebhook.build_message(
+            '보고 합니다! 현재 서버 상태는 총 : **{0}**, 작업 : **{1}**, 열외 : **{2}** 이상! ({3})'.format(
+                info['on'] + info['off'], info['on'], info['off'], captured),
+            JandiWebhook.color_ok, info['connect_info_list'])
 
-            connect_info_list.append(
-                JandiWebhook.build_connect_info(
-                    '{0} 그룹의 서버 상태'.format(server_group['GroupName']),
-                    '\n'.join(description_list)))
+    @staticmethod
+    def count_status(row_list, running_status, result):
+        description_list = []
 
-        result['on'] = on
-        result['off'] = off
-        result['connect_info_list'] = connect_info_list
+        for name, status, group_name in row_list:
+            description_list.append('{0} : {1}'.format(name, status))
 
-        return result
+            if status == running_status:
+                result['on'] += 1
+            else:
+                result['off'] += 1
 
-    def get_server_status_connect_info_list(self):
-        result = {}
-        on = 0
-        off = 0
-        connect_info_list = []
-        rds_instance_list = self.schedule.get_rds_instance_list()
-        ec2_instance_list = self.schedule.get_ec2_instance_list()
+        return description_list
 
-        if len(rds_instance_list) > 0:
+    def get_server_group_status_connect_info_list(self, snapshot):
 
-            rds_desc_list = []
+        result = {'on': 0, 'off': 0, 'connect_info_list': []}
+        server_group_list = self.schedule.get_schedule_server_group_list()
 
-            for rds_instance in rds_instance_list:
-                status = ScheduleUtil.get_rds_instance_status(rds_instance)
-                rds_desc_list.append('{0} : {1}'.format(
-                        ScheduleUtil.get_rds_instance_name(rds_instance),
-                        status))
+        for server_group in server_group_list:
 
-                if status == 'available':
-                    on += 1
-                else:
-                    off += 1
+            instance_type = server_group['InstanceType']
+            running_status = 'available' if instance_type == 'RDS' else 'running'
+            row_list = [row for row in snapshot.get(instance_type, []) if row[2] == server_group['GroupName']]
+            description_list = self.count_status(row_list, running_status, result)
 
-            connect_info_list.append(
+            result['connect_info_list'].append(
                 JandiWebhook.build_connect_info(
-                    '{0} 서버 상태'.format('RDS'),
-                    '\n'.join(rds_desc_list)))
-
-        if len(ec2_instance_list) > 0:
+                    '{0} 그룹의 서버 상태'.format(server_group['GroupName']),
+                    '\n'.join(description_list)))
 
-            ec2_desc_list = []
+        return result
 
-            for ec2_instance in ec2_instance_list:
-                status = ScheduleUtil.get_ec2_instance_status(ec2_instance)
-                ec2_desc_list.append('{0} : {1}'.format(
-                        ScheduleUtil.get_ec2_instance_name(ec2_instance),
-                        status))
+    def get_server_status_connect_info_list(self, snapshot):
+        result = {'on': 0, 'off': 0, 'connect_info_list': []}
 
-                if status == 'running':
-                    on += 1
-                else:
-                    off += 1
+        for instance_type, running_status in [('RDS', 'available'), ('EC2', 'running')]:
 
-            connect_info_list.append(
-                JandiWebhook.build_connect_info(
-                    '{0} 서버 상태'.format('EC2'),
-                    '\n'.join(ec2_desc_list)))
+            if len(snapshot[instance_type]) > 0:
+                description_list = self.count_status(snapshot[instance_type], running_status, result)
 
-        result['on'] = on
-        result['off'] = off
-        result['connect_info_list'] = connect_info_list
+                result['connect_info_list'].append(
+                    JandiWebhook.build_connect_info(
+                        '{0} 서버 상태'.format(instance_type),
+                        '\n'.join(description_list)))
 
         return result
 
@@ -1319,12 +4349,56 @@ class SchedulerBot:
 
     def force_stop(self):
 
+        ack_message = self.submit_job('취침소등 준비하겠습니다!')
+
+        if ack_message is not None:
+            return ack_message
+
         self.schedule.set_schedule_force_start(False)
 
         self.schedule.stop(True)
 
         return '취침소등 하겠습니다!'
 
+    def job(self, args):
+        if not len(args) == 1:
+            raise BotCommandSyntaxError('Wrong job command', self)
+
+        job = Schedule.repository.get_bot_job(args[0])
+
+        if job is None:
+            raise BotInvalidError('**{0}** job 은 기록에 없지 말입니다'.format(args[0]), self)
+
+        desc_list = [
+            'Command : {0}'.format(job['Command']),
+            'Updated : {0}'.format(datetime.fromtimestamp(int(job['UpdatedAt'])).strftime('%Y-%m-%d %H:%M:%S'))
+        ]
+
+        if 'Result' in job:
+            desc_list.append('Result : {0}'.format(job['Result']))
+
+        color = JandiWebhook.color_err if job['JobStatus'] == 'failed' else JandiWebhook.color_ok
+
+        return JandiWebhook.build_message('**{0}** job 은 **{1}** 상태 입니다!'.format(args[0], job['JobStatus']),
+                                          color, [JandiWebhook.build_connect_info('상세정보', '\n'.join(desc_list))])
+
+    def is_async_available(self) -> bool:
+        # job 으로 실행 중인 명령은 다시 job 으로 등록하지 않는다
+        return self.job_id is None and BotJob.is_enabled()
+
+    def submit_job(self, ack_message):
+        # job 으로 실행하지 못하면 None 을 반환한다
+        if not self.is_async_available():
+            return None
+
+        job_id = BotJob.submit(self.body, self.context)
+
+        if job_id is None:
+            return None
+
+        return JandiWebhook.build_message(
+            '{0} 결과는 job **{1}** 로 보고 드리겠습니다!'.format(ack_message, job_id), JandiWebhook.color_ok)
+
     @staticmethod
     def build_http_response(res=None):
         return {
@@ -1335,22 +4409,57 @@ class SchedulerBot:
             },
         }
 
-    def wrong_response(self, wrong_message):
-        return self.build_http_response(JandiWebhook.build_message(wrong_message, JandiWebhook.color_warning))
-
-    def not_handle_err_response(self, exception, error_stack):
+    @staticmethod
+    def not_handle_err_message(exception, error_stack):
         connect_info = JandiWebhook.build_connect_info(str(exception), error_stack)
-        return self.build_http_response(JandiWebhook.build_message('검열한번 하셔야 할거 같지 말입니다',
-                                                                   JandiWebhook.color_err, [connect_info]))
+        return JandiWebhook.build_message('검열한번 하셔야 할거 같지 말입니다', JandiWebhook.color_err, [connect_info])
+
+
+def get_invocation_name(event) -> str:
+    if event and 'httpMethod' in event:
+        return 'bot'
+    elif event and 'BotJob' in event:
+        return 'bot-job'
+    else:
+        return 'scheduler'
 
 
 def handle(event, context):
+    invocation = get_invocation_name(event)
+    AWS_CALL_STATS.reset(invocation)
+    TRACER.reset(invocation, context)
 
-    if event and 'httpMethod' in event:
-        bot = SchedulerBot(event)
-        res = bot.run()
-        print(res)
-        return res
+    try:
+        with PROFILER.profile(invocation, context), TRACER.span('invocation'):
+            return handle_event(event, context)
+    finally:
+        AWS_CALL_STATS.print_summary()
 
-    else:
-        return Scheduler.run_job()
+
+def handle_event(event, context):
+
+    try:
+        with TRACER.span('config-refresh'):
+            CONFIG_CACHE.refresh()
+
+        if event and 'httpMethod' in event:
+            bot = SchedulerBot(event, context)
+            res = bot.run()
+            print(res)
+            return res
+
+        elif event and 'BotJob' in event:
+            return BotJob.run(event['BotJob'])
+
+        else:
+            return Scheduler.run_job(context)
+    finally:
+        # Lambda 가 멈추기 전에 큐에 남은 웹훅 메세지를 보낸다
+        flush_timeout = WEBHOOK_FLUSH_TIMEOUT_SECOND
+
+        if context is not None:
+            flush_timeout = min(flush_timeout, TimeBudget(context, 1).get_remaining_second())
+
+        with TRACER.span('notification', Phase='flush',
+                         PendingCount=WEBHOOK_DISPATCHER.queue.unfinished_tasks) as attributes:
+            attributes['Done'] = WEBHOOK_DISPATCHER.flush(flush_timeout)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+# ExceptionUuid / Uuid 기반의 ScheduleServerGroup, ScheduleException 테이블을
+# ScheduleName Partition Key 기반의 새 테이블로 옮기고 스케쥴러 상태를 저장하는 ScheduleState 테이블을 만든다.
+#
+#   $ python scripts/migrate_schedule_tables.py --dry-run
+#   $ python scripts/migrate_schedule_tables.py
+import argparse
+
+import boto3
+
+
+def create_table_if_not_exists(db, table_name, range_key_name, read_capacity, write_capacity, date_index_name=None):
+    client = db.meta.client
+
+    if table_name in client.list_tables()['TableNames']:
+        print('Table already exists : ' + table_name)
+        return db.Table(table_name)
+
+    print('Create table : ' + table_name)
+
+    provisioned_throughput = {
+        'ReadCapacityUnits': read_capacity,
+        'WriteCapacityUnits': write_capacity
+    }
+    attribute_definitions = [
+        {'AttributeName': 'ScheduleName', 'AttributeType': 'S'},
+        {'AttributeName': range_key_name, 'AttributeType': 'S'}
+    ]
+    table_kwargs = {}
+
+    # Scheduler 가 실행일의 모든 예외를 한번에 query 할 수 있도록 ExceptionDate Index 를 만든다
+    if date_index_name is not None:
+        attribute_definitions.append({'AttributeName': 'ExceptionDate', 'AttributeType': 'S'})
+        table_kwargs['GlobalSecondaryIndexes'] = [{
+            'IndexName': date_index_name,
+            'KeySchema': [
+                {'AttributeName': 'ExceptionDate', 'KeyType': 'HASH'},
+                {'AttributeName': 'ScheduleName', 'KeyType': 'RANGE'}
+            ],
+            'Projection': {'ProjectionType': 'ALL'},
+            'ProvisionedThroughput': provisioned_throughput
+        }]
+
+    table = db.create_table(
+        TableName=table_name,
+        KeySchema=[
+            {'AttributeName': 'ScheduleName', 'KeyType': 'HASH'},
+            {'AttributeName': range_key_name, 'KeyType': 'RANGE'}
+        ],
+        AttributeDefinitions=attribute_definitions,
+        ProvisionedThroughput=provisioned_throughput,
+        **table_kwargs
+    )
+    table.meta.client.get_waiter('table_exists').wait(TableName=table_name)
+
+    return table
+
+
+def create_state_table_if_not_exists(db, table_name, read_capacity, write_capacity):
+    client = db.meta.client
+
+    if table_name in client.list_tables()['TableNames']:
+        print('Table already exists : ' + table_name)
+        return
+
+    print('Create table : ' + table_name)
+
+    client.create_table(
+        TableName=table_name,
+        KeySchema=[{'AttributeName': 'StateKey', 'KeyType': 'HASH'}],
+        AttributeDefinitions=[{'AttributeName': 'StateKey', 'AttributeType': 'S'}],
+        ProvisionedThroughput={
+            'ReadCapacityUnits': read_capacity,
+            'WriteCapacityUnits': write_capacity
+        }
+    )
+    client.get_waiter('table_exists').wait(TableName=table_name)
+
+    # 스냅샷과 Bot job 기록은 ExpireAt 이 지나면 자동으로 삭제한다
+    client.update_time_to_live(
+        TableName=table_name,
+        TimeToLiveSpecification={'Enabled': True, 'AttributeName': 'ExpireAt'}
+    )
+
+
+def scan_all(table):
+    kwargs = {}
+
+    while True:
+        response = table.scan(**kwargs)
+
+        for item in response['Items']:
+            yield item
+
+        if 'LastEvaluatedKey' not in response:
+            return
+
+        kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+
+def write_items(table, item_list, key_name_list, dry_run):
+    for item in item_list:
+        print('  ' + ' / '.join(str(item[key_name]) for key_name in key_name_list))
+
+    if dry_run:
+        return
+
+    with table.batch_writer(overwrite_by_pkeys=key_name_list) as batch:
+        for item in item_list:
+            batch.put_item(Item=item)
+
+
+def migrate_server_group(db, source_table_name, target_table_name, args):
+    source_table = db.Table(source_table_name)
+    item_map = {}
+
+    for item in scan_all(source_table):
+        key = (item['ScheduleName'], item['GroupName'])
+
+        if key in item_map:
+            print('Duplicated server group, last one wins : {0} / {1}'.format(*key))
+
+        item_map[key] = {
+            'ScheduleName': item['ScheduleName'],
+            'GroupName': item['GroupName'],
+            'InstanceType': item['InstanceType'],
+            'Dependency': item.get('Dependency', [])
+        }
+
+    print('{0} -> {1} : {2} items'.format(source_table_name, target_table_name, len(item_map)))
+
+    target_table = None if args.dry_run else \
+        create_table_if_not_exists(db, target_table_name, 'GroupName', args.read_capacity, args.write_capacity)
+
+    write_items(target_table, list(item_map.values()), ['ScheduleName', 'GroupName'], args.dry_run)
+
+
+def migrate_exception(db, source_table_name, target_table_name, args):
+    source_table = db.Table(source_table_name)
+    item_map = {}
+
+    for item in scan_all(source_table):
+        exception_key = '{0}#{1}'.format(item['ExceptionDate'], item['ExceptionType'])
+        key = (item['ScheduleName'], exception_key)
+
+        if key in item_map:
+            print('Duplicated exception, last one wins : {0} / {1}'.format(*key))
+
+        item_map[key] = {
+            'ScheduleName': item['ScheduleName'],
+            'ExceptionKey': exception_key,
+            'ExceptionDate': item['ExceptionDate'],
+            'ExceptionType': item['ExceptionType'],
+            'ExceptionValue': item['ExceptionValue']
+        }
+
+    print('{0} -> {1} : {2} items'.format(source_table_name, target_table_name, len(item_map)))
+
+    target_table = None if args.dry_run else \
+        create_table_if_not_exists(db, target_table_name, 'ExceptionKey', args.read_capacity, args.write_capacity,
+                                   args.exception_date_index)
+
+    write_items(target_table, list(item_map.values()), ['ScheduleName', 'ExceptionKey'], args.dry_run)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Migrate schedule tables to the ScheduleName keyed schema')
+    parser.add_argument('--region', default=None)
+    parser.add_argument('--source-server-group-table', default='ScheduleServerGroup')
+    parser.add_argument('--target-server-group-table', default='ScheduleServerGroupV2')
+    parser.add_argument('--source-exception-table', default='ScheduleException')
+    parser.add_argument('--target-exception-table', default='ScheduleExceptionV2')
+    parser.add_argument('--exception-date-index', default='ExceptionDate-index')
+    parser.add_argument('--state-table', default='ScheduleState')
+    parser.add_argument('--read-capacity', type=int, default=5)
+    parser.add_argument('--write-capacity', type=int, default=5)
+    parser.add_argument('--dry-run', action='store_true', help='print items without creating or writing tables')
+    args = parser.parse_args()
+
+    db = boto3.resource('dynamodb', region_name=args.region)
+
+    migrate_server_group(db, args.source_server_group_table, args.target_server_group_table, args)
+    migrate_exception(db, args.source_exception_table, args.target_exception_table, args)
+
+    if args.dry_run:
+        print('Create table if not exists : ' + args.state_table)
+    else:
+        create_state_table_if_not_exists(db, args.state_table, args.read_capacity, args.write_capacity)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+# main.py 는 import 할 때 필수 환경변수를 읽으므로 테스트용 값을 먼저 설정한다
+import os
+import sys
+
+os.environ.setdefault('WEBHOOK_URL', 'http://127.0.0.1:9/webhook')
+os.environ.setdefault('OUTGOING_WEBHOOK_TOKEN', 'test')
+os.environ.setdefault('STOP_ALERT_BEFORE_TIME_MINUTE', '10')
+os.environ.setdefault('AWS_DEFAULT_REGION', 'ap-northeast-2')
+os.environ.setdefault('AWS_ACCESS_KEY_ID', 'test')
+os.environ.setdefault('AWS_SECRET_ACCESS_KEY', 'test')
+os.environ.setdefault('TRACE_SPANS', 'false')
+os.environ.setdefault('AWS_CALL_STATS', 'off')
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'functions', 'awsInstanceScheduler'))
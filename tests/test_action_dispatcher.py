@@ -0,0 +1,50 @@
+import boto3
+from botocore.stub import Stubber
+
+import main
+
+
+def ec2_instance(instance_id) -> dict:
+    return {'InstanceId': instance_id, 'State': {'Name': 'running'}, 'Tags': []}
+
+
+def stopping_instance_list(instance_id_list) -> dict:
+    return {'StoppingInstances': [{'InstanceId': instance_id, 'CurrentState': {'Code': 64, 'Name': 'stopping'}}
+                                  for instance_id in instance_id_list]}
+
+
+def test_dispatch_chunk_bisects_to_the_failing_instance(monkeypatch):
+    # chunk 실행 순서대로 Stubber 응답이 소비되도록 하나씩 실행한다
+    monkeypatch.setattr(main, 'EC2_ACTION_CHUNK_SIZE', 4)
+    monkeypatch.setattr(main, 'EC2_ACTION_CONCURRENCY', 1)
+
+    ec2 = boto3.client('ec2')
+    stubber = Stubber(ec2)
+
+    # i-3 이 포함된 chunk 는 실패하므로 둘로 나누어 i-3 만 남을 때까지 다시 실행한다
+    for instance_id_list, is_success in [(['i-1', 'i-2', 'i-3', 'i-4'], False), (['i-1', 'i-2'], True),
+                                         (['i-3', 'i-4'], False), (['i-3'], False), (['i-4'], True),
+                                         (['i-5'], True)]:
+        expected_params = {'InstanceIds': instance_id_list, 'Force': True}
+
+        if is_success:
+            stubber.add_response('stop_instances', stopping_instance_list(instance_id_list), expected_params)
+        else:
+            stubber.add_client_error('stop_instances', 'IncorrectInstanceState',
+                                     'The instance i-3 is not in a state from which it can be stopped.',
+                                     expected_params=expected_params)
+
+    schedule = main.Schedule('dev')
+    schedule.ec2 = ec2
+
+    with stubber:
+        result_list = schedule.stop_ec2_instances([ec2_instance(instance_id) for instance_id in
+                                                   ['i-1', 'i-2', 'i-3', 'i-4', 'i-5']])
+
+        stubber.assert_no_pending_responses()
+
+    assert [(result['Target']['InstanceId'], result['Success']) for result in result_list] == [
+        ('i-1', True), ('i-2', True), ('i-3', False), ('i-4', True), ('i-5', True)]
+    assert 'IncorrectInstanceState' in main.ActionDispatcher.get_failed_result_list(result_list)[0]['Error']
+    assert [instance['InstanceId'] for instance in main.ActionDispatcher.get_succeeded_target_list(result_list)] == [
+        'i-1', 'i-2', 'i-4', 'i-5']
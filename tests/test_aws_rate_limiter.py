@@ -0,0 +1,119 @@
+from types import SimpleNamespace
+
+import boto3
+import pytest
+from botocore.hooks import HierarchicalEmitter
+
+import main
+
+
+class FakeClock:
+    # TokenBucket 이 쓰는 time.monotonic / time.sleep 을 대신하며 sleep 하면 시간이 그만큼 흐른다
+    def __init__(self):
+        self.now = 0.0
+        self.sleep_list = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, second):
+        self.sleep_list.append(second)
+        self.now += second
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(main, 'time', clock)
+
+    return clock
+
+
+@pytest.fixture
+def operation():
+    return boto3.client('ec2').meta.service_model.operation_model('DescribeInstances')
+
+
+def build_client():
+    # botocore 의 retry handler 없이 limiter 가 등록한 hook 만 실행하는 client
+    return SimpleNamespace(meta=SimpleNamespace(events=HierarchicalEmitter()))
+
+
+def emit_call(client, operation, parsed=None):
+    event_suffix = '{0}.{1}'.format(operation.service_model.endpoint_prefix, operation.name)
+    client.meta.events.emit('before-call.' + event_suffix, model=operation, params={}, context={})
+    client.meta.events.emit('after-call.' + event_suffix, model=operation, parsed=parsed or {}, context={},
+                            http_response=None)
+
+
+def emit_needs_retry(client, operation, error_code):
+    event_suffix = '{0}.{1}'.format(operation.service_model.endpoint_prefix, operation.name)
+    client.meta.events.emit('needs-retry.' + event_suffix, operation=operation, attempts=1, caught_exception=None,
+                            request_dict={}, response=(None, {'Error': {'Code': error_code}}))
+
+
+def test_token_bucket_blocks_until_refilled(clock):
+    bucket = main.TokenBucket('ec2', 2)
+
+    # capacity 만큼은 기다리지 않는다
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleep_list == []
+
+    # 토큰이 모자라면 1 / rate 초를 기다리고, 기다리는 동안 채워진 토큰은 이미 예약되어 있다
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleep_list == [0.5, 0.5]
+
+    # 오래 쉬어도 capacity 이상은 채우지 않는다
+    clock.now += 10
+    bucket.acquire()
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleep_list == [0.5, 0.5, 0.5]
+    assert bucket.get_stats() == {'Name': 'ec2', 'Rate': 2.0, 'MaxRate': 2.0, 'CallCount': 7, 'WaitCount': 3,
+                                  'WaitSecond': 1.5, 'ThrottleCount': 0}
+
+
+def test_throttle_backs_off_and_recovers_on_success(clock, operation):
+    limiter = main.AwsRateLimiter({'ec2': 2})
+    client = limiter.install(build_client())
+
+    emit_call(client, operation)
+    emit_call(client, operation)
+    assert clock.sleep_list == []
+
+    # Throttling 이면 rate 를 절반으로 줄이고 botocore 의 재시도 요청도 줄어든 rate 로 토큰을 받는다
+    emit_needs_retry(client, operation, 'RequestLimitExceeded')
+    bucket = limiter.bucket_map['ec2']
+    assert bucket.rate == 1.0
+    assert clock.sleep_list == [1.0]
+
+    # Throttling 이 아닌 에러와 에러 응답은 rate 를 바꾸지 않는다
+    emit_needs_retry(client, operation, 'InvalidInstanceID.NotFound')
+    emit_call(client, operation, {'Error': {'Code': 'RequestLimitExceeded'}})
+    assert bucket.rate == 1.0
+
+    # 여러번 Throttling 되어도 최소 rate 아래로는 줄이지 않는다
+    for i in range(10):
+        emit_needs_retry(client, operation, 'Throttling')
+    assert bucket.rate == 2 * main.TokenBucket.min_rate_ratio
+    assert bucket.throttle_count == 11
+
+    # 성공할 때마다 max rate 의 5% 씩 늘리고 max rate 를 넘지 않는다
+    for i in range(25):
+        emit_call(client, operation)
+    assert bucket.rate == 2.0
+
+
+def test_install_registers_on_resource_client():
+    limiter = main.AwsRateLimiter({'dynamodb': 50})
+    db = limiter.install(boto3.resource('dynamodb'))
+    operation = db.meta.client.meta.service_model.operation_model('GetItem')
+
+    db.meta.client.meta.events.emit('before-call.dynamodb.GetItem', model=operation, params={}, context={})
+
+    assert limiter.bucket_map['dynamodb'].call_count == 1
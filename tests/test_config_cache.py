@@ -0,0 +1,117 @@
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+
+class FakeConfigRepository:
+    # 조회할 때마다 호출 수를 세고 현재 설정을 돌려주는 Repository
+    def __init__(self):
+        self.version = 1
+        self.schedule_item_list = [{'ScheduleName': 'dev', 'StopTime': '20:00'}]
+        self.exception_list = [{'ScheduleName': 'dev', 'ExceptionKey': '2026-10-17#StopTime',
+                                'ExceptionType': 'StopTime', 'ExceptionValue': '22:00'}]
+        self.scan_count = 0
+        self.query_count = 0
+
+    def get_config_version(self) -> int:
+        if self.version is None:
+            raise RuntimeError('ScheduleState unavailable')
+
+        return self.version
+
+    def bump_config_version(self) -> int:
+        self.version += 1
+
+        return self.version
+
+    def scan_schedule_list(self) -> list:
+        self.scan_count += 1
+
+        return [dict(item) for item in self.schedule_item_list]
+
+    def query_exception_list(self, exception_date_ymd) -> list:
+        self.query_count += 1
+
+        return [dict(exception) for exception in self.exception_list]
+
+
+@pytest.fixture
+def repository(monkeypatch):
+    repository = FakeConfigRepository()
+    monkeypatch.setattr(main.Schedule, 'repository', repository)
+
+    return repository
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(main, 'time', SimpleNamespace(time=lambda: clock.now))
+
+    return clock
+
+
+def load(cache) -> tuple:
+    return cache.get_schedule_item('dev')['StopTime'], cache.get_exception_value_map('2026-10-17')
+
+
+def test_cache_is_reused_until_config_version_bump(repository, clock):
+    cache = main.ScheduleConfigCache(300)
+    cache.refresh()
+    cache.get_schedule_item_list()
+
+    assert load(cache) == ('20:00', {('dev', 'StopTime'): '22:00'})
+
+    # 같은 버전이면 다음 실행에서도 다시 읽지 않는다
+    repository.schedule_item_list[0]['StopTime'] = '21:00'
+    repository.exception_list = []
+    clock.now += 60
+    cache.refresh()
+
+    assert load(cache) == ('20:00', {('dev', 'StopTime'): '22:00'})
+    assert (repository.scan_count, repository.query_count) == (1, 1)
+
+    # Bot 이 설정을 바꾸면 버전이 올라 다음 refresh 에서 스케쥴과 예외를 모두 다시 읽는다
+    cache.notify_changed()
+    cache.refresh()
+    cache.get_schedule_item_list()
+
+    assert load(cache) == ('21:00', {})
+    assert (repository.scan_count, repository.query_count) == (2, 2)
+
+
+def test_cache_expires_after_ttl(repository, clock):
+    cache = main.ScheduleConfigCache(300)
+    cache.refresh()
+    cache.get_schedule_item_list()
+    load(cache)
+
+    # Console 에서 직접 바꾼 설정은 버전이 그대로여도 ttl 이 지나면 다시 읽는다
+    repository.schedule_item_list[0]['StopTime'] = '21:00'
+    repository.exception_list = []
+    clock.now += 300
+    cache.refresh()
+
+    assert load(cache) == ('20:00', {('dev', 'StopTime'): '22:00'})
+
+    clock.now += 1
+    cache.refresh()
+    cache.get_schedule_item_list()
+
+    assert load(cache) == ('21:00', {})
+    assert (repository.scan_count, repository.query_count) == (2, 2)
+
+
+def test_cache_is_dropped_when_version_check_fails(repository, clock):
+    cache = main.ScheduleConfigCache(300)
+    cache.refresh()
+    cache.get_schedule_item_list()
+    load(cache)
+
+    repository.version = None
+    cache.refresh()
+
+    assert cache.version is None
+    assert cache.schedule_item_list is None and cache.exception_list_map == {}
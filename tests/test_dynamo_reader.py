@@ -0,0 +1,133 @@
+import threading
+
+import boto3
+import pytest
+from botocore.stub import ANY, Stubber
+
+import main
+
+
+def schedule_item(schedule_name) -> dict:
+    return {'ScheduleName': {'S': schedule_name}}
+
+
+def get_schedule_name_list(item_list) -> list:
+    return [item['ScheduleName'] for item in item_list]
+
+
+@pytest.fixture
+def db():
+    return boto3.resource('dynamodb')
+
+
+class FakeSegmentTable:
+    # Stubber 는 응답을 호출 순서대로 돌려주므로 segment 를 스레드로 나누어 읽는 scan 은 segment 별 페이지를 직접 돌려준다
+    def __init__(self, segment_page_map, error_segment=None):
+        self.segment_page_map = segment_page_map
+        self.error_segment = error_segment
+        self.call_list = []
+        self.lock = threading.Lock()
+
+    def scan(self, **kwargs):
+        with self.lock:
+            self.call_list.append(kwargs)
+
+        if kwargs['Segment'] == self.error_segment:
+            raise RuntimeError('segment {0} failed'.format(kwargs['Segment']))
+
+        page_list = self.segment_page_map[kwargs['Segment']]
+        page_index = kwargs.get('ExclusiveStartKey', 0)
+        response = {'Items': page_list[page_index]}
+
+        if page_index + 1 < len(page_list):
+            response['LastEvaluatedKey'] = page_index + 1
+
+        return response
+
+
+def test_scan_follows_last_evaluated_key(db):
+    stubber = Stubber(db.meta.client)
+    stubber.add_response('scan', {'Items': [schedule_item('a'), schedule_item('b')],
+                                  'LastEvaluatedKey': schedule_item('b')},
+                         {'TableName': 'Schedule', 'Limit': 2})
+    stubber.add_response('scan', {'Items': [schedule_item('c')]},
+                         {'TableName': 'Schedule', 'Limit': 2, 'ExclusiveStartKey': {'ScheduleName': 'b'}})
+
+    with stubber:
+        item_list = list(main.DynamoReader.scan(db.Table('Schedule'), page_size=2, total_segments=1))
+
+        stubber.assert_no_pending_responses()
+
+    assert get_schedule_name_list(item_list) == ['a', 'b', 'c']
+
+
+def test_query_follows_last_evaluated_key(db):
+    stubber = Stubber(db.meta.client)
+    stubber.add_response('query', {'Items': [schedule_item('dev')], 'LastEvaluatedKey': schedule_item('dev')},
+                         {'TableName': main.SCHEDULE_SERVER_GROUP_TABLE, 'KeyConditionExpression': ANY})
+    stubber.add_response('query', {'Items': [schedule_item('dev')]},
+                         {'TableName': main.SCHEDULE_SERVER_GROUP_TABLE, 'KeyConditionExpression': ANY,
+                          'ExclusiveStartKey': {'ScheduleName': 'dev'}})
+
+    with stubber:
+        item_list = main.ScheduleRepository(db).query_schedule_server_group_list('dev')
+
+        stubber.assert_no_pending_responses()
+
+    assert get_schedule_name_list(item_list) == ['dev', 'dev']
+
+
+def test_scan_parallel_pages_reads_every_segment():
+    table = FakeSegmentTable({
+        0: [[{'ScheduleName': 'a'}], [{'ScheduleName': 'b'}]],
+        1: [[]],
+        2: [[{'ScheduleName': 'c'}], [], [{'ScheduleName': 'd'}]]
+    })
+
+    item_list = list(main.DynamoReader.scan(table, page_size=10, total_segments=3))
+
+    assert sorted(get_schedule_name_list(item_list)) == ['a', 'b', 'c', 'd']
+    assert sorted((call['Segment'], call.get('ExclusiveStartKey', 0)) for call in table.call_list) == [
+        (0, 0), (0, 1), (1, 0), (2, 0), (2, 1), (2, 2)]
+    assert all(call['TotalSegments'] == 3 and call['Limit'] == 10 for call in table.call_list)
+
+
+def test_scan_parallel_pages_raises_segment_error():
+    table = FakeSegmentTable({0: [[{'ScheduleName': 'a'}]], 1: [[{'ScheduleName': 'b'}]]}, error_segment=1)
+
+    with pytest.raises(RuntimeError, match='segment 1 failed'):
+        list(main.DynamoReader.scan(table, page_size=0, total_segments=2))
+
+
+def test_query_exception_list_scans_without_date_index(db):
+    exception_item = {'ScheduleName': {'S': 'dev'}, 'ExceptionKey': {'S': '2026-10-17#StopTime'},
+                      'ExceptionDate': {'S': '2026-10-17'}, 'ExceptionType': {'S': 'StopTime'},
+                      'ExceptionValue': {'S': '22:00'}}
+
+    stubber = Stubber(db.meta.client)
+    stubber.add_client_error('query', 'ValidationException',
+                             'The table does not have the specified index: ExceptionDate-index',
+                             expected_params={'TableName': main.SCHEDULE_EXCEPTION_TABLE,
+                                              'IndexName': main.SCHEDULE_EXCEPTION_DATE_INDEX,
+                                              'KeyConditionExpression': ANY})
+    # Index 가 없으면 같은 날짜의 예외를 Scan 으로 읽고, 여러 페이지여도 모두 읽는다
+    stubber.add_response('scan', {'Items': [], 'LastEvaluatedKey': schedule_item('a')},
+                         {'TableName': main.SCHEDULE_EXCEPTION_TABLE, 'FilterExpression': ANY})
+    stubber.add_response('scan', {'Items': [exception_item]},
+                         {'TableName': main.SCHEDULE_EXCEPTION_TABLE, 'FilterExpression': ANY,
+                          'ExclusiveStartKey': {'ScheduleName': 'a'}})
+
+    with stubber:
+        exception_value_map = main.ScheduleRepository(db).query_exception_value_map('2026-10-17')
+
+        stubber.assert_no_pending_responses()
+
+    assert exception_value_map == {('dev', 'StopTime'): '22:00'}
+
+
+def test_query_exception_list_raises_other_client_error(db):
+    stubber = Stubber(db.meta.client)
+    stubber.add_client_error('query', 'ProvisionedThroughputExceededException')
+
+    with stubber, pytest.raises(main.ClientError):
+        main.ScheduleRepository(db).query_exception_list('2026-10-17')
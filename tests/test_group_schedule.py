@@ -0,0 +1,259 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+import main
+
+
+def ec2_instance(instance_id, state, group_name=None):
+    tag_list = [{'Key': 'ScheduleName', 'Value': 'dev'}, {'Key': 'Name', 'Value': instance_id}]
+
+    if group_name is not None:
+        tag_list.append({'Key': 'ScheduleGroupName', 'Value': group_name})
+
+    return {'InstanceId': instance_id, 'State': {'Name': state}, 'Tags': tag_list}
+
+
+class FakeStateRepository:
+    # put_state_if_changed 만 사용하는 알림 중복 제거용 Repository
+    def __init__(self):
+        self.state_map = {}
+
+    def put_state_if_changed(self, state_key, value, expire_at) -> bool:
+        if self.state_map.get(state_key) == value:
+            return False
+
+        self.state_map[state_key] = value
+        return True
+
+
+def build_schedule(ec2, rds, server_group_list, time_budget=None):
+    schedule = main.GroupSchedule('dev', main.ScheduleInventory(ec2, rds), time_budget)
+    schedule.ec2 = ec2
+    schedule.rds = rds
+    schedule.repository = FakeStateRepository()
+    schedule.schedule_data = {'ScheduleName': 'dev', 'TagValue': 'dev', 'Enabled': True, 'ForceStart': False,
+                              'DaysActive': 'all', 'StartTime': 'None', 'StopTime': 'None'}
+    schedule.schedule_server_group_list = server_group_list
+
+    return schedule
+
+
+@pytest.fixture
+def message_list(monkeypatch):
+    message_list = []
+    monkeypatch.setattr(main.JandiWebhook, 'send_message',
+                        staticmethod(lambda msg, color, connect_info_list=None: message_list.append(msg)))
+
+    return message_list
+
+
+def test_stop_also_stops_ungrouped_instances(message_list):
+    ec2 = boto3.client('ec2')
+    rds = boto3.client('rds')
+    ec2_stubber = Stubber(ec2)
+    rds_stubber = Stubber(rds)
+
+    ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+        ec2_instance('i-1', 'running', 'web'),
+        ec2_instance('i-2', 'running'),
+        ec2_instance('i-3', 'running', 'unknown')
+    ]}]})
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': []})
+    ec2_stubber.add_response('stop_instances', {'StoppingInstances': []},
+                             {'InstanceIds': ['i-1'], 'Force': True})
+    ec2_stubber.add_response('stop_instances', {'StoppingInstances': []},
+                             {'InstanceIds': ['i-2', 'i-3'], 'Force': True})
+
+    schedule = build_schedule(ec2, rds, [{'GroupName': 'web', 'InstanceType': 'EC2', 'Dependency': []}])
+
+    with ec2_stubber, rds_stubber:
+        schedule.stop(True)
+
+        ec2_stubber.assert_no_pending_responses()
+        rds_stubber.assert_no_pending_responses()
+
+    assert len(message_list) == 2
+
+
+def chain_server_group_list() -> list:
+    # web -> app -> db 순서로 의존한다
+    return [
+        {'GroupName': 'web', 'InstanceType': 'EC2', 'Dependency': ['app']},
+        {'GroupName': 'app', 'InstanceType': 'EC2', 'Dependency': ['db']},
+        {'GroupName': 'db', 'InstanceType': 'EC2', 'Dependency': []}
+    ]
+
+
+def add_chain_responses(ec2_stubber, rds_stubber):
+    ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+        ec2_instance('i-web', 'running', 'web'),
+        ec2_instance('i-app', 'running', 'app'),
+        ec2_instance('i-db', 'running', 'db')
+    ]}]})
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': []})
+
+    for instance_id in ['i-web', 'i-app', 'i-db']:
+        ec2_stubber.add_response('stop_instances', {'StoppingInstances': []},
+                                 {'InstanceIds': [instance_id], 'Force': True})
+
+
+@pytest.mark.parametrize('is_stopped', [True, False])
+def test_stop_server_groups_in_reverse_dependency_order(message_list, is_stopped):
+    ec2 = boto3.client('ec2')
+    rds = boto3.client('rds')
+    ec2_stubber = Stubber(ec2)
+    rds_stubber = Stubber(rds)
+    add_chain_responses(ec2_stubber, rds_stubber)
+
+    schedule = build_schedule(ec2, rds, chain_server_group_list(), main.TimeBudget())
+    wait_group_name_list = []
+
+    def wait_server_group_list_stopped(server_group_list):
+        wait_group_name_list.append([server_group['GroupName'] for server_group in server_group_list])
+        return is_stopped
+
+    schedule.wait_server_group_list_stopped = wait_server_group_list_stopped
+
+    with ec2_stubber, rds_stubber:
+        schedule.stop(True)
+
+        ec2_stubber.assert_no_pending_responses()
+        rds_stubber.assert_no_pending_responses()
+
+    # 마지막 wave 는 기다리지 않는다
+    assert wait_group_name_list == [['web'], ['app']]
+
+    # 중지되지 않은 그룹이 있어도 나머지 wave 를 중지하고 wave 마다 경고를 보낸다
+    warning_list = [msg for msg in message_list if '중지되지 않았지만' in msg]
+    assert len(warning_list) == (0 if is_stopped else 2)
+    assert len(message_list) == 3 + len(warning_list)
+
+
+def test_stop_falls_back_to_all_instances_on_dependency_cycle(message_list):
+    ec2 = boto3.client('ec2')
+    rds = boto3.client('rds')
+    ec2_stubber = Stubber(ec2)
+    rds_stubber = Stubber(rds)
+
+    instance_list = [ec2_instance('i-1', 'running', 'a'), ec2_instance('i-2', 'running', 'b'),
+                     ec2_instance('i-3', 'running')]
+
+    for i in range(2):
+        ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': instance_list}]})
+        rds_stubber.add_response('describe_db_instances', {'DBInstances': []})
+        ec2_stubber.add_response('stop_instances', {'StoppingInstances': []},
+                                 {'InstanceIds': ['i-1', 'i-2', 'i-3'], 'Force': True})
+
+    server_group_list = [
+        {'GroupName': 'a', 'InstanceType': 'EC2', 'Dependency': ['b']},
+        {'GroupName': 'b', 'InstanceType': 'EC2', 'Dependency': ['a']}
+    ]
+    repository = FakeStateRepository()
+
+    with ec2_stubber, rds_stubber:
+        # 다음 실행에서도 모두 중지하지만 순환 알림은 다시 보내지 않는다
+        for i in range(2):
+            schedule = build_schedule(ec2, rds, server_group_list, main.TimeBudget())
+            schedule.repository = repository
+            schedule.stop(True)
+
+        ec2_stubber.assert_no_pending_responses()
+        rds_stubber.assert_no_pending_responses()
+
+    assert len([msg for msg in message_list if '순환' in msg]) == 1
+    assert len(message_list) == 3
+
+
+def get_group_name_list(server_group_list) -> list:
+    return [server_group['GroupName'] for server_group in server_group_list]
+
+
+def test_build_server_group_level_list():
+    schedule = build_schedule(None, None, [
+        {'GroupName': 'web', 'InstanceType': 'EC2', 'Dependency': ['app']},
+        {'GroupName': 'app', 'InstanceType': 'EC2', 'Dependency': ['db', 'cache']},
+        {'GroupName': 'batch', 'InstanceType': 'EC2', 'Dependency': ['db', 'external']},
+        {'GroupName': 'db', 'InstanceType': 'RDS', 'Dependency': []},
+        {'GroupName': 'cache', 'InstanceType': 'EC2', 'Dependency': []}
+    ])
+
+    level_list, cyclic_server_group_list = schedule.build_server_group_level_list()
+
+    # 등록되지 않은 그룹(external)에 대한 의존관계는 무시한다
+    assert [get_group_name_list(level) for level in level_list] == [['db', 'cache'], ['app', 'batch'], ['web']]
+    assert cyclic_server_group_list == []
+
+
+def test_build_server_group_level_list_with_cycle():
+    schedule = build_schedule(None, None, [
+        {'GroupName': 'a', 'InstanceType': 'EC2', 'Dependency': ['b']},
+        {'GroupName': 'b', 'InstanceType': 'EC2', 'Dependency': ['a']},
+        {'GroupName': 'c', 'InstanceType': 'EC2', 'Dependency': ['a']},
+        {'GroupName': 'd', 'InstanceType': 'EC2', 'Dependency': []},
+        {'GroupName': 'e', 'InstanceType': 'EC2', 'Dependency': ['d']}
+    ])
+
+    level_list, cyclic_server_group_list = schedule.build_server_group_level_list()
+
+    assert [get_group_name_list(level) for level in level_list] == [['d'], ['e']]
+    # 순환에 의존하는 그룹(c)도 순서를 정할 수 없다
+    assert get_group_name_list(cyclic_server_group_list) == ['a', 'b', 'c']
+
+
+def test_start_skips_only_cyclic_server_groups(message_list):
+    ec2 = boto3.client('ec2')
+    rds = boto3.client('rds')
+    ec2_stubber = Stubber(ec2)
+    rds_stubber = Stubber(rds)
+
+    instance_list = [ec2_instance('i-1', 'stopped', 'a'), ec2_instance('i-2', 'stopped', 'b'),
+                     ec2_instance('i-3', 'stopped', 'd')]
+
+    for i in range(2):
+        ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': instance_list}]})
+        rds_stubber.add_response('describe_db_instances', {'DBInstances': []})
+        ec2_stubber.add_response('start_instances', {'StartingInstances': []}, {'InstanceIds': ['i-3']})
+
+    server_group_list = [
+        {'GroupName': 'a', 'InstanceType': 'EC2', 'Dependency': ['b']},
+        {'GroupName': 'b', 'InstanceType': 'EC2', 'Dependency': ['a']},
+        {'GroupName': 'd', 'InstanceType': 'EC2', 'Dependency': []}
+    ]
+    repository = FakeStateRepository()
+
+    with ec2_stubber, rds_stubber:
+        # ForceStart 가 유지되어 매 실행마다 시작하더라도 순환 알림은 한번만 보낸다
+        for i in range(2):
+            schedule = build_schedule(ec2, rds, server_group_list)
+            schedule.repository = repository
+            schedule.start(True)
+
+        ec2_stubber.assert_no_pending_responses()
+        rds_stubber.assert_no_pending_responses()
+
+    assert len([msg for msg in message_list if '순환' in msg]) == 1
+    assert len(message_list) == 3
+
+
+def test_refresh_server_group_skips_purged_instance():
+    ec2 = boto3.client('ec2')
+    ec2_stubber = Stubber(ec2)
+    ec2_stubber.add_client_error('describe_instances', 'InvalidInstanceID.NotFound',
+                                 "The instance ID 'i-gone' does not exist",
+                                 expected_params={'InstanceIds': ['i-1', 'i-gone']})
+    ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+        ec2_instance('i-1', 'running', 'web')
+    ]}]}, {'Filters': [{'Name': 'instance-id', 'Values': ['i-1', 'i-gone']}]})
+
+    server_group = {'GroupName': 'web', 'InstanceType': 'EC2', 'Dependency': []}
+    schedule = build_schedule(ec2, None, [server_group])
+    schedule.server_group_instance_map['web'] = [ec2_instance('i-1', 'pending', 'web'),
+                                                 ec2_instance('i-gone', 'pending', 'web')]
+
+    with ec2_stubber:
+        instance_list = schedule.refresh_server_group_instance_list(server_group)
+
+        ec2_stubber.assert_no_pending_responses()
+
+    assert [(instance['InstanceId'], instance['State']['Name']) for instance in instance_list] == [('i-1', 'running')]
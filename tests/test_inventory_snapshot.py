@@ -0,0 +1,60 @@
+import time
+
+import boto3
+from botocore.stub import Stubber
+
+import main
+
+
+def ec2_instance(instance_id, state, schedule_name):
+    return {'InstanceId': instance_id, 'State': {'Name': state}, 'Tags': [
+        {'Key': 'ScheduleName', 'Value': schedule_name}, {'Key': 'Name', 'Value': instance_id}]}
+
+
+class FakeSnapshotRepository:
+    def __init__(self):
+        self.snapshot_map = None
+
+    def put_inventory_snapshot_map(self, snapshot_map, captured_at, expire_at):
+        self.snapshot_map = snapshot_map
+
+
+def test_idle_tick_does_not_persist_snapshot(monkeypatch):
+    monkeypatch.setattr(main.InventorySnapshot, 'last_persisted_at', None)
+
+    assert main.InventorySnapshot.is_persist_needed(True, time.time())
+    # 실행할 스케쥴이 없으면 INVENTORY_SNAPSHOT_INTERVAL_SECOND 를 설정하지 않는 한 인벤토리를 조회하지 않는다
+    assert not main.InventorySnapshot.is_persist_needed(False, time.time())
+
+
+def test_persist_reuses_run_inventory(monkeypatch):
+    repository = FakeSnapshotRepository()
+    monkeypatch.setattr(main.Schedule, 'repository', repository)
+    monkeypatch.setattr(main.InventorySnapshot, 'last_persisted_at', None)
+
+    ec2 = boto3.client('ec2')
+    rds = boto3.client('rds')
+    ec2_stubber = Stubber(ec2)
+    rds_stubber = Stubber(rds)
+
+    # 실행 전에 전체 인벤토리를 한번 조회하고, 저장할 때는 시작 / 중지한 스케쥴의 인스턴스만 다시 조회한다
+    ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+        ec2_instance('i-1', 'running', 'dev'), ec2_instance('i-2', 'running', 'prod')]}]})
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': []})
+    ec2_stubber.add_response('describe_instances', {'Reservations': [{'Instances': [
+        ec2_instance('i-1', 'stopping', 'dev')]}]}, {'InstanceIds': ['i-1']})
+
+    inventory = main.ScheduleInventory(ec2, rds)
+    item_list = [{'ScheduleName': 'dev', 'TagValue': 'dev'}, {'ScheduleName': 'prod', 'TagValue': 'prod'}]
+
+    with ec2_stubber, rds_stubber:
+        inventory.ensure_loaded()
+        main.InventorySnapshot.persist(inventory, item_list, item_list[:1])
+
+        ec2_stubber.assert_no_pending_responses()
+        rds_stubber.assert_no_pending_responses()
+
+    assert repository.snapshot_map == {
+        'dev': {'EC2': [['i-1', 'stopping', None]], 'RDS': []},
+        'prod': {'EC2': [['i-2', 'running', None]], 'RDS': []}
+    }
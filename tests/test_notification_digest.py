@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+import main
+
+
+@pytest.fixture
+def stop_alert_list(monkeypatch):
+    stop_alert_list = []
+    monkeypatch.setattr(main.JandiWebhook, 'send_stop_alert_message',
+                        staticmethod(lambda schedule_name, stop_date_time, remain: stop_alert_list.append(
+                            (schedule_name, stop_date_time))))
+
+    return stop_alert_list
+
+
+def test_digest_splits_events_into_chunks():
+    digest = main.NotificationDigest(60)
+    digest.add('b 스케쥴 시작', main.JandiWebhook.color_ok, [main.JandiWebhook.build_connect_info('b-1')])
+    digest.add('a 스케쥴 시작', main.JandiWebhook.color_ok, [main.JandiWebhook.build_connect_info('a-1')])
+    digest.add('c 스케쥴 에러', main.JandiWebhook.color_err,
+               [main.JandiWebhook.build_connect_info('error', 'x' * 100)])
+
+    message_list = digest.build_message_list()
+
+    assert [message['body'] for message in message_list] == ['스케쥴 실행 알림 2건 (1/2)', '스케쥴 실행 알림 1건 (2/2)']
+    assert [message['connectColor'] for message in message_list] == [main.JandiWebhook.color_ok,
+                                                                     main.JandiWebhook.color_err]
+    # 크기 제한을 넘는 설명은 잘라낸다
+    connect_info = message_list[1]['connectInfo'][0]
+    assert len(connect_info['title']) + len(connect_info['description']) <= 60
+    assert connect_info['description'].endswith('...')
+
+
+def test_stop_alert_is_sent_once_per_stop_time(monkeypatch, stop_alert_list):
+    monkeypatch.setattr(main, 'NOTIFICATION_DIGEST', True)
+
+    db = boto3.resource('dynamodb')
+    stubber = Stubber(db.meta.client)
+    stubber.add_response('put_item', {})
+    stubber.add_client_error('put_item', 'ConditionalCheckFailedException')
+    # ScheduleState 테이블이 없어도 알림은 보내고 스케쥴 실행을 막지 않는다
+    stubber.add_client_error('put_item', 'ResourceNotFoundException')
+
+    stop_date_time = (datetime.now() + timedelta(minutes=5)).replace(second=0, microsecond=0)
+    schedule = main.Schedule('dev')
+    schedule.repository = main.ScheduleRepository(db)
+    schedule.is_active_day = lambda: True
+    schedule.get_stop_date_time = lambda: stop_date_time
+    schedule.has_running_instance = lambda: True
+
+    with stubber:
+        for i in range(3):
+            schedule.check_remain_stop_time()
+
+        stubber.assert_no_pending_responses()
+
+    assert stop_alert_list == [('dev', stop_date_time), ('dev', stop_date_time)]
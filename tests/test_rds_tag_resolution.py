@@ -0,0 +1,168 @@
+import boto3
+import pytest
+from botocore.stub import Stubber
+
+import main
+
+
+def rds_instance(identifier):
+    return {
+        'DBInstanceIdentifier': identifier,
+        'DBInstanceArn': 'arn:aws:rds:ap-northeast-2:123456789012:db:' + identifier,
+        'DBInstanceStatus': 'available'
+    }
+
+
+def get_identifier_list(rds_instance_list) -> list:
+    return [instance['DBInstanceIdentifier'] for instance in rds_instance_list]
+
+
+@pytest.fixture(autouse=True)
+def rds_tag_cache(monkeypatch):
+    rds_tag_cache = main.RdsTagCache(3600, 100)
+    monkeypatch.setattr(main, 'RDS_TAG_CACHE', rds_tag_cache)
+
+    return rds_tag_cache
+
+
+@pytest.fixture
+def rds():
+    return boto3.client('rds')
+
+
+def test_resolve_schedule_name_and_group_name_from_list_tags(rds):
+    rds_stubber = Stubber(rds)
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': [rds_instance('db-1'), rds_instance('db-2')]})
+    rds_stubber.add_response('list_tags_for_resource', {'TagList': [
+        {'Key': 'ScheduleName', 'Value': 'dev'}
+    ]}, {'ResourceName': rds_instance('db-1')['DBInstanceArn']})
+    rds_stubber.add_response('list_tags_for_resource', {'TagList': [
+        {'Key': 'ScheduleName', 'Value': 'dev'},
+        {'Key': 'ScheduleGroupName', 'Value': 'database'}
+    ]}, {'ResourceName': rds_instance('db-2')['DBInstanceArn']})
+
+    inventory = main.ScheduleInventory(None, rds)
+    inventory.describe_ec2_instance_list = lambda: []
+
+    with rds_stubber:
+        assert get_identifier_list(inventory.get_rds_instance_list('dev')) == ['db-1', 'db-2']
+        assert get_identifier_list(inventory.get_server_group_rds_instance_list('dev', 'database')) == ['db-2']
+
+        rds_stubber.assert_no_pending_responses()
+
+
+def test_resolve_from_cache_without_list_tags(rds, rds_tag_cache):
+    rds_tag_cache.put_tag_list(rds_instance('db-1')['DBInstanceArn'], [
+        {'Key': 'ScheduleName', 'Value': 'dev'},
+        {'Key': 'ScheduleGroupName', 'Value': 'database'}
+    ])
+
+    # list_tags_for_resource 응답을 등록하지 않았으므로 호출되면 Stubber 가 에러를 낸다
+    rds_stubber = Stubber(rds)
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': [rds_instance('db-1')]})
+
+    inventory = main.ScheduleInventory(None, rds)
+    inventory.describe_ec2_instance_list = lambda: []
+
+    with rds_stubber:
+        assert get_identifier_list(inventory.get_rds_instance_list('dev')) == ['db-1']
+        assert get_identifier_list(inventory.get_server_group_rds_instance_list('dev', 'database')) == ['db-1']
+
+        rds_stubber.assert_no_pending_responses()
+
+
+def test_resolve_from_describe_tag_list_without_list_tags(rds, rds_tag_cache):
+    instance = rds_instance('db-1')
+    instance['TagList'] = [
+        {'Key': 'ScheduleName', 'Value': 'dev'},
+        {'Key': 'ScheduleGroupName', 'Value': 'database'},
+        {'Key': 'Name', 'Value': 'db-1'}
+    ]
+
+    # describe_db_instances 응답에 TagList 가 있으면 list_tags_for_resource 를 호출하지 않는다
+    rds_stubber = Stubber(rds)
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': [instance]})
+
+    inventory = main.ScheduleInventory(None, rds)
+    inventory.describe_ec2_instance_list = lambda: []
+
+    with rds_stubber:
+        assert get_identifier_list(inventory.get_rds_instance_list('dev')) == ['db-1']
+        assert get_identifier_list(inventory.get_server_group_rds_instance_list('dev', 'database')) == ['db-1']
+
+        rds_stubber.assert_no_pending_responses()
+
+    # 스케쥴 태그만 캐시에 저장한다
+    assert rds_tag_cache.get_tag_list(instance['DBInstanceArn']) == instance['TagList'][:2]
+
+
+def test_resolve_from_tagging_api_pages(rds):
+    tagging = boto3.client('resourcegroupstaggingapi')
+    tagging_params = {'ResourceTypeFilters': ['rds:db'], 'TagFilters': [{'Key': 'ScheduleName'}]}
+
+    rds_stubber = Stubber(rds)
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': [
+        rds_instance('db-1'), rds_instance('db-2'), rds_instance('db-3')]})
+
+    tagging_stubber = Stubber(tagging)
+    tagging_stubber.add_response('get_resources', {
+        'PaginationToken': 'page-2',
+        'ResourceTagMappingList': [{'ResourceARN': rds_instance('db-1')['DBInstanceArn'], 'Tags': [
+            {'Key': 'ScheduleName', 'Value': 'dev'}
+        ]}]
+    }, tagging_params)
+    tagging_stubber.add_response('get_resources', {
+        'PaginationToken': '',
+        'ResourceTagMappingList': [{'ResourceARN': rds_instance('db-2')['DBInstanceArn'], 'Tags': [
+            {'Key': 'ScheduleName', 'Value': 'dev'},
+            {'Key': 'ScheduleGroupName', 'Value': 'database'}
+        ]}]
+    }, dict(tagging_params, PaginationToken='page-2'))
+
+    inventory = main.ScheduleInventory(None, rds, tagging=tagging)
+    inventory.describe_ec2_instance_list = lambda: []
+
+    # ScheduleName 태그가 없는 db-3 도 list_tags_for_resource 를 호출하지 않는다
+    with rds_stubber, tagging_stubber:
+        assert get_identifier_list(inventory.get_rds_instance_list('dev')) == ['db-1', 'db-2']
+        assert get_identifier_list(inventory.get_server_group_rds_instance_list('dev', 'database')) == ['db-2']
+
+        rds_stubber.assert_no_pending_responses()
+        tagging_stubber.assert_no_pending_responses()
+
+
+def test_resolve_falls_back_to_list_tags_when_tagging_api_fails(rds):
+    tagging = boto3.client('resourcegroupstaggingapi')
+
+    rds_stubber = Stubber(rds)
+    rds_stubber.add_response('describe_db_instances', {'DBInstances': [rds_instance('db-1'), rds_instance('db-2')]})
+
+    for identifier in ['db-1', 'db-2']:
+        rds_stubber.add_response('list_tags_for_resource', {'TagList': [
+            {'Key': 'ScheduleName', 'Value': 'dev'}
+        ]}, {'ResourceName': rds_instance(identifier)['DBInstanceArn']})
+
+    tagging_stubber = Stubber(tagging)
+    tagging_stubber.add_client_error('get_resources', 'AccessDeniedException')
+
+    inventory = main.ScheduleInventory(None, rds, tagging=tagging)
+    inventory.describe_ec2_instance_list = lambda: []
+
+    with rds_stubber, tagging_stubber:
+        assert get_identifier_list(inventory.get_rds_instance_list('dev')) == ['db-1', 'db-2']
+
+        rds_stubber.assert_no_pending_responses()
+        tagging_stubber.assert_no_pending_responses()
+
+
+def test_put_same_tag_list_does_not_mark_dirty(rds_tag_cache):
+    arn = rds_instance('db-1')['DBInstanceArn']
+    rds_tag_cache.put_tag_list(arn, [{'Key': 'ScheduleName', 'Value': 'dev'}])
+    rds_tag_cache.is_dirty = False
+
+    # 스케쥴 태그가 아닌 태그만 바뀌면 다시 저장하지 않는다
+    rds_tag_cache.put_tag_list(arn, [{'Key': 'ScheduleName', 'Value': 'dev'}, {'Key': 'Name', 'Value': 'db-1'}])
+    assert not rds_tag_cache.is_dirty
+
+    rds_tag_cache.put_tag_list(arn, [{'Key': 'ScheduleName', 'Value': 'prod'}])
+    assert rds_tag_cache.is_dirty
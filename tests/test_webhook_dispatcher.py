@@ -0,0 +1,132 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+import pytest
+
+import main
+
+
+class WebhookServer(ThreadingMixIn, HTTPServer):
+    # 받은 메세지와 연결(client port)을 기록하고 payload 의 status / delay 대로 응답하는 웹훅 서버
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), WebhookHandler)
+        self.request_list = []
+        self.lock = threading.Lock()
+
+    def get_url(self) -> str:
+        return 'http://127.0.0.1:{0}/webhook'.format(self.server_port)
+
+    def get_body_list(self) -> list:
+        with self.lock:
+            return [body for body, client_port in self.request_list]
+
+
+class WebhookHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])).decode('utf-8'))
+
+        with self.server.lock:
+            self.server.request_list.append((body, self.client_address[1]))
+            # 같은 메세지를 받은 횟수에 따라 다른 status 로 응답한다
+            attempt = len([request for request in self.server.request_list if request[0] == body])
+
+        time.sleep(body.get('delay', 0))
+        status_list = body.get('status', [200])
+        status = status_list[min(attempt, len(status_list)) - 1]
+
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = WebhookServer()
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+    thread.daemon = True
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def build_dispatcher(server, concurrency=1) -> main.WebhookDispatcher:
+    dispatcher = main.WebhookDispatcher(server.get_url(), concurrency)
+    dispatcher.retry_base_delay_second = 0.01
+    dispatcher.retry_max_delay_second = 0.01
+
+    return dispatcher
+
+
+def test_send_in_order_with_one_connection(server):
+    dispatcher = build_dispatcher(server)
+
+    for i in range(5):
+        dispatcher.submit(json.dumps({'index': i}))
+
+    assert dispatcher.flush(5)
+    assert server.get_body_list() == [{'index': i} for i in range(5)]
+    # Session 을 재사용하므로 모든 메세지를 하나의 연결로 보낸다
+    assert len(set(client_port for body, client_port in server.request_list)) == 1
+    assert (dispatcher.sent_count, dispatcher.failed_count) == (5, 0)
+
+
+def test_retry_server_error_and_give_up_on_client_error(server):
+    dispatcher = build_dispatcher(server)
+    dispatcher.submit(json.dumps({'index': 0, 'status': [503, 200]}))
+    dispatcher.submit(json.dumps({'index': 1, 'status': [400]}))
+
+    assert dispatcher.flush(5)
+    assert [body['index'] for body in server.get_body_list()] == [0, 0, 1]
+    assert (dispatcher.sent_count, dispatcher.failed_count) == (1, 1)
+
+
+def test_read_timeout_fails_after_max_attempts(server, monkeypatch):
+    monkeypatch.setattr(main, 'WEBHOOK_READ_TIMEOUT_SECOND', 0.1)
+    monkeypatch.setattr(main, 'WEBHOOK_MAX_ATTEMPTS', 2)
+
+    dispatcher = build_dispatcher(server)
+    dispatcher.submit(json.dumps({'index': 0, 'delay': 0.5}))
+    dispatcher.submit(json.dumps({'index': 1}))
+
+    # 응답이 늦은 메세지 때문에 다음 메세지가 보내지지 않는 일은 없어야 한다
+    assert dispatcher.flush(5)
+    assert [body['index'] for body in server.get_body_list()] == [0, 0, 1]
+    assert (dispatcher.sent_count, dispatcher.failed_count) == (1, 1)
+
+
+def test_flush_timeout_returns_false(server):
+    dispatcher = build_dispatcher(server)
+    dispatcher.submit(json.dumps({'index': 0, 'delay': 0.5}))
+
+    assert not dispatcher.flush(0.05)
+    assert dispatcher.flush(5)
+
+
+def test_handle_event_flushes_before_return(server, monkeypatch):
+    dispatcher = build_dispatcher(server, 2)
+    monkeypatch.setattr(main, 'WEBHOOK_DISPATCHER', dispatcher)
+    monkeypatch.setattr(main.CONFIG_CACHE, 'refresh', lambda: None)
+
+    def run_job(context=None):
+        for i in range(3):
+            main.JandiWebhook.send_message('message {0}'.format(i), main.JandiWebhook.color_ok)
+
+    monkeypatch.setattr(main.Scheduler, 'run_job', staticmethod(run_job))
+
+    main.handle_event({}, None)
+
+    assert sorted(body['body'] for body in server.get_body_list()) == ['message 0', 'message 1', 'message 2']
+    assert dispatcher.queue.unfinished_tasks == 0